@@ -0,0 +1,162 @@
+"""
+API HTTP JSON de prédiction pour Immo Eliza (à côté de l'interface Streamlit)
+
+    python api.py --port 8000
+
+POST /predict        : un bien (objet JSON) -> {"predicted_price": ..., "interval": {...}}
+POST /predict/batch  : {"items": [bien, ...]} -> {"predicted_prices": [...], "intervals": [...]}
+GET  /metrics        : latences p50/p95/p99, histogramme des tailles de batch et statistiques par modèle
+GET  /health         : vivacité du processus (toujours 200)
+GET  /ready          : 200 une fois les modèles chargés et préchauffés (src/warmup.py), 503 avant
+
+Le modèle servi dépend de l'en-tête X-Session-Id (à défaut, de l'adresse du client) :
+même session, même modèle (cf. src/model_router.py).
+"""
+
+import argparse
+import functools
+import os
+import threading
+import time
+
+import numpy as np
+from flask import Flask, jsonify, request
+
+from src import settings
+from src.intervals import DEFAULT_LEVEL, get_interval_calibration
+from src.metrics import LatencyRecorder
+from src.micro_batcher import MicroBatcher
+from src.model_registry import registry
+from src.model_router import get_model_router
+from src.prediction import payload_to_row
+from src.prediction_log import get_prediction_log
+from src.warmup import get_warmup
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REQUEST_TIMEOUT_SECONDS = 30
+
+
+def predict_rows(model_name, rows):
+    """Un seul appel au modèle pour toutes les lignes du micro-batch (modèles ombre en arrière-plan)"""
+    router = get_model_router(BASE_DIR)
+    return router.predict(router.models()[model_name], rows)
+
+
+def intervals_for(predictions, model_entry, level=DEFAULT_LEVEL):
+    """Fourchettes des prix prédits (liste de dicts), None si le modèle servi n'a pas sa propre calibration"""
+    calibration = get_interval_calibration(model_entry)
+    if calibration is None:
+        return None
+    lower, upper = calibration.interval(np.asarray(predictions), level)
+    return [{'level': level, 'lower': low, 'upper': high} for low, high in zip(lower.tolist(), upper.tolist())]
+
+
+def create_app(max_batch_size=64, max_wait_ms=5.0, warmup=True):
+    """Application Flask ; préchauffage lancé en arrière-plan (warmup=False : à lancer par l'appelant)"""
+    app = Flask(__name__)
+    app.json.sort_keys = False
+    router = get_model_router(BASE_DIR)
+    # Un micro-batcher par modèle servi : un batch ne mélange jamais deux modèles
+    batchers = {}
+    batchers_lock = threading.Lock()
+    request_latency = {
+        'predict': LatencyRecorder(),
+        'predict_batch': LatencyRecorder(),
+    }
+    prediction_log = get_prediction_log(BASE_DIR) if settings.PREDICTION_LOG_ENABLED else None
+    process_warmup = get_warmup(router, prediction_log)
+    if warmup:
+        process_warmup.start()
+
+    def batcher_for(model_name):
+        batcher = batchers.get(model_name)
+        if batcher is None:
+            with batchers_lock:
+                batcher = batchers.get(model_name)
+                if batcher is None:
+                    batcher = batchers[model_name] = MicroBatcher(
+                        functools.partial(predict_rows, model_name),
+                        max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        return batcher
+
+    def score(payloads, endpoint):
+        start = time.perf_counter()
+        try:
+            rows = [payload_to_row(payload) for payload in payloads]
+        except ValueError as e:
+            return None, None, (jsonify({'error': str(e)}), 400)
+
+        try:
+            model_entry = router.model_for(request.headers.get('X-Session-Id') or request.remote_addr)
+            predictions = batcher_for(model_entry.name).predict(rows, timeout=REQUEST_TIMEOUT_SECONDS)
+        except Exception as e:
+            return None, None, (jsonify({'error': f"Erreur lors de la prédiction par le modèle : {e}"}), 500)
+
+        elapsed = time.perf_counter() - start
+        request_latency[endpoint].record(elapsed)
+        if prediction_log is not None:
+            prediction_log.record(rows, predictions, model_entry.version, elapsed * 1000, source=endpoint)
+        return predictions, model_entry, None
+
+    @app.post('/predict')
+    def predict():
+        predictions, model_entry, error = score([request.get_json(silent=True)], 'predict')
+        if error:
+            return error
+        intervals = intervals_for(predictions, model_entry)
+        return jsonify({'predicted_price': predictions[0], 'interval': intervals[0] if intervals else None,
+                        'model_name': model_entry.name, 'model_version': model_entry.version})
+
+    @app.post('/predict/batch')
+    def predict_batch():
+        body = request.get_json(silent=True)
+        items = body.get('items') if isinstance(body, dict) else body
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': "Le corps doit contenir une liste non vide 'items'"}), 400
+
+        predictions, model_entry, error = score(items, 'predict_batch')
+        if error:
+            return error
+        return jsonify({'predicted_prices': predictions, 'intervals': intervals_for(predictions, model_entry),
+                        'model_name': model_entry.name, 'model_version': model_entry.version})
+
+    @app.get('/health')
+    def health():
+        return jsonify({'status': 'ok'})
+
+    @app.get('/ready')
+    def ready():
+        state = process_warmup.state()
+        return jsonify(state), 200 if state['status'] == 'ready' else 503
+
+    @app.get('/metrics')
+    def metrics():
+        return jsonify({
+            'requests': {name: recorder.summary() for name, recorder in request_latency.items()},
+            'batching': {name: batcher.metrics() for name, batcher in batchers.items()},
+            'models': registry.metrics(),
+            'routing': router.metrics(),
+            'prediction_log': prediction_log.metrics() if prediction_log is not None else None,
+            'warmup': process_warmup.state(),
+        })
+
+    app.config['batchers'] = batchers
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API de prédiction Immo Eliza")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    # Le serveur répond tout de suite à /health ; /ready passe à 200 une fois les modèles
+    # du registre chargés et préchauffés (les requêtes reçues avant attendent le chargement)
+    app = create_app(args.max_batch_size, args.max_wait_ms)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
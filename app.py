@@ -2,56 +2,102 @@
 import numpy as np
 import streamlit as st
 import pandas as pd
-import joblib
 import os
-from pycaret.regression import load_model, predict_model
+import time
+import logging
+import uuid
+from src import settings
+from src.logging_config import get_logger
+from src.model_router import get_model_router
+from src.prediction import EXPECTED_COLUMNS_ORDER, prepare_input_frame
+from src.prediction_cache import make_key, prediction_cache
+from src.prediction_log import get_prediction_log
+from src.warmup import FAILED, get_warmup
 from src.local_storage import LocalStorageWrapper
 from src.traduction_fr import fr_to_en, en_to_fr, translate_with_prefix
 from src.feedback_form import display_feedback_section
+from src.geodata import get_postcode_index
+from src.locality_matcher import get_locality_matcher
+from src.intervals import DEFAULT_LEVEL, get_interval_calibration
+from src.sensitivity import SWEEP_AXES, sensitivity_grid, to_chart_frame
+from src.explanations import BASE_VALUE_COLUMN, get_explainer
+from src.comparables import DISTANCE_COLUMN, get_comparables_index
 
 # Define base directory for consistent file paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+logger = get_logger('app')
+
  # Use all the wide
 st.set_page_config(layout="centered")
 
-# Loading the trained model
-# Try joblib first (plus léger), puis fallback vers PyCaret
-loaded_model = None
-model_type = None
+# Identifiant stable de la session : détermine le modèle servi (tests A/B, cf. src/model_router.py)
+if 'ab_session_id' not in st.session_state:
+    st.session_state.ab_session_id = uuid.uuid4().hex
 
+# Loading the trained model
+# Le registre garde les pipelines en mémoire pour tout le processus (model/registry/ s'il existe,
+# sinon joblib d'abord, puis fallback PyCaret) et les recharge automatiquement si un fichier change
 try:
-    # Essayer de charger avec joblib d'abord
-    if os.path.exists(os.path.join(BASE_DIR, 'model', 'pipeline_immo_eliza.joblib')):
-        loaded_model = joblib.load(os.path.join(BASE_DIR, 'model', 'pipeline_immo_eliza.joblib'))
-        model_type = 'joblib'
+    model_router = get_model_router(BASE_DIR)
+    model_entry = model_router.model_for(st.session_state.ab_session_id)
+    loaded_model = model_entry.model
+    model_type = model_entry.model_type
+    if model_type == 'joblib':
         st.sidebar.success("✅ Modèle Joblib chargé avec succès !")
-    # Fallback vers PyCaret si pas de fichier joblib
-    elif os.path.exists(os.path.join(BASE_DIR, 'model', 'pipeline_immo_eliza.pkl')):
-        # PyCaret load_model expects model name without extension, using full path
-        loaded_model = load_model(os.path.join(BASE_DIR, 'model', 'pipeline_immo_eliza'))
-        model_type = 'pycaret'
-        st.sidebar.success("✅ Modèle PyCaret chargé avec succès !")
+    elif model_type == 'compiled':
+        st.sidebar.success("✅ Modèle compilé chargé avec succès !")
     else:
-        st.error("❌ Aucun modèle trouvé (ni .joblib ni .pkl)")
-        st.stop()
+        st.sidebar.success("✅ Modèle PyCaret chargé avec succès !")
+    model_metrics = model_entry.metrics()
+    st.sidebar.caption(f"Modèle {model_metrics['name']} · version {model_metrics['version']} · "
+                       f"{model_metrics['size_mb']} MB · chargé en {model_metrics['load_seconds']} s")
+    if not settings.PRODUCTION_MODE:
+        cache_stats = prediction_cache.stats()
+        st.sidebar.caption(f"Cache prédictions : {cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+                           f"{cache_stats['evictions']} évictions")
+except FileNotFoundError as e:
+    st.error(f"❌ {e}")
+    st.stop()
 except Exception as e:
     st.error(f"❌ Erreur lors du chargement du modèle : {e}")
     st.stop()
 
+# Index des codes postaux (construit par scripts/build_postcode_index.py), chargé une fois par processus
+# None si l'index n'a pas été construit : la localisation reste alors entièrement manuelle
+postcode_index = get_postcode_index(BASE_DIR)
+
+# Index des biens comparables (scripts/build_comparables_index.py), None s'il n'a pas été construit
+comparables_index = get_comparables_index(BASE_DIR)
+
+# Calibration des fourchettes de prix du modèle servi à la session (scripts/calibrate_intervals.py),
+# None si ce modèle n'a pas sa propre calibration
+interval_calibration = get_interval_calibration(model_entry)
+
+# Journal des prédictions (écrit en arrière-plan), None s'il est désactivé
+prediction_log = get_prediction_log(BASE_DIR) if settings.PREDICTION_LOG_ENABLED else None
+
+# Préchauffage une fois par processus, hors session utilisateur : fait par serve_app.py avant
+# le démarrage de Streamlit ; avec `streamlit run app.py`, lancé en arrière-plan sans bloquer la session
+warmup = get_warmup(model_router, prediction_log, batch_size=0).start()
+if warmup.status == FAILED:
+    st.sidebar.warning(f"⚠️ Préchauffage incomplet : {warmup.error}")
+elif warmup.ready and not settings.PRODUCTION_MODE:
+    st.sidebar.caption(f"Préchauffage : {warmup.timings_ms['total']:.0f} ms")
+
+# Index des localités connues du modèle (reconstruit seulement si la version du modèle change)
+locality_matcher = get_locality_matcher(model_entry)
+
 # Import class LocalStorageWrapper
 
 load_cache = LocalStorageWrapper()
-load_cache.initialize_state()
-session_values = load_cache.get_all_items( )
+# Une seule lecture de l'état sérialisé (et une écriture seulement s'il manque des valeurs)
+session_values = load_cache.initialize_state()
 
 for key_from_defaults, default_val_from_wrapper in load_cache.default_session_values.items():
-    # On récupère la valeur ACTUELLE du local storage (qui a pu être initialisée par initialize_state)
-    value_currently_in_storage = load_cache.get(key_from_defaults)
-
     # Si la clé n'est PAS ENCORE dans st.session_state, on l'ajoute.
     if key_from_defaults not in st.session_state:
-        target_value = None
+        value_currently_in_storage = session_values.get(key_from_defaults)
         if value_currently_in_storage is not None:
             # Si on a une valeur du storage, on l'utilise
             target_value = value_currently_in_storage
@@ -75,15 +121,6 @@ if 'feedback_submitted' not in st.session_state:
     st.session_state.feedback_submitted = False
 
 
-EXPECTED_COLUMNS_ORDER = [
-    'type', 'bedroomCount', 'bathroomCount', 'province', 'locality',
-       'postCode', 'habitableSurface', 'buildingCondition',
-       'buildingConstructionYear', 'facedeCount', 'floodZoneType',
-       'heatingType', 'kitchenType', 'landSurface', 'hasGarden',
-       'gardenSurface', 'toiletCount', 'hasSwimmingPool', 'hasFireplace',
-       'hasTerrace', 'subtype_grouped', 'building_floors',
-       'apartment_floor', 'region', 'epcNumeric']
-
 # Creating a function for Prediction
 
 def immo_prediction(list_input_data):
@@ -94,110 +131,139 @@ def immo_prediction(list_input_data):
         st.error(f"Incohérence de données : {len(list_input_data)} valeurs reçues, {len(EXPECTED_COLUMNS_ORDER)} attendues.")
         return "Erreur de prédiction (taille des données)"
     
-    # Changin the data into a Dataframe
-    df_input_data = pd.DataFrame([list_input_data], columns=EXPECTED_COLUMNS_ORDER)
-
-    # add region information
-    def get_region(zip_code):
-        # On tente de convertir en int
-        try:
-            z = int(zip_code)
-        except (ValueError, TypeError):
-            return pd.NA    
-
-        if 1000 <= z <= 1299:
-            return "Bruxelles"
-        elif 1300 <= z <= 1499 or 4000 <= z <= 7999:
-            return "Wallonia"
-        else:
-            return "Flanders"
-
-    df_input_data['region'] = df_input_data['postCode'].apply(get_region)
+    # Même bien déjà estimé (par cette session ou une autre) avec la même version du modèle ?
+    request_start = time.perf_counter()
+    cache_key = make_key(list_input_data)
+    cached_value = prediction_cache.get(cache_key, model_entry.version)
+    if cached_value is not None:
+        if prediction_log is not None:
+            prediction_log.record([list_input_data], [cached_value], model_entry.version,
+                                  (time.perf_counter() - request_start) * 1000, cached=True)
+        return cached_value
 
-    # add and convert epc score
-    def epcToNumeric(row):
-        region = row['region']
-        epc_score = row['epcNumeric']
-        
-        epc_mapping = {
-            'Flanders': {
-                'A++': 0,
-                'A+': 0,
-                'A': 100,
-                'B': 200,
-                'C': 300,
-                'D': 400,
-                'E': 500,
-                'F': 600,
-                'G': 700
-            },
-            'Wallonia': {
-                'A++': 0,
-                'A+': 50,
-                'A': 90,
-                'B': 170,
-                'C': 250,
-                'D': 330,
-                'E': 420,
-                'F': 510,
-                'G': 600
-            },
-            'Bruxelles': {
-                'A++': 0,
-                'A+': 0,
-                'A': 45,
-                'B': 95,
-                'C': 145,
-                'D': 210,
-                'E': 275,
-                'F': 345,
-                'G': 450
-            }
-        }
-        
-        return epc_mapping.get(region, {}).get(epc_score, None)
-    
-    df_input_data['epcNumeric'] = df_input_data.apply(epcToNumeric, axis=1)
+    # Changin the data into a Dataframe
+    # + add region information and convert epc score (tables de correspondance vectorisées, cf. src/features.py)
+    df_input_data = prepare_input_frame([list_input_data])
 
     # st.subheader("Data envoyé au modèle prédictif :") # For debug
 
-    print("Colonnes de df_input_data:", df_input_data.columns.tolist())
-    print("Nombre de colonnes de df_input_data:", len(df_input_data.columns))
-    print("Première ligne de df_input_data:\n", df_input_data.head())
-    # Si possible, affiche aussi les types de données pour vérifier
-    # print("Types de données de df_input_data:\n", df_input_data.dtypes)
+    # Diagnostics via logs structurés (niveau + échantillonnage configurables, cf. src/settings.py)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("prediction_input", extra={'fields': {
+            'columns': df_input_data.columns.tolist(),
+            'n_columns': len(df_input_data.columns),
+            'first_row': df_input_data.iloc[0].to_dict(),
+        }})
     try:
         global model_type
-        
-        if model_type == 'joblib':
-            # Pour un modèle joblib (sklearn/custom pipeline)
-            predicted_value = loaded_model.predict(df_input_data)[0]
-        else:
-            # Pour PyCaret (comportement original)
-            predictions_df = predict_model(estimator=loaded_model, data=df_input_data)
-            
-            # Extraire la valeur prédite (souvent dans 'prediction_label' ou 'Label')
-            if 'prediction_label' in predictions_df.columns:
-                predicted_value = predictions_df['prediction_label'].iloc[0]
-            elif 'Label' in predictions_df.columns: # Ancien nom ou pour d'autres types de tâches
-                predicted_value = predictions_df['Label'].iloc[0]
-            else:
-                st.error(f"Colonne de prédiction ('prediction_label' ou 'Label') non trouvée dans le résultat : {predictions_df.columns.tolist()}")
-                return "Erreur de prédiction (colonne résultat)"
-            
+
+        # Modèle servi à cette session ; les modèles ombre sont évalués en arrière-plan
+        start = time.perf_counter()
+        predicted_value = model_router.predict(model_entry, [list_input_data], df_input_data)[0]
+        logger.info("prediction_done", extra={'fields': {
+            'model_type': model_type,
+            'model_name': model_entry.name,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 3),
+        }})
+        predicted_value = float(predicted_value)
+        prediction_cache.put(cache_key, model_entry.version, predicted_value)
+        if prediction_log is not None:
+            prediction_log.record([list_input_data], [predicted_value], model_entry.version,
+                                  (time.perf_counter() - request_start) * 1000)
         return predicted_value
 
     except Exception as e:
         st.error(f"Erreur lors de la prédiction par le modèle : {e}")
-        st.exception(e) # Affiche la trace complète de l'erreur pour le débogage
+        logger.exception("prediction_failed")
+        if not settings.PRODUCTION_MODE:
+            st.exception(e) # Affiche la trace complète de l'erreur pour le débogage
         return "Erreur de prédiction (exception)"
     
 
+# Panneau « et si ? » : toute la grille de variantes est estimée en un seul appel au modèle
+def display_sensitivity_panel(base_row):
+    x_column = st.selectbox("Paramètre à faire varier", list(SWEEP_AXES),
+                            format_func=lambda column: SWEEP_AXES[column][0], key='sensitivity_axis')
+    start = time.perf_counter()
+    try:
+        grid = sensitivity_grid(model_entry, base_row, x_column)
+    except Exception as e:
+        st.error(f"Erreur lors de l'analyse de sensibilité : {e}")
+        logger.exception("sensitivity_failed")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    st.line_chart(to_chart_frame(grid, x_column))
+    current_value = base_row[EXPECTED_COLUMNS_ORDER.index(x_column)]
+    st.caption(f"Une courbe par classe PEB · valeur actuelle : {current_value} · "
+               f"{len(grid)} variantes estimées en {elapsed_ms:.0f} ms")
+
+
+# Contributions des features au prix estimé (TreeSHAP du LightGBM, explainer en cache par version)
+def display_explanation_panel(base_row):
+    try:
+        explainer = get_explainer(model_entry, BASE_DIR)
+        df_input_data = prepare_input_frame([base_row])
+        top = explainer.top_contributions(df_input_data, limit=8)
+        base_value = explainer.explain(df_input_data)[BASE_VALUE_COLUMN].iloc[0]
+    except Exception as e:
+        st.error(f"Erreur lors du calcul des explications : {e}")
+        logger.exception("explanation_failed")
+        return
+
+    st.bar_chart(top.rename('Contribution (€)'))
+    st.caption(f"Prix moyen de référence : {base_value:,.0f} € · chaque barre ajoute ou retire "
+               f"sa contribution pour arriver au prix estimé")
+
+
+# Annonces du dataset les plus proches du bien estimé (KD-tree chargé une fois par processus)
+def display_comparables_panel(base_row):
+    try:
+        comparables = comparables_index.comparables(prepare_input_frame([base_row]), k=5,
+                                                    postcode_index=postcode_index)
+    except Exception as e:
+        st.error(f"Erreur lors de la recherche de biens comparables : {e}")
+        logger.exception("comparables_failed")
+        return
+
+    comparables = comparables.rename(columns={
+        'type': 'Type', 'locality': 'Localité', 'epcNumeric': 'PEB', 'price': 'Prix (€)',
+        'postCode': 'Code postal', 'habitableSurface': 'Surface (m²)', 'bedroomCount': 'Chambres',
+        'buildingConstructionYear': 'Année', 'landSurface': 'Terrain (m²)', DISTANCE_COLUMN: 'Distance',
+    })
+    st.dataframe(comparables.style.format({'Prix (€)': '{:,.0f}', 'Code postal': '{:.0f}',
+                                           'Surface (m²)': '{:.0f}', 'Chambres': '{:.0f}', 'Année': '{:.0f}',
+                                           'Terrain (m²)': '{:.0f}', 'PEB': '{:.0f}', 'Distance': '{:.2f}'},
+                                          na_rep='-'),
+                 hide_index=True)
+    st.caption("Biens du dataset d'entraînement les plus proches (caractéristiques et localisation)")
+
+
 # Callback function to update local storage when a session_state item changes
+# (write-behind : le champ est marqué modifié, l'écriture groupée a lieu en fin de script)
 def update_local_storage_callback(item_key):
     if item_key in st.session_state:
-        # print(f"Callback: Updating local storage for {item_key} with value {st.session_state[item_key]}") # Debug
-        load_cache.set(item_key, st.session_state[item_key])
+        load_cache.mark_dirty(item_key)
+
+
+# Callback du code postal : remplit province, région et localité depuis l'index
+def autofill_location_callback():
+    update_local_storage_callback('postCode_key')
+    if postcode_index is None:
+        return
+    info = postcode_index.lookup(st.session_state.postCode_key)
+    if info is None:
+        return
+    for item_key, value in (('province_key', info['province']), ('region_key', info['region'])):
+        # Seulement si la valeur fait partie des options proposées par le selectbox
+        if value in en_to_fr and st.session_state.get(item_key) != value:
+            st.session_state[item_key] = value
+            update_local_storage_callback(item_key)
+    locality = st.session_state.get('locality_key')
+    known_localities = {name.casefold() for name in info['localities']}
+    if known_localities and (not locality or locality.strip().casefold() not in known_localities):
+        st.session_state.locality_key = info['localities'][0]
+        update_local_storage_callback('locality_key')
 
     
 
@@ -307,13 +373,37 @@ def main():
         locality = st.text_input('Localité', 
                                      key='locality_key',
                                      on_change=update_local_storage_callback, 
-                                     args=('locality_key',)) # What happen if the name is wrong spelled ?
+                                     args=('locality_key',))
 
 
         postCode = st.number_input('Code postal', min_value=1000, max_value=9999, step=1, 
                                        key='postCode_key',
-                                       on_change=update_local_storage_callback, 
-                                       args=('postCode_key',)) # Removed default value=1000 to rely on session_state
+                                       on_change=autofill_location_callback) # Removed default value=1000 to rely on session_state
+
+        if postcode_index is not None:
+            location_issues = postcode_index.validate(postCode, province, region, locality)
+            if 'postCode' in location_issues:
+                st.warning(f"⚠️ Code postal {postCode} inconnu")
+            else:
+                st.caption("📍 " + ", ".join(postcode_index.localities_for(postCode)[:5]))
+                for field, label in (('province', 'Province'), ('region', 'Région')):
+                    if field in location_issues:
+                        expected = location_issues[field]
+                        st.warning(f"⚠️ {label} attendue pour {postCode} : {en_to_fr.get(expected, expected)}")
+
+        # Localité mal orthographiée : ramenée vers une localité connue du modèle (sinon encodée comme inconnue)
+        if locality:
+            postcode_localities = postcode_index.localities_for(postCode) if postcode_index is not None else None
+            resolved_locality = locality_matcher.resolve(locality, postcode_localities=postcode_localities)
+            if resolved_locality is None:
+                suggestions = locality_matcher.suggest(locality, limit=3, postcode_localities=postcode_localities)
+                st.warning("⚠️ Localité inconnue du modèle"
+                           + (" - vouliez-vous dire : " + ", ".join(name for name, _ in suggestions) + " ?"
+                              if suggestions else ""))
+            else:
+                if resolved_locality != locality:
+                    st.caption(f"🔎 Localité reconnue : {resolved_locality}")
+                locality = resolved_locality
        
         floodZoneType_options = translate_with_prefix('NON_FLOOD_ZONE', 'RECOGNIZED_FLOOD_ZONE', 
                                  'POSSIBLE_FLOOD_ZONE', 'POSSIBLE_N_CIRCUMSCRIBED_FLOOD_ZONE', 
@@ -419,14 +509,15 @@ def main():
 
         predicted_price_value = immo_prediction(list_input_data)
 
-        # Afficher les résultats avec un effet visuel
-        with st.spinner("Analyse en cours..."):
-            import time
-            time.sleep(1)
+        # Afficher les résultats avec un effet visuel (désactivé en mode production)
+        if settings.SPINNER_DELAY_SECONDS > 0:
+            with st.spinner("Analyse en cours..."):
+                time.sleep(settings.SPINNER_DELAY_SECONDS)
 
         if isinstance(predicted_price_value, (int, float)):
             # STOCKER la prédiction dans session_state
             st.session_state.last_prediction = predicted_price_value
+            st.session_state.last_input_data = list_input_data
             
             # --- Mise en forme prix estimé ---
             wch_colour_box_rgb = "0,204,102"  # Vert 
@@ -436,6 +527,11 @@ def main():
             texte_prix = "Le prix du bien est estimé à : "
             prix_formate = f"{int(predicted_price_value):,.2f} €"
             message_principal = f"{texte_prix}<strong>{prix_formate}</strong>"
+            if interval_calibration is not None:
+                # Fourchette conforme : calcul immédiat à partir du prix prédit (même pour un prix en cache)
+                lower, upper = interval_calibration.interval([predicted_price_value], DEFAULT_LEVEL)
+                message_principal += (f"<br>Fourchette à {DEFAULT_LEVEL:.0%} : "
+                                      f"{int(lower[0]):,.2f} € - {int(upper[0]):,.2f} €")
 
             iconname = "fas fa-check-circle" # Ou un icône de succès
     
@@ -461,11 +557,23 @@ def main():
         else:
             st.error("La prédiction n'a pas pu être effectuée. Vérifiez les messages d'erreur ci-dessus.")
             st.session_state.last_prediction = None
+            st.session_state.last_input_data = None
+
+    # Analyse de sensibilité du dernier bien estimé
+    if st.session_state.get('last_input_data') is not None and st.checkbox("📈 Voir la sensibilité du prix"):
+        display_sensitivity_panel(st.session_state.last_input_data)
+
+    if st.session_state.get('last_input_data') is not None and st.checkbox("🔍 Pourquoi ce prix ?"):
+        display_explanation_panel(st.session_state.last_input_data)
 
+    if (comparables_index is not None and st.session_state.get('last_input_data') is not None
+            and st.checkbox("🏘️ Voir des biens comparables")):
+        display_comparables_panel(st.session_state.last_input_data)
    
     # Section feedback - toujours visible après une prédiction
     if 'last_prediction' in st.session_state and st.session_state.last_prediction is not None:
-        display_feedback_section(st.session_state.last_prediction)
+        display_feedback_section(st.session_state.last_prediction, model_entry.version,
+                                 st.session_state.get('last_input_data'))
 
 
     # --- DEBUG ---
@@ -484,6 +592,8 @@ def main():
 
 if __name__ == '__main__':
     main()
+    # Persiste en un seul round-trip les champs modifiés pendant cette exécution
+    load_cache.flush()
 
 
  
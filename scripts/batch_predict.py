@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Script de prédiction batch pour Immo Eliza
+Lit un fichier CSV ou Parquet d'annonces par morceaux, applique le même
+feature engineering que l'application et écrit les prix prédits au fil de l'eau
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.model_registry import get_model
+from src.explanations import CONTRIBUTION_PREFIX, get_explainer
+from src.geodata import add_coordinates, get_postcode_index
+from src.intervals import DEFAULT_LEVEL, get_interval_calibration
+from src.prediction import EXPECTED_COLUMNS_ORDER, predict_with_interval, prepare_frame
+
+PREDICTION_COLUMN = 'predicted_price'
+LOWER_COLUMN = 'predicted_price_lower'
+UPPER_COLUMN = 'predicted_price_upper'
+
+# Colonnes du dataset Kangaroo qui portent un autre nom dans l'application
+KANGAROO_ALIASES = {
+    'epcScore': 'epcNumeric',
+}
+
+
+def iter_chunks(input_path, chunksize):
+    """Itère sur le fichier d'entrée par blocs de `chunksize` lignes"""
+    if input_path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(input_path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunksize)
+
+
+class ChunkWriter:
+    """Écrit les résultats morceau par morceau (CSV ou Parquet)"""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.is_parquet = output_path.endswith('.parquet')
+        self._parquet_writer = None
+        self._header_written = False
+
+    def write(self, df):
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.output_path, mode='a' if self._header_written else 'w',
+                      header=not self._header_written, index=False)
+            self._header_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def prepare_chunk(chunk):
+    """
+    Sélectionne les features attendues, typées (src/schema.py), avec région + score PEB
+    (classes A++ ... G converties, scores PEB numériques de l'entrée conservés)
+    """
+    chunk = chunk.rename(columns={k: v for k, v in KANGAROO_ALIASES.items()
+                                  if k in chunk.columns and v not in chunk.columns})
+    missing = [col for col in EXPECTED_COLUMNS_ORDER if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans le fichier d'entrée : {missing}")
+
+    return chunk, prepare_frame(chunk)
+
+
+def run_batch(input_path, output_path, chunksize=10000, with_coordinates=False, interval_level=DEFAULT_LEVEL,
+              explain=False):
+    """Score tout le fichier et retourne le nombre de lignes traitées"""
+    model_entry = get_model(BASE_DIR)
+    print(f"✅ Modèle {model_entry.model_type} chargé en {model_entry.load_seconds:.2f} s "
+          f"(version {model_entry.version})")
+
+    # Fourchettes ajoutées seulement si le modèle a sa calibration (scripts/calibrate_intervals.py)
+    calibration = get_interval_calibration(model_entry)
+    if calibration is not None:
+        print(f"✅ Fourchettes à {interval_level:.0%} (calibration sur {calibration.n_calibration} biens)")
+
+    # Contributions par colonne (base_value + contrib_<colonne>), un appel par bloc
+    explainer = get_explainer(model_entry, BASE_DIR) if explain else None
+
+    postcode_index = get_postcode_index(BASE_DIR) if with_coordinates else None
+    if with_coordinates and postcode_index is None:
+        raise FileNotFoundError("Index des codes postaux absent, lancez scripts/build_postcode_index.py")
+
+    writer = ChunkWriter(output_path)
+    total_rows = 0
+    start = time.perf_counter()
+
+    try:
+        for chunk_index, chunk in enumerate(iter_chunks(input_path, chunksize)):
+            chunk_start = time.perf_counter()
+            original, features = prepare_chunk(chunk)
+            original = original.copy()
+            predictions, lower, upper = predict_with_interval(model_entry.model, model_entry.model_type, features,
+                                                              calibration, interval_level)
+            original[PREDICTION_COLUMN] = predictions
+            if calibration is not None:
+                original[LOWER_COLUMN] = lower
+                original[UPPER_COLUMN] = upper
+            if postcode_index is not None:
+                add_coordinates(original, postcode_index)
+            if explainer is not None:
+                explanation = explainer.explain(features).add_prefix(CONTRIBUTION_PREFIX)
+                original = pd.concat([original, explanation.set_axis(original.index)], axis=1)
+            writer.write(original)
+
+            chunk_seconds = time.perf_counter() - chunk_start
+            total_rows += len(original)
+            elapsed = time.perf_counter() - start
+            print(f"  📦 Bloc {chunk_index + 1}: {len(original)} lignes en {chunk_seconds:.2f} s "
+                  f"({len(original) / max(chunk_seconds, 1e-9):,.0f} lignes/s) - total {total_rows} "
+                  f"({total_rows / max(elapsed, 1e-9):,.0f} lignes/s)")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n🎉 {total_rows} biens estimés en {elapsed:.2f} s "
+          f"({total_rows / max(elapsed, 1e-9):,.0f} lignes/s) → {output_path}")
+    return total_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prédiction batch des prix Immo Eliza (CSV/Parquet)")
+    parser.add_argument('input', help="Fichier d'annonces (.csv ou .parquet)")
+    parser.add_argument('output', help="Fichier de sortie (.csv ou .parquet)")
+    parser.add_argument('--chunksize', type=int, default=10000, help="Nombre de lignes par bloc")
+    parser.add_argument('--interval-level', type=float, default=DEFAULT_LEVEL,
+                        help="Niveau de confiance des fourchettes (doit être calibré)")
+    parser.add_argument('--explain', action='store_true',
+                        help="Ajoute les contributions des features à chaque prédiction")
+    parser.add_argument('--with-coordinates', action='store_true',
+                        help="Ajoute latitude/longitude du code postal (index précalculé)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ Fichier non trouvé : {args.input}")
+        sys.exit(1)
+
+    print("🚀 Prédiction batch Immo Eliza")
+    print("=" * 40)
+    try:
+        run_batch(args.input, args.output, args.chunksize, args.with_coordinates, args.interval_level,
+                  args.explain)
+    except Exception as e:
+        print(f"❌ Erreur lors de la prédiction batch : {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark du suivi d'erreur du modèle (src/error_monitor.py)
+Flux de feedbacks synthétiques avec une dérive injectée sur une région : coût d'une mise
+à jour, taille de l'état (constante), précision des quantiles du t-digest par rapport au
+calcul exact, détection de la dérive, et redémarrage depuis l'état sauvegardé en base
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.error_monitor import DEFAULT_WINDOW, ErrorMonitor, TDigest
+from src.features import REGIONS
+from src.feedback_store import FeedbackStore
+
+
+def synthetic_feedbacks(n_rows, drift_after, seed=42):
+    """Erreur relative ~ N(0, 12 %) ; après `drift_after`, la Wallonie est surestimée de 25 %"""
+    rng = np.random.default_rng(seed)
+    regions = rng.choice(REGIONS, n_rows)
+    types = rng.choice(['HOUSE', 'APARTMENT'], n_rows)
+    actual = rng.lognormal(np.log(350_000), 0.4, n_rows)
+    ratio = 1 + rng.normal(0, 0.12, n_rows)
+    ratio[(np.arange(n_rows) >= drift_after) & (regions == 'Wallonia')] += 0.25
+    for i in range(n_rows):
+        yield {
+            'timestamp': datetime.now().isoformat(),
+            'rating': 3,
+            'predicted_price': float(actual[i] * ratio[i]),
+            'actual_price': float(actual[i]),
+            'region': str(regions[i]),
+            'type': str(types[i]),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du suivi d'erreur du modèle")
+    parser.add_argument('--feedbacks', type=int, default=200_000)
+    args = parser.parse_args()
+    drift_after = args.feedbacks - 3000
+
+    print(f"🚀 Suivi d'erreur sur {args.feedbacks:,} feedbacks (dérive Wallonie sur les 3 000 derniers)")
+    print("=" * 70)
+    feedbacks = list(synthetic_feedbacks(args.feedbacks, drift_after))
+
+    monitor = ErrorMonitor()
+    sizes = {}
+    start = time.perf_counter()
+    for i, feedback in enumerate(feedbacks, start=1):
+        monitor.update(feedback)
+        if i in (args.feedbacks // 100, args.feedbacks // 10, args.feedbacks):
+            sizes[i] = len(json.dumps(monitor.to_dict()))
+    update_us = (time.perf_counter() - start) / args.feedbacks * 1e6
+    print(f"⚡ Mise à jour : {update_us:.1f} µs par feedback ({len(monitor.segments)} segments)")
+    print("💾 État sérialisé : " + " · ".join(f"{n:,} fb → {size / 1000:.0f} Ko" for n, size in sizes.items()))
+
+    # Précision du t-digest : quantiles de l'erreur relative sur un flux complet
+    errors = np.array([abs(f['predicted_price'] - f['actual_price']) / f['actual_price'] for f in feedbacks])
+    digest = TDigest()
+    for value in errors:
+        digest.add(value)
+    print(f"\n{'quantile':<10} | {'exact':>8} | {'t-digest':>8} | {'écart (rang)':>12}")
+    print("-" * 50)
+    sorted_errors = np.sort(errors)
+    for q in (0.5, 0.9, 0.99):
+        estimate = digest.quantile(q)
+        rank_error = abs(np.searchsorted(sorted_errors, estimate) / len(errors) - q)
+        print(f"p{int(q * 100):<9} | {np.quantile(errors, q) * 100:>7.2f}% | {estimate * 100:>7.2f}% | "
+              f"{rank_error * 100:>11.3f}%")
+    print(f"   {len(digest.means)} centroïdes pour {len(errors):,} points")
+
+    print("\n📉 Segments (dérive = MAPE récente / MAPE depuis le début)")
+    for row in monitor.summary():
+        if row['kind'] in ('global', 'region'):
+            flag = '🚨' if row['drift_ratio'] > 1.5 else '✅'
+            print(f"   {flag} {row['kind']:<8} {row['segment']:<10} MAPE récente {row['mape'] * 100:5.1f}% · "
+                  f"biais {row['bias']:>+10,.0f} € · p90 {row['pct_error_p90'] * 100:5.1f}% · "
+                  f"dérive {row['drift_ratio']:.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = FeedbackStore(os.path.join(tmp_dir, 'feedbacks.sqlite3'))
+        store.add_many(feedbacks)
+        start = time.perf_counter()
+        ErrorMonitor.attach(store).save()
+        replay_s = time.perf_counter() - start
+        store.add_many(feedbacks[:DEFAULT_WINDOW])
+        restarted = FeedbackStore(store.path)
+        start = time.perf_counter()
+        resumed = ErrorMonitor.attach(restarted)
+        resume_ms = (time.perf_counter() - start) * 1000
+        status = '✅' if resumed.last_id == args.feedbacks + DEFAULT_WINDOW else '❌'
+        print(f"\n🔁 Première construction (relecture complète) : {replay_s:.1f} s · "
+              f"redémarrage depuis l'état sauvegardé + {DEFAULT_WINDOW} nouveaux feedbacks : {resume_ms:.0f} ms {status}")
+        store.close()
+        restarted.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark des explications (contributions TreeSHAP du LightGBM)
+Mesure la construction de l'explainer puis la latence d'explication par ligne,
+comparée à la prédiction seule, pour le pipeline joblib et le modèle compilé
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.benchmark_sensitivity import loaded_models
+from scripts.compile_model import COMPILED_MODEL_DIR, validation_frame
+from src.explanations import build_explainer
+from src.prediction import predict_frame
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des explications de prédiction")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(os.path.join(COMPILED_MODEL_DIR, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    print("🚀 Benchmark des explications")
+    print("=" * 76)
+    for model_entry in loaded_models():
+        start = time.perf_counter()
+        explainer = build_explainer(model_entry, BASE_DIR)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n📦 Modèle {model_entry.model_type} (explainer construit en {build_ms:.0f} ms)")
+        print(f"{'lignes':>8} | {'prédiction (ms)':>16} | {'explication (ms)':>17} | {'par ligne (ms)':>15}")
+        print("-" * 76)
+        for n_rows in args.sizes:
+            df = validation_frame(manifest, n_rows)
+            predict_s = best_of(lambda: predict_frame(model_entry.model, model_entry.model_type, df), args.repeats)
+            explain_s = best_of(lambda: explainer.explain(df), args.repeats)
+
+            # Contrôle : base + contributions = prix prédit
+            explanation = explainer.explain(df)
+            predictions = predict_frame(model_entry.model, model_entry.model_type, df)
+            exact = np.allclose(explanation.sum(axis=1).to_numpy(), predictions, rtol=1e-6)
+            print(f"{n_rows:>8} | {predict_s * 1000:>16.2f} | {explain_s * 1000:>17.2f} | "
+                  f"{explain_s * 1000 / n_rows:>15.4f} {'✅' if exact else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la base locale des feedbacks (src/feedback_store.py)
+Remplit une base temporaire (1M feedbacks par défaut, sur un an et plusieurs versions
+du modèle), puis mesure : insertion en masse, latence d'un feedback unitaire,
+statistiques par fenêtre de temps et lecture du lot à exporter. Comparaison avec le
+calcul précédent (toutes les lignes relues et moyennées en Python, comme get_all_values)
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.feedback_store import FeedbackStore
+
+MODEL_VERSIONS = ['3f2a9c1b7d40', '8e1c55a0b2f9', 'c47d0e93a1b6']
+
+
+def synthetic_entries(n_rows, start_index=0, days=365, seed=42):
+    """Feedbacks répartis sur `days` jours jusqu'à aujourd'hui, prix réel connu une fois sur trois"""
+    rng = np.random.default_rng(seed + start_index)
+    now = datetime.now()
+    offsets = np.sort(rng.uniform(0, days * 86400, n_rows))[::-1]
+    ratings = rng.integers(1, 6, n_rows)
+    predicted = rng.uniform(100_000, 900_000, n_rows)
+    actual = predicted * rng.normal(1.0, 0.15, n_rows)
+    for i in range(n_rows):
+        yield {
+            'timestamp': (now - timedelta(seconds=float(offsets[i]))).isoformat(),
+            'rating': int(ratings[i]),
+            'comment': "",
+            'predicted_price': float(predicted[i]),
+            'actual_price': float(actual[i]) if i % 3 == 0 else None,
+            'model_version': MODEL_VERSIONS[(start_index + i) % len(MODEL_VERSIONS)],
+        }
+
+
+def python_average(store):
+    """Ancien calcul : toutes les lignes relues puis moyennées en Python"""
+    rows = store._connection().execute('SELECT timestamp, rating, comment, predicted_price, actual_price '
+                                       'FROM feedbacks').fetchall()
+    ratings = [float(row[1]) for row in rows if row[1]]
+    return len(ratings), sum(ratings) / len(ratings)
+
+
+def timed_ms(func, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la base locale des feedbacks")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk', type=int, default=50_000, help="Feedbacks par transaction au remplissage")
+    parser.add_argument('--single', type=int, default=1000, help="Feedbacks unitaires pour la latence")
+    args = parser.parse_args()
+
+    print(f"🚀 Benchmark de la base des feedbacks ({args.rows:,} lignes)")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'feedbacks.sqlite3')
+        store = FeedbackStore(path)
+
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.chunk):
+            store.add_many(synthetic_entries(min(args.chunk, args.rows - offset), start_index=offset))
+        fill_s = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir)) / 1e6
+        print(f"📥 Remplissage : {fill_s:.1f} s ({args.rows / fill_s:,.0f} feedbacks/s), base de {size_mb:.0f} MB")
+
+        latencies = []
+        for entry in synthetic_entries(args.single, start_index=args.rows, days=1):
+            start = time.perf_counter()
+            store.add(entry)
+            latencies.append(time.perf_counter() - start)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"✍️  Feedback unitaire (transaction WAL) : p50 {p50:.3f} ms · p99 {p99:.3f} ms")
+
+        print(f"\n{'requête':<48} | {'temps (ms)':>10} | résultat")
+        print("-" * 70)
+        today = date.today()
+        queries = {
+            'stats depuis le début (agrégats)': lambda: store.stats(),
+            'stats 30 derniers jours (agrégats)': lambda: store.stats(days=30),
+            'stats 7 jours, une version (agrégats)': lambda: store.stats(days=7, model_version=MODEL_VERSIONS[0]),
+            'stats dernière heure (index timestamp)':
+                lambda: store.window_stats(datetime.now() - timedelta(hours=1)),
+            'stats 24 h, une version (index version)':
+                lambda: store.window_stats(datetime.now() - timedelta(days=1), model_version=MODEL_VERSIONS[1]),
+            'série journalière 90 jours': lambda: len(store.daily_stats(days=90, today=today)),
+            '500 feedbacks à exporter': lambda: len(store.unsynced(limit=500)),
+            '100 derniers feedbacks': lambda: len(store.recent(limit=100)),
+            'avant : moyenne en Python sur toutes les lignes': lambda: python_average(store),
+        }
+        for label, query in queries.items():
+            repeats = 1 if label.startswith('avant') else 5
+            elapsed_ms, result = timed_ms(query, repeats)
+            if isinstance(result, dict):
+                mae = f"{result['mae']:,.0f} €" if result['mae'] is not None else '-'
+                result = f"{result['total_feedback']:,} fb · MAE {mae}"
+            elif isinstance(result, tuple):
+                result = f"{result[0]:,} fb · note {result[1]:.2f}"
+            print(f"{label:<48} | {elapsed_ms:>10.2f} | {result}")
+
+        stats = store.stats()
+        check = python_average(store)
+        status = '✅' if stats['total_feedback'] == check[0] and abs(stats['average_rating'] - check[1]) < 1e-9 else '❌'
+        print(f"\n{status} agrégats identiques au recalcul complet "
+              f"({stats['total_feedback']:,} feedbacks, note moyenne {stats['average_rating']:.4f})")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
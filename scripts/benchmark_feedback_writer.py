@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'écriture des feedbacks en CSV local
+Compare l'ancienne méthode (lecture complète + concat + réécriture) avec
+l'écriture en ajout seul, sur des fichiers de plus en plus gros
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.feedback_writer import FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER, CsvAppendWriter
+
+
+def make_entry(i):
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'rating': i % 5 + 1,
+        'comment': "Estimation cohérente avec le marché",
+        'predicted_price': 250000.0 + i,
+        'actual_price': None if i % 3 else 260000.0,
+    }
+
+
+def legacy_save(csv_file, feedback_entry):
+    # Ancienne version de _save_feedback_to_local_csv
+    if os.path.exists(csv_file):
+        df = pd.read_csv(csv_file)
+        df = pd.concat([df, pd.DataFrame([feedback_entry])], ignore_index=True)
+    else:
+        df = pd.DataFrame([feedback_entry])
+    df.to_csv(csv_file, index=False)
+
+
+def prefill(path, n_rows):
+    """Crée un fichier de feedbacks existant de n_rows lignes"""
+    if os.path.exists(path):
+        os.remove(path)
+    writer = CsvAppendWriter(path, fsync=FSYNC_NEVER)
+    batch = [make_entry(i) for i in range(10000)]
+    for _ in range(n_rows // len(batch)):
+        writer.append_many(batch)
+    writer.append_many(batch[:n_rows % len(batch)])
+
+
+def per_write_ms(write, writes):
+    latencies = []
+    for i in range(writes):
+        start = time.perf_counter()
+        write(make_entry(i))
+        latencies.append(time.perf_counter() - start)
+    return np.median(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'écriture des feedbacks CSV")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 200000])
+    parser.add_argument('--writes', type=int, default=20, help="Écritures mesurées par taille")
+    parser.add_argument('--legacy-writes', type=int, default=3)
+    args = parser.parse_args()
+    # pandas signale le concat avec colonnes vides de l'ancienne version
+    warnings.simplefilter('ignore', FutureWarning)
+
+    print("🚀 Benchmark de l'écriture des feedbacks")
+    print("=" * 80)
+    print(f"{'lignes':>8} | {'réécriture (ms)':>16} | {'ajout never':>12} | {'ajout interval':>14} | {'ajout always':>13}")
+    print("-" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'feedbacks.csv')
+        for n_rows in args.sizes:
+            prefill(path, n_rows)
+            legacy = per_write_ms(lambda entry: legacy_save(path, entry), args.legacy_writes)
+
+            results = []
+            for policy in (FSYNC_NEVER, FSYNC_INTERVAL, FSYNC_ALWAYS):
+                prefill(path, n_rows)
+                writer = CsvAppendWriter(path, fsync=policy)
+                results.append(per_write_ms(writer.append, args.writes))
+
+            print(f"{n_rows:>8} | {legacy:>16.2f} | {results[0]:>12.3f} | {results[1]:>14.3f} | {results[2]:>13.3f}")
+
+        # Vérification : le fichier reste lisible avec un seul en-tête
+        df = pd.read_csv(path)
+        print(f"\n✅ Fichier final relu par pandas : {len(df)} lignes, colonnes {df.columns.tolist()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark du chemin de prédiction avant / après le mode production
+Avant : prints des colonnes et de df.head() à chaque appel + pause d'une seconde
+Après : logs structurés filtrés par niveau et échantillonnés, sans pause
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.logging_config import get_logger
+from src.model_registry import get_model
+from src.prediction import predict_frame, prepare_input_frame
+
+SAMPLE_ROW = ['HOUSE', 3, 1, 'Brussels', 'Bruxelles', 1000, 150, 'GOOD', 1990, 2, 'NON_FLOOD_ZONE',
+              'GAS', 'INSTALLED', 200, True, 50, 1, False, False, True, 'STANDARD_HOUSE', 2, 0,
+              'Bruxelles', 'B']
+
+
+def before(model_entry, sleep_seconds, stdout):
+    df_input_data = prepare_input_frame([SAMPLE_ROW])
+    print("Colonnes de df_input_data:", df_input_data.columns.tolist(), file=stdout)
+    print("Nombre de colonnes de df_input_data:", len(df_input_data.columns), file=stdout)
+    print("Première ligne de df_input_data:\n", df_input_data.head(), file=stdout)
+    predicted = predict_frame(model_entry.model, model_entry.model_type, df_input_data)[0]
+    time.sleep(sleep_seconds)
+    return predicted
+
+
+def after(model_entry, logger):
+    df_input_data = prepare_input_frame([SAMPLE_ROW])
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("prediction_input", extra={'fields': {
+            'columns': df_input_data.columns.tolist(),
+            'first_row': df_input_data.iloc[0].to_dict(),
+        }})
+    return predict_frame(model_entry.model, model_entry.model_type, df_input_data)[0]
+
+
+def measure(func, iterations):
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du chemin de prédiction (avant/après mode production)")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--sleep', type=float, default=1.0, help="Pause de l'ancienne version (secondes)")
+    args = parser.parse_args()
+
+    model_entry = get_model(BASE_DIR)
+    logger = get_logger('benchmark')
+
+    print("🚀 Benchmark du chemin de prédiction")
+    print("=" * 50)
+    # Échauffement (premières allocations du modèle)
+    after(model_entry, logger)
+
+    with open(os.devnull, 'w') as devnull:
+        before_p50, before_p95 = measure(lambda: before(model_entry, args.sleep, devnull), args.iterations)
+        prints_p50, prints_p95 = measure(lambda: before(model_entry, 0, devnull), args.iterations)
+    after_p50, after_p95 = measure(lambda: after(model_entry, logger), args.iterations)
+
+    print(f"  ⏱️  Avant (prints + pause {args.sleep}s)    : p50 {before_p50:8.1f} ms | p95 {before_p95:8.1f} ms")
+    print(f"  ⏱️  Avant sans pause (prints seuls) : p50 {prints_p50:8.1f} ms | p95 {prints_p95:8.1f} ms")
+    print(f"  ⚡ Après (mode production)          : p50 {after_p50:8.1f} ms | p95 {after_p95:8.1f} ms")
+    print(f"\n📊 Gain p50 : {before_p50 - after_p50:.1f} ms par prédiction")
+
+
+if __name__ == "__main__":
+    main()
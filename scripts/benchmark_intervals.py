@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark du surcoût des fourchettes de prix
+Compare le temps de la prédiction ponctuelle avec celui du calcul des fourchettes
+(quantiles conformes appliqués aux prix prédits) pour différentes tailles de lot
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.compile_model import COMPILED_MODEL_DIR, validation_frame
+from src.intervals import DEFAULT_LEVEL, IntervalCalibration, get_interval_calibration
+from src.model_registry import get_model
+from src.prediction import predict_frame
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du surcoût des fourchettes de prix")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    print("🚀 Benchmark des fourchettes de prix")
+    print("=" * 64)
+    model_entry = get_model(BASE_DIR)
+    manifest_path = os.path.join(COMPILED_MODEL_DIR, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        print("❌ Lancez d'abord scripts/compile_model.py (données synthétiques du benchmark)")
+        sys.exit(1)
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    calibration = get_interval_calibration(model_entry)
+    if calibration is None:
+        # Sans artefact : calibration fictive, seul le temps de calcul est mesuré ici
+        rng = np.random.default_rng(0)
+        y_pred = rng.uniform(1e5, 1e6, 5000)
+        calibration = IntervalCalibration.fit(y_pred * np.exp(rng.normal(0, 0.25, len(y_pred))), y_pred)
+        print("ℹ️  Pas de calibration sur disque : calibration synthétique")
+
+    print(f"Modèle {model_entry.model_type}\n")
+    print(f"{'lignes':>8} | {'prédiction (ms)':>16} | {'fourchettes (ms)':>17} | {'surcoût':>8}")
+    print("-" * 64)
+    for n_rows in args.sizes:
+        df = validation_frame(manifest, n_rows)
+        predictions = predict_frame(model_entry.model, model_entry.model_type, df)
+        predict_s = best_of(lambda: predict_frame(model_entry.model, model_entry.model_type, df), args.repeats)
+        interval_s = best_of(lambda: calibration.interval(predictions, DEFAULT_LEVEL), args.repeats)
+        print(f"{n_rows:>8} | {predict_s * 1000:>16.3f} | {interval_s * 1000:>17.4f} | {interval_s / predict_s:>8.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la persistance du formulaire dans le local storage du navigateur
+Compare l'ancien accès clé par clé avec l'état sérialisé sous une seule clé.
+Chaque écriture (et le montage du composant) est un aller-retour navigateur, simulé
+ici par une latence configurable : le temps mesuré est le coût ajouté au rendu de la page
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import streamlit as st
+
+from src.local_storage import LocalStorageWrapper
+
+
+class FakeLocalStorage:
+    """Imite streamlit_local_storage.LocalStorage : lecture en mémoire, écriture = round-trip"""
+
+    def __init__(self, browser_items, round_trip_seconds):
+        self.browser_items = browser_items
+        self.round_trip_seconds = round_trip_seconds
+        self.round_trips = 0
+        self._round_trip()  # montage du composant (getAll)
+        self.storedItems = dict(browser_items)
+
+    def _round_trip(self):
+        self.round_trips += 1
+        time.sleep(self.round_trip_seconds)
+
+    def getItem(self, item_key):
+        return self.storedItems.get(item_key)
+
+    def setItem(self, item_key, item_value, key='set'):
+        # Comme le vrai composant : les valeurs vides ne sont pas envoyées
+        if item_value is None or item_value == "":
+            return
+        self._round_trip()
+        self.browser_items[item_key] = item_value
+        self.storedItems[item_key] = item_value
+
+
+def legacy_page(wrapper, changed_keys):
+    """Ancien chargement de app.py : initialize_state, get_all_items, get par clé, set par callback"""
+    for key_suffix, default_value in wrapper.default_session_values.items():
+        if wrapper.get(key_suffix) is None:
+            wrapper.set(key_suffix, default_value)
+    wrapper.get_all_items = lambda: {key: wrapper.get(key) for key in wrapper.default_session_values}
+    wrapper.get_all_items()
+    for key_suffix in wrapper.default_session_values:
+        wrapper.get(key_suffix)
+    for key_suffix in changed_keys:
+        wrapper.set(key_suffix, st.session_state[key_suffix])
+
+
+def bulk_page(wrapper, changed_keys):
+    """Nouveau chargement : une lecture de l'état, écriture groupée des champs modifiés"""
+    wrapper.initialize_state()
+    for key_suffix in changed_keys:
+        wrapper.mark_dirty(key_suffix)
+    wrapper.flush()
+
+
+def run(page, browser_items, changed_keys, round_trip_seconds):
+    start = time.perf_counter()
+    storage = FakeLocalStorage(browser_items, round_trip_seconds)
+    page(LocalStorageWrapper(storage=storage), changed_keys)
+    return (time.perf_counter() - start) * 1000, storage.round_trips
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des accès au local storage")
+    parser.add_argument('--round-trip-ms', type=float, default=30.0, help="Latence simulée d'un aller-retour composant")
+    args = parser.parse_args()
+    round_trip_seconds = args.round_trip_ms / 1000
+    # st.session_state hors `streamlit run` (mode bare) : avertissements sans intérêt ici
+    warnings.simplefilter('ignore')
+
+    defaults = LocalStorageWrapper(storage=FakeLocalStorage({}, 0)).default_session_values
+    for key_suffix, value in defaults.items():
+        st.session_state[key_suffix] = value
+    st.session_state['bedroomCount_key'] = 3
+    st.session_state['type_key'] = 'HOUSE'
+    st.session_state['apartment_floor_key'] = 0
+
+    print("🚀 Benchmark du local storage")
+    print(f"   (aller-retour composant simulé : {args.round_trip_ms:.0f} ms)")
+    print("=" * 72)
+    print(f"{'scénario':<30} | {'avant (ms)':>10} | {'RT':>3} | {'après (ms)':>10} | {'RT':>3}")
+    print("-" * 72)
+
+    legacy_browser, bulk_browser = {}, {}
+    scenarios = [
+        ("première visite", []),
+        ("visite suivante", []),
+        ("modification d'un champ", ['bedroomCount_key']),
+        ("changement de type (3 champs)", ['type_key', 'apartment_floor_key', 'building_floors_key']),
+    ]
+    for label, changed_keys in scenarios:
+        legacy_ms, legacy_rt = run(legacy_page, legacy_browser, changed_keys, round_trip_seconds)
+        bulk_ms, bulk_rt = run(bulk_page, bulk_browser, changed_keys, round_trip_seconds)
+        print(f"{label:<30} | {legacy_ms:>10.1f} | {legacy_rt:>3} | {bulk_ms:>10.1f} | {bulk_rt:>3}")
+
+    print(f"\n✅ Clés stockées dans le navigateur : avant {len(legacy_browser)}, après {len(bulk_browser)}")
+
+
+if __name__ == "__main__":
+    main()
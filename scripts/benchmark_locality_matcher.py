@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la correspondance approximative des localités
+Construit l'index sur toutes les localités connues du modèle, introduit une faute de
+frappe dans chacune puis mesure la latence et le taux de résolution vers la bonne
+localité. Comparaison avec difflib (recherche exhaustive) sur un échantillon.
+"""
+
+import argparse
+import difflib
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.locality_matcher import LocalityMatcher, model_localities, normalize
+from src.metrics import LatencyRecorder
+from src.model_registry import get_model
+
+
+def misspell(text, rng):
+    """Une faute de frappe : suppression, substitution, transposition ou casse/accents"""
+    if len(text) < 4:
+        return text.lower()
+    i = int(rng.integers(1, len(text) - 1))
+    kind = rng.integers(4)
+    if kind == 0:
+        return text[:i] + text[i + 1:]
+    if kind == 1:
+        return text[:i] + 'aeiou'[int(rng.integers(5))] + text[i + 1:]
+    if kind == 2:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return normalize(text).upper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la correspondance des localités")
+    parser.add_argument('--difflib-sample', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    print("🚀 Benchmark de la correspondance des localités")
+    print("=" * 60)
+    model_entry = get_model(BASE_DIR)
+    localities = model_localities(model_entry.model, model_entry.model_type)
+
+    start = time.perf_counter()
+    matcher = LocalityMatcher(localities)
+    print(f"✅ Index construit en {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(localities)} localités, {len(matcher.names)} formes normalisées)")
+
+    queries = [(locality, misspell(locality, rng)) for locality in localities]
+    latencies = LatencyRecorder(window=len(queries))
+    resolved, correct = 0, 0
+    for expected, query in queries:
+        start = time.perf_counter()
+        result = matcher.resolve(query)
+        latencies.record(time.perf_counter() - start)
+        if result is not None:
+            resolved += 1
+            correct += normalize(result) == normalize(expected)
+
+    summary = latencies.summary()
+    print(f"\n⚡ Index trigrammes ({len(queries)} saisies avec faute) :")
+    print(f"   p50 {summary['p50_ms']:.3f} ms · p99 {summary['p99_ms']:.3f} ms")
+    print(f"   résolues {resolved / len(queries):.1%} · correctes {correct / len(queries):.1%} "
+          f"(précision {correct / max(resolved, 1):.1%})")
+    print(f"   sans correction : {sum(q in matcher._exact for _, q in queries) / len(queries):.1%} "
+          f"des saisies reconnues par le modèle")
+
+    sample = [queries[i] for i in rng.choice(len(queries), min(args.difflib_sample, len(queries)), replace=False)]
+    start = time.perf_counter()
+    difflib_correct = 0
+    for expected, query in sample:
+        match = difflib.get_close_matches(query, localities, n=1, cutoff=0.6)
+        difflib_correct += bool(match) and normalize(match[0]) == normalize(expected)
+    difflib_ms = (time.perf_counter() - start) * 1000 / len(sample)
+    print(f"\n🐢 difflib ({len(sample)} saisies) : {difflib_ms:.2f} ms par saisie, "
+          f"correctes {difflib_correct / len(sample):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la répartition du trafic entre modèles (src/model_router.py)
+Registre temporaire champion (joblib) / challenger (compilé, aussi évalué en ombre) :
+fidélité de la répartition aux parts du manifest, stabilité de l'affectation d'une session,
+latence servie avec et sans évaluation en ombre, et statistiques par modèle
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.benchmark_sensitivity import BASE_ROW
+from src.compiled_model import MANIFEST_NAME
+from src.model_registry import (COMPILED_DIR_NAME, MODEL_BASENAME, MODEL_DIR_NAME, ModelRegistry, ModelSpec,
+                                registry_manifest_path, write_manifest)
+from src.model_router import ModelRouter, assign_model
+
+
+def served_latencies(router, model_entry, rows, n_requests):
+    latencies = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        router.predict(model_entry, rows)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la répartition du trafic entre modèles")
+    parser.add_argument('--sessions', type=int, default=100_000)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--challenger-share', type=float, default=0.1)
+    args = parser.parse_args()
+
+    model_dir = os.path.join(BASE_DIR, MODEL_DIR_NAME)
+    champion_path = os.path.join(model_dir, f'{MODEL_BASENAME}.joblib')
+    challenger_path = os.path.join(model_dir, COMPILED_DIR_NAME, MANIFEST_NAME)
+    if not (os.path.exists(champion_path) and os.path.exists(challenger_path)):
+        print("❌ Il faut le pipeline joblib et sa version compilée (scripts/compile_model.py)")
+        sys.exit(1)
+
+    print(f"🚀 Routage champion / challenger ({args.challenger_share:.0%} du trafic au challenger)")
+    print("=" * 70)
+
+    # Répartition : proportion de sessions par modèle et stabilité de l'affectation
+    traffic = {'champion': 1 - args.challenger_share, 'challenger': args.challenger_share}
+    start = time.perf_counter()
+    assigned = [assign_model(f'session-{i}', traffic) for i in range(args.sessions)]
+    assign_us = (time.perf_counter() - start) / args.sessions * 1e6
+    share = assigned.count('challenger') / args.sessions
+    stderr = np.sqrt(args.challenger_share * (1 - args.challenger_share) / args.sessions)
+    stable = all(assign_model(f'session-{i}', traffic) == assigned[i] for i in range(0, args.sessions, 97))
+    status = '✅' if abs(share - args.challenger_share) < 4 * stderr else '❌'
+    print(f"🎲 {args.sessions:,} sessions : {share:.2%} au challenger (attendu {args.challenger_share:.0%}) {status} · "
+          f"{assign_us:.1f} µs par affectation · affectation stable {'✅' if stable else '❌'}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manifest_path = registry_manifest_path(tmp_dir)
+        specs = [ModelSpec('champion', champion_path, 'joblib', traffic=traffic['champion']),
+                 ModelSpec('challenger', challenger_path, 'compiled', traffic=traffic['challenger'], shadow=True)]
+        write_manifest(manifest_path, specs)
+
+        start = time.perf_counter()
+        router = ModelRouter(tmp_dir, ModelRegistry())
+        models = router.models()
+        print(f"📦 {len(models)} modèles chargés en {time.perf_counter() - start:.2f} s")
+        champion = models['champion']
+
+        # Latence servie sans modèle ombre (manifest sans ombre), puis avec
+        specs[1].shadow = False
+        write_manifest(manifest_path, specs)
+        os.utime(manifest_path, ns=(time.time_ns(), time.time_ns() + 1))
+        served_latencies(router, champion, [BASE_ROW], 20)
+        without_shadow = served_latencies(router, champion, [BASE_ROW], args.requests)
+
+        specs[1].shadow = True
+        write_manifest(manifest_path, specs)
+        os.utime(manifest_path, ns=(time.time_ns(), time.time_ns() + 2))
+        with_shadow = served_latencies(router, champion, [BASE_ROW], args.requests)
+        start = time.perf_counter()
+        router.flush()
+        drain_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n{'latence servie':<22} | {'p50':>8} | {'p95':>8}")
+        print("-" * 44)
+        for label, latencies in (("sans ombre", without_shadow), ("avec ombre", with_shadow)):
+            print(f"{label:<22} | {np.percentile(latencies, 50):>6.2f}ms | {np.percentile(latencies, 95):>6.2f}ms")
+        print(f"   File d'ombre vidée {drain_ms:.0f} ms après la dernière réponse")
+
+        print("\n📊 Statistiques par modèle")
+        for row in router.metrics()['models']:
+            served = row['served_latency']['p50_ms']
+            shadow = row['shadow_latency']['p50_ms']
+            diff = row['shadow_abs_pct_diff']
+            print(f"   {row['name']:<11} trafic {row['traffic']:.0%} · servies {row['served']:>5} "
+                  f"(p50 {served if served is not None else '-'} ms) · en ombre {row['shadowed']:>5} "
+                  f"(p50 {shadow if shadow is not None else '-'} ms) · écart au servi "
+                  f"{'-' if diff is None else f'{diff:.4%}'}")
+        router.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark du journal des prédictions et du job de dérive
+Coût de `record` sur le thread de la requête, débit d'écriture en arrière-plan, taille
+sur disque par prédiction, puis job de dérive à froid et avec les comptages en cache,
+sur des biens synthétiques dont la surface habitable a été décalée (dérive attendue)
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.drift import build_reference, drift_report, file_histograms, sum_counts
+from src.features import EPC_CLASSES
+from src.prediction import EXPECTED_COLUMNS_ORDER, prepare_frame
+from src.prediction_log import PredictionLog, completed_log_files
+from src.schema import BOOLEAN_COLUMNS, CATEGORIES
+
+NUMERIC_RANGES = {
+    'bedroomCount': (1, 6), 'bathroomCount': (1, 3), 'postCode': (1000, 9999),
+    'habitableSurface': (50, 300), 'buildingConstructionYear': (1900, 2024), 'facedeCount': (1, 4),
+    'landSurface': (0, 1500), 'gardenSurface': (0, 800), 'toiletCount': (1, 3),
+    'building_floors': (1, 4), 'apartment_floor': (0, 6),
+}
+
+
+def synthetic_frame(n_rows, surface_shift=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col in EXPECTED_COLUMNS_ORDER:
+        if col in CATEGORIES:
+            data[col] = rng.choice(CATEGORIES[col], n_rows)
+        elif col in NUMERIC_RANGES:
+            low, high = NUMERIC_RANGES[col]
+            data[col] = rng.integers(low, high + 1, n_rows).astype(float)
+        elif col in BOOLEAN_COLUMNS:
+            data[col] = rng.random(n_rows) < 0.4
+        elif col == 'epcNumeric':
+            data[col] = rng.choice(EPC_CLASSES, n_rows)
+        else:
+            data[col] = rng.choice(['Bruxelles', 'Gent', 'Liège', 'Namur', 'Antwerpen'], n_rows)
+    data['habitableSurface'] = data['habitableSurface'] * surface_shift
+    return pd.DataFrame(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du journal des prédictions")
+    parser.add_argument('--predictions', type=int, default=200_000)
+    parser.add_argument('--max-rows', type=int, default=50_000, help="Lignes par fichier avant rotation")
+    args = parser.parse_args()
+
+    print(f"🚀 Journal des prédictions ({args.predictions:,} prédictions unitaires)")
+    print("=" * 70)
+    logged = synthetic_frame(args.predictions, surface_shift=1.4, seed=1)
+    rows = logged.astype(object).values.tolist()
+    predictions = np.random.default_rng(2).uniform(150_000, 900_000, args.predictions).tolist()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prediction_log = PredictionLog(tmp_dir, max_rows=args.max_rows)
+        record_times = []
+        start = time.perf_counter()
+        for row, prediction in zip(rows, predictions):
+            call_start = time.perf_counter()
+            prediction_log.record([row], [prediction], 'c47d0e93a1b6', 12.5)
+            record_times.append(time.perf_counter() - call_start)
+        submit_s = time.perf_counter() - start
+        prediction_log.flush()
+        total_s = time.perf_counter() - start
+        prediction_log.stop()
+
+        p50, p99 = np.percentile(record_times, [50, 99]) * 1e6
+        paths = completed_log_files(tmp_dir)
+        size = sum(os.path.getsize(path) for path in paths)
+        metrics = prediction_log.metrics()
+        print(f"⚡ record() sur le thread de la requête : p50 {p50:.1f} µs · p99 {p99:.1f} µs "
+              f"({submit_s:.1f} s pour tout soumettre)")
+        print(f"💾 Écriture en arrière-plan : {args.predictions / total_s:,.0f} prédictions/s · "
+              f"{metrics['flushes']} lots · {len(paths)} fichiers · {size / 1e6:.1f} MB "
+              f"({size / args.predictions:.0f} octets/prédiction)")
+        check = pd.read_parquet(paths)
+        status = '✅' if len(check) == args.predictions else '❌'
+        print(f"   {status} {len(check):,} lignes relues, {len(check.columns)} colonnes")
+
+        reference = build_reference(prepare_frame(synthetic_frame(100_000, seed=3)))
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            counts = sum_counts([file_histograms(reference, path) for path in paths])
+            report = drift_report(reference, counts)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"\n📊 Job de dérive : {timings[0]:.0f} ms à froid · {timings[1]:.1f} ms avec les comptages en cache")
+        for row in report[:4]:
+            print(f"   {row['feature']:<26} PSI {row['psi']:.3f} ({row['status']})")
+        drifted = [row['feature'] for row in report if row['status'] == 'drift']
+        print(f"   {'✅' if drifted == ['habitableSurface'] else '❌'} dérive détectée sur : {', '.join(drifted)}")
+
+
+if __name__ == "__main__":
+    main()
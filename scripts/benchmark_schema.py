@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark du schéma de types (src/schema.py)
+Compare le dataset nettoyé typé (catégories, entiers courts, float32) à sa version
+object/float64 : mémoire, taille et temps de lecture Parquet, débit de prédiction
+en batch (prédictions identiques vérifiées) et latence d'une prédiction unitaire
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.benchmark_sensitivity import BASE_ROW, loaded_models
+from src.cleaning import TARGET, clean_dataset
+from src.prediction import EXPECTED_COLUMNS_ORDER, predict_frame, prepare_input_frame
+from src.schema import memory_bytes
+
+DATASET_PATH = os.path.join(BASE_DIR, 'data', 'Kangaroo_cleaned_deployement.csv')
+
+
+def untyped_frame(df):
+    """Même contenu en object/float64 (types produits avant le schéma)"""
+    converted = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            converted[column] = series
+        elif pd.api.types.is_numeric_dtype(series):
+            converted[column] = series.astype('float64')
+        else:
+            converted[column] = series.astype(object).where(series.notna(), None)
+    return pd.DataFrame(converted, index=df.index)
+
+
+def best_time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du schéma de types")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="Dataset brut ou nettoyé (CSV ou Parquet)")
+    parser.add_argument('--batch-rows', type=int, default=50000, help="Lignes scorées pour le débit batch")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print("🚀 Benchmark du schéma de types")
+    print("=" * 70)
+    if not os.path.exists(args.dataset):
+        print(f"❌ Erreur : le fichier '{args.dataset}' n'existe pas !")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        typed, _, _ = clean_dataset(args.dataset, os.path.join(tmp_dir, 'cache'), use_cache=False)
+        frames = {'object/float64': untyped_frame(typed), 'schéma': typed}
+
+        print(f"\n📊 Dataset nettoyé : {len(typed)} biens")
+        print(f"{'types':<16} | {'mémoire (Mo)':>12} | {'Parquet (Ko)':>12} | {'lecture (ms)':>12}")
+        print("-" * 70)
+        for name, df in frames.items():
+            path = os.path.join(tmp_dir, f'{len(os.listdir(tmp_dir))}.parquet')
+            df.to_parquet(path, index=False)
+            read_s = best_time(lambda: pd.read_parquet(path), args.repeats)
+            print(f"{name:<16} | {memory_bytes(df) / 1e6:>12.1f} | {os.path.getsize(path) / 1e3:>12.0f} | "
+                  f"{read_s * 1000:>12.1f}")
+
+    features = {name: df.drop(columns=[TARGET]).iloc[:args.batch_rows] for name, df in frames.items()}
+    n_rows = len(features['schéma'])
+    for model_entry in loaded_models():
+        print(f"\n📦 Modèle {model_entry.model_type} ({n_rows} lignes en batch)")
+        predictions = {}
+        for name, df in features.items():
+            df = df[EXPECTED_COLUMNS_ORDER]
+            predictions[name] = predict_frame(model_entry.model, model_entry.model_type, df)
+            batch_s = best_time(lambda: predict_frame(model_entry.model, model_entry.model_type, df), args.repeats)
+            print(f"   {name:<16} {n_rows / batch_s:>10,.0f} lignes/s")
+        max_diff = float(np.max(np.abs(predictions['schéma'] - predictions['object/float64']), initial=0.0))
+        print(f"   {'✅' if max_diff == 0 else '❌'} écart maximal des prédictions : {max_diff:.6f} €")
+
+        single_s = best_time(lambda: predict_frame(model_entry.model, model_entry.model_type,
+                                                   prepare_input_frame([BASE_ROW])), args.repeats * 10)
+        print(f"   ⏱️  prédiction unitaire (préparation comprise) : {single_s * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
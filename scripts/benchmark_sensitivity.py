@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'analyse de sensibilité
+Temps pour estimer une grille de variantes en un seul predict (froid et depuis le cache),
+comparé au coût de la même exploration en prédictions unitaires successives
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.compiled_model import MANIFEST_NAME
+from src.model_registry import COMPILED_DIR_NAME, MODEL_BASENAME, MODEL_DIR_NAME, registry
+from src.prediction import predict_frame, prepare_input_frame
+from src.prediction_cache import PredictionCache
+from src.sensitivity import SERIES_VALUES, TARGET_LATENCY_MS, sensitivity_grid
+
+BASE_ROW = ['HOUSE', 3, 1, 'Brussels', 'Bruxelles', 1000, 150, 'GOOD', 1990, 2, 'NON_FLOOD_ZONE',
+            'GAS', 'INSTALLED', 200, True, 50, 1, False, False, True, 'STANDARD_HOUSE', 2, 0,
+            'Bruxelles', 'B']
+
+
+def loaded_models():
+    model_dir = os.path.join(BASE_DIR, MODEL_DIR_NAME)
+    candidates = [
+        (os.path.join(model_dir, f'{MODEL_BASENAME}.joblib'), 'joblib'),
+        (os.path.join(model_dir, COMPILED_DIR_NAME, MANIFEST_NAME), 'compiled'),
+    ]
+    return [registry.get(path, model_type) for path, model_type in candidates if os.path.exists(path)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse de sensibilité")
+    parser.add_argument('--surface-steps', type=int, nargs='+', default=[51, 251, 556],
+                        help="Nombre de surfaces balayées (× 9 classes PEB)")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print("🚀 Benchmark de l'analyse de sensibilité")
+    print(f"   (objectif : < {TARGET_LATENCY_MS} ms par grille)")
+    print("=" * 78)
+    for model_entry in loaded_models():
+        single_df = prepare_input_frame([BASE_ROW])
+        start = time.perf_counter()
+        for _ in range(10):
+            predict_frame(model_entry.model, model_entry.model_type, single_df)
+        single_ms = (time.perf_counter() - start) * 100
+
+        print(f"\n📦 Modèle {model_entry.model_type} (prédiction unitaire : {single_ms:.1f} ms)")
+        print(f"{'lignes':>8} | {'grille (ms)':>12} | {'cache (ms)':>10} | {'unitaire (ms)':>14} | {'objectif':>8}")
+        print("-" * 78)
+        for steps in args.surface_steps:
+            x_values = np.linspace(50, 300, steps)
+            n_rows = steps * len(SERIES_VALUES)
+            timings = []
+            for _ in range(args.repeats):
+                cache = PredictionCache()
+                start = time.perf_counter()
+                sensitivity_grid(model_entry, BASE_ROW, 'habitableSurface', x_values, cache=cache)
+                timings.append(time.perf_counter() - start)
+            grid_ms = min(timings) * 1000
+
+            start = time.perf_counter()
+            sensitivity_grid(model_entry, BASE_ROW, 'habitableSurface', x_values, cache=cache)
+            cached_ms = (time.perf_counter() - start) * 1000
+
+            status = '✅' if grid_ms < TARGET_LATENCY_MS else '❌'
+            print(f"{n_rows:>8} | {grid_ms:>12.1f} | {cached_ms:>10.3f} | {single_ms * n_rows:>14.0f} | {status:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark du démarrage à froid : temps jusqu'à la première prédiction
+Chaque mesure lance un interpréteur neuf qui importe les modules de l'application,
+charge le modèle via le registre et prédit un bien
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD_START_CODE = """
+import json, time
+t0 = time.perf_counter()
+import streamlit
+from src.model_registry import get_model
+from src.prediction import predict_frame, prepare_input_frame
+from src.feedback_form import display_feedback_section
+from src.local_storage import LocalStorageWrapper
+t_imports = time.perf_counter()
+entry = get_model('.')
+t_model = time.perf_counter()
+row = ['HOUSE', 3, 1, 'Brussels', 'Bruxelles', 1000, 150, 'GOOD', 1990, 2, 'NON_FLOOD_ZONE',
+       'GAS', 'INSTALLED', 200, True, 50, 1, False, False, True, 'STANDARD_HOUSE', 2, 0,
+       'Bruxelles', 'B']
+predict_frame(entry.model, entry.model_type, prepare_input_frame([row]))
+t_predict = time.perf_counter()
+print(json.dumps({
+    'imports': t_imports - t0,
+    'model_load': t_model - t_imports,
+    'first_predict': t_predict - t_model,
+    'total': t_predict - t0,
+    'model_type': entry.model_type,
+}))
+"""
+
+
+def cold_start(env):
+    result = subprocess.run([sys.executable, '-c', COLD_START_CODE], cwd=BASE_DIR,
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du temps jusqu'à la première prédiction")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--model-format', default=os.environ.get('IMMO_ELIZA_MODEL_FORMAT', 'joblib'),
+                        help="Format de modèle à charger (joblib ou compiled)")
+    args = parser.parse_args()
+
+    env = dict(os.environ, IMMO_ELIZA_MODEL_FORMAT=args.model_format)
+
+    print("🚀 Benchmark du démarrage à froid")
+    print("=" * 50)
+    runs = []
+    for i in range(args.runs):
+        run = cold_start(env)
+        runs.append(run)
+        print(f"  Run {i + 1}: {run['total'] * 1000:7.0f} ms ({run['model_type']})")
+
+    print("\n📊 Médianes :")
+    for phase in ('imports', 'model_load', 'first_predict', 'total'):
+        median_ms = statistics.median(run[phase] for run in runs) * 1000
+        print(f"   {phase:<15} {median_ms:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
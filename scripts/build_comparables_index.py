@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Script pour construire l'index des biens comparables
+Produit data/comparables_index/ (manifest JSON + tableaux .npy mappables en mémoire)
+depuis le dataset nettoyé : vecteurs standardisés, prix et description des annonces.
+Les coordonnées viennent de l'index des codes postaux (scripts/build_postcode_index.py).
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.comparables import (ComparablesIndex, build_comparables_index, comparables_index_path,
+                             save_comparables_index)
+from src.geodata import get_postcode_index
+
+DATASET_PATH = os.path.join(BASE_DIR, 'data', 'Kangaroo_cleaned_deployement.csv')
+
+# Colonnes du dataset Kangaroo qui portent un autre nom dans l'application
+KANGAROO_ALIASES = {
+    'epcScore': 'epcNumeric',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construction de l'index des biens comparables")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="Dataset nettoyé (CSV)")
+    parser.add_argument('--queries', type=int, default=1000, help="Requêtes pour mesurer la latence")
+    args = parser.parse_args()
+
+    print("🚀 Construction de l'index des biens comparables")
+    print("=" * 40)
+    if not os.path.exists(args.dataset):
+        print(f"❌ Erreur : le fichier '{args.dataset}' n'existe pas !")
+        sys.exit(1)
+
+    data = pd.read_csv(args.dataset)
+    data = data.rename(columns={k: v for k, v in KANGAROO_ALIASES.items()
+                                if k in data.columns and v not in data.columns})
+    postcode_index = get_postcode_index(BASE_DIR)
+    if postcode_index is None:
+        print("⚠️  Index des codes postaux absent : comparables sans critère géographique")
+
+    start = time.perf_counter()
+    manifest, arrays = build_comparables_index(data, postcode_index)
+    build_s = time.perf_counter() - start
+
+    index_dir = comparables_index_path(BASE_DIR)
+    tmp_dir = index_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    save_comparables_index(manifest, arrays, tmp_dir)
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp_dir, index_dir)
+
+    start = time.perf_counter()
+    index = ComparablesIndex.load(index_dir)
+    load_ms = (time.perf_counter() - start) * 1000
+    size_mb = sum(os.path.getsize(os.path.join(index_dir, f)) for f in os.listdir(index_dir)) / 1024 / 1024
+
+    print(f"\n📊 Index :")
+    print(f"   🏠 {manifest['n_listings']} annonces, {len(manifest['dimensions'])} dimensions "
+          f"(construit en {build_s:.2f} s)")
+    print(f"   📦 {size_mb:.1f} MB, chargement + KD-tree {load_ms:.0f} ms")
+
+    # Latence d'une requête unitaire (comme dans l'application), sur des annonces du dataset
+    sample = data.dropna(subset=['price']).sample(min(args.queries, len(data)), random_state=0)
+    timings = []
+    for i in range(len(sample)):
+        row = sample.iloc[[i]]
+        start = time.perf_counter()
+        index.comparables(row, postcode_index=postcode_index)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"   ⚡ Top-5 comparables : p50 {np.percentile(timings, 50):.2f} ms · "
+          f"p99 {np.percentile(timings, 99):.2f} ms")
+    print(f"\n🎉 Index prêt : {index_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Précalcule les histogrammes de référence de la détection de dérive (src/drift.py)
+à partir du dataset d'entraînement nettoyé (mêmes étapes que scripts/train_pipeline.py)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.cleaning import clean_dataset
+from src.drift import NUMERIC_BINS, build_reference, drift_reference_path, save_reference
+
+DATASET_PATH = os.path.join(BASE_DIR, 'data', 'Kangaroo_cleaned_deployement.csv')
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'training_cache')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Histogrammes de référence pour la détection de dérive")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="Dataset d'entraînement (CSV ou Parquet)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--bins', type=int, default=NUMERIC_BINS, help="Intervalles des features numériques")
+    parser.add_argument('--output', default=drift_reference_path(BASE_DIR))
+    args = parser.parse_args()
+
+    print("🚀 Histogrammes de référence (dérive des entrées)")
+    print("=" * 60)
+    if not os.path.exists(args.dataset):
+        print(f"❌ Erreur : le fichier '{args.dataset}' n'existe pas !")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    data, _, _ = clean_dataset(args.dataset, args.cache_dir)
+    reference = build_reference(data, bins=args.bins)
+    save_reference(reference, args.output)
+    elapsed = time.perf_counter() - start
+
+    numeric = sum(1 for feature in reference['features'].values() if feature['kind'] == 'numeric')
+    print(f"📊 {reference['rows']} biens · {numeric} features numériques · "
+          f"{len(reference['features']) - numeric} catégorielles ({elapsed:.1f} s)")
+    print(f"🎉 Référence : {args.output} ({os.path.getsize(args.output) / 1000:.1f} Ko)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Script pour construire l'index des codes postaux belges
+Produit data/postcode_index/ (manifest JSON + tableaux .npy mappables en mémoire)
+depuis les données GeoNames utilisées par pgeocode : latitude, longitude, province,
+région et localités par code postal. À relancer uniquement si les données changent.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.geodata import PostcodeIndex, build_postcode_index, postcode_index_path, save_postcode_index
+
+# Colonnes du fichier GeoNames brut (BE.txt, séparé par tabulations, sans en-tête)
+GEONAMES_FIELDS = ['country_code', 'postal_code', 'place_name', 'state_name', 'state_code',
+                   'county_name', 'county_code', 'community_name', 'community_code',
+                   'latitude', 'longitude', 'accuracy']
+
+
+def load_places(source):
+    """Localités GeoNames : fichier fourni (BE.txt brut ou CSV du cache pgeocode), sinon pgeocode"""
+    if source is None:
+        import pgeocode
+        # Télécharge BE.txt au premier appel puis le garde dans le cache pgeocode
+        return pgeocode.Nominatim('BE')._data
+    if source.endswith('.txt'):
+        return pd.read_csv(source, sep='\t', header=None, names=GEONAMES_FIELDS,
+                           dtype={'postal_code': str}, keep_default_na=False, na_values=[''])
+    return pd.read_csv(source, dtype={'postal_code': str})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construction de l'index des codes postaux")
+    parser.add_argument('--source', help="Fichier GeoNames BE.txt (ou CSV pgeocode) ; par défaut via pgeocode")
+    args = parser.parse_args()
+
+    print("🚀 Construction de l'index des codes postaux")
+    print("=" * 40)
+
+    start = time.perf_counter()
+    try:
+        places = load_places(args.source)
+    except Exception as e:
+        print(f"❌ Impossible de charger les données GeoNames : {e}")
+        print("   Téléchargez BE.txt depuis https://download.geonames.org/export/zip/ et utilisez --source")
+        sys.exit(1)
+    print(f"✅ {len(places)} localités chargées en {time.perf_counter() - start:.2f} s")
+
+    manifest, arrays = build_postcode_index(places)
+
+    index_dir = postcode_index_path(BASE_DIR)
+    tmp_dir = index_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    save_postcode_index(manifest, arrays, tmp_dir)
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp_dir, index_dir)
+
+    start = time.perf_counter()
+    index = PostcodeIndex.load(index_dir)
+    load_ms = (time.perf_counter() - start) * 1000
+    size_kb = sum(os.path.getsize(os.path.join(index_dir, f)) for f in os.listdir(index_dir)) / 1024
+
+    print(f"\n📊 Index :")
+    print(f"   📮 {manifest['n_postcodes']} codes postaux, {len(manifest['localities'])} localités")
+    print(f"   📦 {size_kb:.0f} KB, chargement {load_ms:.1f} ms")
+    example = index.lookup(1000)
+    if example is not None:
+        print(f"   🔎 1000 → {example['province']}, {example['region']}, "
+              f"({example['latitude']:.4f}, {example['longitude']:.4f}), {example['localities'][:3]}")
+
+    postcodes = np.random.default_rng(0).integers(1000, 10000, 1_000_000)
+    start = time.perf_counter()
+    index.coordinates(postcodes)
+    print(f"   ⚡ Coordonnées de 1M codes postaux en {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"\n🎉 Index prêt : {index_dir}")
+
+
+if __name__ == "__main__":
+    main()
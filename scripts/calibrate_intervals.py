@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Script pour calibrer les fourchettes de prix (prédiction conforme)
+Reproduit le découpage train/test du notebook d'entraînement (setup PyCaret :
+train_size=0.8, session_id=42), prédit le jeu de test avec le modèle calibré et écrit les
+quantiles de résidus à côté de son artefact, rattachés à sa version :
+model/pipeline_immo_eliza_intervals.json pour le pipeline joblib du projet (partagé par sa
+version compilée), model/registry/<nom>/ pour un modèle du registre (--model <nom>)
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.intervals import DEFAULT_LEVELS, IntervalCalibration, calibration_path
+from src.model_registry import ModelRegistry
+from src.prediction import EXPECTED_COLUMNS_ORDER, predict_frame, prepare_frame
+
+JOBLIB_MODEL_PATH = os.path.join(BASE_DIR, 'model', 'pipeline_immo_eliza.joblib')
+DATASET_PATH = os.path.join(BASE_DIR, 'data', 'Kangaroo_cleaned_deployement.csv')
+TARGET = 'price'
+
+# Paramètres du setup PyCaret du notebook setup_train_pipeline.ipynb
+TRAIN_SIZE = 0.8
+SESSION_ID = 42
+
+
+def holdout_frame(dataset_path):
+    """Lignes du jeu de test PyCaret (mêmes paramètres de découpage que le notebook)"""
+    data = pd.read_csv(dataset_path)
+    data = data.dropna(subset=[TARGET])
+    _, holdout = train_test_split(data, train_size=TRAIN_SIZE, random_state=SESSION_ID, shuffle=True)
+    if 'epcScore' in holdout.columns and 'epcNumeric' not in holdout.columns:
+        holdout = holdout.rename(columns={'epcScore': 'epcNumeric'})
+    return holdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibration des fourchettes de prix")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="Dataset nettoyé utilisé par le notebook")
+    parser.add_argument('--levels', type=float, nargs='+', default=list(DEFAULT_LEVELS))
+    parser.add_argument('--bins', type=int, default=5, help="Nombre de tranches de prix prédit")
+    parser.add_argument('--model', help="Modèle du registre à calibrer (défaut : pipeline joblib du projet)")
+    args = parser.parse_args()
+
+    print("🚀 Calibration des fourchettes de prix")
+    print("=" * 40)
+    for path in (args.dataset,) if args.model else (JOBLIB_MODEL_PATH, args.dataset):
+        if not os.path.exists(path):
+            print(f"❌ Erreur : le fichier '{path}' n'existe pas !")
+            sys.exit(1)
+
+    registry = ModelRegistry()
+    if args.model:
+        model_entry = registry.get_models(BASE_DIR).get(args.model)
+        if model_entry is None:
+            print(f"❌ Modèle '{args.model}' absent du registre")
+            sys.exit(1)
+    else:
+        model_entry = registry.get(JOBLIB_MODEL_PATH, 'joblib')
+    print(f"✅ Modèle {model_entry.name} ({model_entry.model_type}, version {model_entry.version})")
+    holdout = holdout_frame(args.dataset)
+    missing = [col for col in EXPECTED_COLUMNS_ORDER if col not in holdout.columns and col != 'region']
+    if missing:
+        print(f"❌ Colonnes manquantes dans le dataset : {missing}")
+        sys.exit(1)
+
+    # Même préparation qu'en production : scores PEB numériques du dataset conservés, classes converties
+    features = prepare_frame(holdout)
+    y_true = holdout[TARGET].to_numpy(dtype=float)
+    y_pred = np.asarray(predict_frame(model_entry.model, model_entry.model_type, features))
+    print(f"✅ {len(holdout)} biens du jeu de test prédits "
+          f"({features['epcNumeric'].notna().mean():.0%} avec score PEB)")
+
+    # Contrôle : calibration sur une moitié, couverture mesurée sur l'autre
+    rng = np.random.default_rng(SESSION_ID)
+    half = rng.permutation(len(y_true)) < len(y_true) // 2
+    check = IntervalCalibration.fit(y_true[half], y_pred[half], levels=args.levels, n_bins=args.bins)
+    print("\n📊 Couverture sur la moitié non utilisée pour calibrer :")
+    for level in check.levels:
+        lower, upper = check.interval(y_pred[~half], level)
+        print(f"   {level:.0%} → {check.coverage(y_true[~half], y_pred[~half], level):.1%} "
+              f"(largeur médiane {np.median((upper - lower) / y_pred[~half]):.1%} du prix)")
+
+    calibration = IntervalCalibration.fit(y_true, y_pred, levels=args.levels, n_bins=args.bins,
+                                          model_version=model_entry.version)
+    output_path = calibration_path(model_entry.path, model_entry.model_type)
+    calibration.save(output_path)
+    print(f"\n🎉 Calibration ({calibration.n_calibration} biens, {len(calibration.bin_edges) + 1} tranches) "
+          f"→ {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Vérification de l'envoi des feedbacks en arrière-plan, sans compte Google
+Un faux worksheet en mémoire remplace gspread : il peut échouer sur commande
+pour tester les retries, le CSV d'attente et sa reprise
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.feedback_store import FeedbackStore
+from src.feedback_sync import FeedbackUploader
+from src.feedback_writer import CsvAppendWriter
+from src.google_sheets_feedback import GoogleSheetsFeedback
+
+
+class FakeWorksheet:
+    """Imite gspread.Worksheet.append_row / append_rows"""
+
+    def __init__(self, failures=0, latency=0.0):
+        self.rows = []
+        self.calls = 0
+        self.failures = failures
+        self.latency = latency
+
+    def append_row(self, row, **kwargs):
+        self.append_rows([row], **kwargs)
+
+    def append_rows(self, rows, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("API Google Sheets indisponible (simulé)")
+        self.rows.extend(rows)
+
+
+def make_entry(i):
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'rating': i % 5 + 1,
+        'comment': f"feedback {i}",
+        'predicted_price': 250000.0 + i,
+        'actual_price': None if i % 2 else 260000.0,
+    }
+
+
+def check(label, condition):
+    print(f"   {'✅' if condition else '❌'} {label}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérification de l'envoi groupé des feedbacks")
+    parser.add_argument('--feedbacks', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=300.0, help="Latence simulée d'un appel API")
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pending_path = os.path.join(tmp_dir, 'pending.csv')
+        local_path = os.path.join(tmp_dir, 'local.csv')
+
+        print("🚀 Envoi nominal")
+        sheet = FakeWorksheet(latency=latency)
+        client = GoogleSheetsFeedback(sheet=sheet)
+        uploader = FeedbackUploader(lambda: client, pending_path=pending_path, batch_size=50, flush_interval=0.5)
+        start = time.perf_counter()
+        for i in range(args.feedbacks):
+            uploader.submit(make_entry(i))
+        submit_ms = (time.perf_counter() - start) * 1000
+        uploader.flush()
+        print(f"   {args.feedbacks} soumissions en {submit_ms:.1f} ms, {sheet.calls} appels API "
+              f"(avant : {args.feedbacks} appels, ~{args.feedbacks * latency:.0f} s d'attente utilisateur)")
+        check("toutes les lignes sont arrivées", len(sheet.rows) == args.feedbacks)
+        check("envoi par lots", sheet.calls <= args.feedbacks // 50 + 1)
+
+        print("\n🔁 Erreurs transitoires (2 échecs puis succès)")
+        sheet = FakeWorksheet(failures=2)
+        client = GoogleSheetsFeedback(sheet=sheet)
+        uploader = FeedbackUploader(lambda: client, pending_path=pending_path, backoff_seconds=0.01)
+        uploader.submit(make_entry(0))
+        uploader.flush()
+        check("ligne envoyée après retries", len(sheet.rows) == 1)
+        check("2 retries comptés", uploader.metrics()['retries'] == 2)
+
+        print("\n💾 Google Sheets en panne puis rétabli")
+        sheet = FakeWorksheet(failures=10 ** 6)
+        client = GoogleSheetsFeedback(sheet=sheet)
+        uploader = FeedbackUploader(lambda: client, pending_path=pending_path, max_retries=1, backoff_seconds=0.01)
+        for i in range(5):
+            uploader.submit(make_entry(i))
+        uploader.flush()
+        check("feedbacks conservés dans le CSV d'attente", uploader.metrics()['spilled'] == 5)
+        check("CSV d'attente présent", os.path.exists(pending_path))
+        sheet.failures = 0
+        uploader.submit(make_entry(5))
+        uploader.flush()
+        check("CSV d'attente renvoyé avec le nouveau lot", len(sheet.rows) == 6)
+        check("types restaurés depuis le CSV", sheet.rows[0][1] == 1 and sheet.rows[1][4] == "")
+        check("CSV d'attente vidé", not os.path.exists(pending_path) and not os.path.exists(pending_path + '.draining'))
+        uploader.stop()
+        check("thread arrêté", not uploader._thread.is_alive())
+
+        print("\n📄 Google Sheets non configuré")
+        offline = type('OfflineClient', (), {'connected': False})()
+        uploader = FeedbackUploader(lambda: offline, local_writer=CsvAppendWriter(local_path), pending_path=pending_path)
+        uploader.submit(make_entry(0))
+        uploader.flush()
+        check("feedback écrit dans le CSV local", uploader.metrics()['local'] == 1 and os.path.exists(local_path))
+
+        print("\n🔌 Google Sheets configuré mais injoignable à la connexion")
+        unreachable = type('UnreachableClient', (), {'connected': False, 'configured': True})()
+        sheet = FakeWorksheet()
+        clients = [unreachable]
+        uploader = FeedbackUploader(lambda: clients[-1], local_writer=CsvAppendWriter(local_path),
+                                    pending_path=pending_path)
+        uploader.submit(make_entry(0))
+        uploader.flush()
+        check("feedback dans le CSV d'attente, pas dans le CSV local",
+              uploader.metrics()['spilled'] == 1 and uploader.metrics()['local'] == 0)
+        clients.append(GoogleSheetsFeedback(sheet=sheet))
+        uploader.submit(make_entry(1))
+        uploader.flush()
+        check("renvoyé à la reconnexion", len(sheet.rows) == 2 and uploader.metrics()['drained'] == 1)
+        uploader.stop()
+
+        print("\n🗄️  Base locale + export Google Sheets")
+        store = FeedbackStore(os.path.join(tmp_dir, 'feedbacks.sqlite3'))
+        sheet = FakeWorksheet(failures=10 ** 6)
+        client = GoogleSheetsFeedback(sheet=sheet)
+        uploader = FeedbackUploader(lambda: client, store=store, batch_size=50, max_retries=1, backoff_seconds=0.01)
+        for i in range(120):
+            uploader.submit(make_entry(i))
+        uploader.flush()
+        check("feedbacks enregistrés malgré la panne", store.count() == 120 and len(sheet.rows) == 0)
+        check("feedbacks en attente d'export", len(store.unsynced(limit=1000)) == 120)
+        sheet.failures, sheet.calls = 0, 0
+        uploader.submit(make_entry(120))
+        uploader.flush()
+        check("tout exporté au rétablissement, par lots", len(sheet.rows) == 121 and sheet.calls == 3)
+        check("curseur d'export à jour", store.unsynced() == [])
+        check("pas de CSV d'attente", not os.path.exists(uploader.pending_path))
+        stats = store.stats()
+        check("agrégats tenus à jour", stats['total_feedback'] == 121 and stats['price_accuracy'] == 61)
+        uploader.stop()
+        store.close()
+
+    print("\n✅ Toutes les vérifications sont passées")
+
+
+if __name__ == "__main__":
+    main()
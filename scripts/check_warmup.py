@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Vérification du préchauffage (src/warmup.py)
+Chaque mesure tourne dans un processus neuf, préchauffé ou non (froid). La première requête
+est chronométrée comme un utilisateur la subit : choix du modèle, chargement éventuel compris.
+Échoue (code 1) si, après préchauffage, la première requête dépasse le p95 du régime établi
+au-delà d'une marge serrée, ou si elle n'est pas nettement plus rapide qu'à froid.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.prediction import EXPECTED_COLUMNS_ORDER
+
+# Premier bien « réel » différent du bien synthétique du préchauffage (pas de cache possible)
+REAL_ROW = ['APARTMENT', 2, 1, 'Antwerp', 'Antwerpen', 2000, 85, 'AS_NEW', 2015, 2, 'NON_FLOOD_ZONE',
+            'GAS', 'HYPER_EQUIPPED', 0, False, 0, 1, False, False, True, 'STANDARD_APARTMENT', 0, 3,
+            'Flanders', 'B']
+
+
+def measure(warm, n_requests):
+    """Dans le processus enfant : latences (ms) de la première requête et des suivantes"""
+    from src.model_registry import ModelRegistry
+    from src.model_router import ModelRouter
+    from src.warmup import Warmup
+
+    # Aucun modèle chargé avant le préchauffage (ou, à froid, avant la première requête)
+    router = ModelRouter(BASE_DIR, ModelRegistry())
+    start = time.perf_counter()
+    if warm:
+        warmup = Warmup(router)
+        warmup.run()
+        startup = warmup.state()
+    else:
+        startup = {'status': 'cold', 'timings_ms': {}}
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    surface = EXPECTED_COLUMNS_ORDER.index('habitableSurface')
+    latencies = []
+    for i in range(n_requests + 1):
+        row = list(REAL_ROW)
+        row[surface] = REAL_ROW[surface] + i
+        start = time.perf_counter()
+        # Requête complète : à froid, la première charge le modèle
+        router.predict(router.model_for('check-warmup'), [row])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {'startup_ms': startup_ms, 'warmup': startup, 'first_ms': latencies[0],
+            'steady_p50_ms': float(np.median(latencies[1:])), 'steady_p95_ms': float(np.percentile(latencies[1:], 95))}
+
+
+def run_child(mode, n_requests):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode,
+                             '--requests', str(n_requests)],
+                            capture_output=True, text=True, cwd=BASE_DIR)
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise RuntimeError(f"Échec du processus de mesure ({mode})")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérification du préchauffage")
+    parser.add_argument('--requests', type=int, default=50, help="Prédictions du régime établi")
+    parser.add_argument('--max-ratio', type=float, default=1.25,
+                        help="Première requête préchauffée / p95 du régime établi tolérée")
+    parser.add_argument('--slack-ms', type=float, default=1.0, help="Marge absolue tolérée (bruit de mesure)")
+    parser.add_argument('--min-speedup', type=float, default=5.0,
+                        help="Première requête à froid / première requête préchauffée minimale")
+    parser.add_argument('--child', choices=['cold', 'warm'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child == 'warm', args.requests)))
+        return
+
+    print("🚀 Vérification du préchauffage (un processus neuf par mesure)")
+    print("=" * 70)
+    results = {mode: run_child(mode, args.requests) for mode in ('cold', 'warm')}
+
+    print(f"{'processus':<12} | {'démarrage':>10} | {'1re requête':>14} | {'régime p50':>10} | {'p95':>8}")
+    print("-" * 68)
+    for mode, label in (('cold', 'froid'), ('warm', 'préchauffé')):
+        r = results[mode]
+        print(f"{label:<12} | {r['startup_ms']:>8.0f}ms | {r['first_ms']:>12.1f}ms | "
+              f"{r['steady_p50_ms']:>8.1f}ms | {r['steady_p95_ms']:>6.1f}ms")
+
+    warm = results['warm']
+    print("\n⏱️  Étapes du préchauffage : " + " · ".join(f"{step} {ms:.0f} ms"
+                                                  for step, ms in warm['warmup']['timings_ms'].items()))
+    if warm['warmup']['status'] != 'ready':
+        print(f"❌ Préchauffage en échec : {warm['warmup'].get('error')}")
+        sys.exit(1)
+
+    cold = results['cold']
+    limit = args.max_ratio * warm['steady_p95_ms'] + args.slack_ms
+    if warm['first_ms'] > limit:
+        print(f"❌ Première requête après préchauffage {warm['first_ms']:.1f} ms > {limit:.1f} ms "
+              f"(régime établi p95 {warm['steady_p95_ms']:.1f} ms)")
+        sys.exit(1)
+    print(f"✅ Première requête après préchauffage {warm['first_ms']:.1f} ms ≤ {limit:.1f} ms "
+          f"(régime établi p95 {warm['steady_p95_ms']:.1f} ms)")
+
+    speedup = cold['first_ms'] / warm['first_ms']
+    if speedup < args.min_speedup:
+        print(f"❌ Première requête à froid {cold['first_ms']:.1f} ms, seulement ×{speedup:.1f} "
+              f"par rapport au préchauffage (attendu ≥ ×{args.min_speedup:.0f})")
+        sys.exit(1)
+    print(f"✅ Première requête à froid {cold['first_ms']:.1f} ms, ×{speedup:.1f} par rapport au préchauffage")
+    print("🎉 Préchauffage OK")
+
+
+if __name__ == "__main__":
+    main()
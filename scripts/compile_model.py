@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Script pour compiler le pipeline joblib en format d'inférence compact
+Produit model/pipeline_immo_eliza_compiled/ (manifest JSON + tableaux .npy non compressés)
+et vérifie que les prédictions sont identiques au pipeline d'origine
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.compiled_model import CompiledModel, compile_pipeline, save_compiled
+from src.features import EPC_CLASSES, add_region_and_epc
+from src.prediction import EXPECTED_COLUMNS_ORDER
+
+JOBLIB_MODEL_PATH = os.path.join(BASE_DIR, 'model', 'pipeline_immo_eliza.joblib')
+COMPILED_MODEL_DIR = os.path.join(BASE_DIR, 'model', 'pipeline_immo_eliza_compiled')
+DATASET_PATH = os.path.join(BASE_DIR, 'data', 'Kangaroo_cleaned_deployement.csv')
+
+
+def validation_frame(manifest, n_rows, seed=42):
+    """
+    Données de validation : le dataset nettoyé s'il est présent (scores PEB numériques,
+    conservés par add_region_and_epc), sinon des biens synthétiques tirés des catégories
+    connues du modèle (+ quelques valeurs manquantes)
+    """
+    if os.path.exists(DATASET_PATH):
+        df = pd.read_csv(DATASET_PATH, nrows=n_rows)
+        if 'epcScore' in df.columns and 'epcNumeric' not in df.columns:
+            df = df.rename(columns={'epcScore': 'epcNumeric'})
+        if set(EXPECTED_COLUMNS_ORDER) <= set(df.columns):
+            return add_region_and_epc(df[EXPECTED_COLUMNS_ORDER].copy())
+
+    rng = np.random.default_rng(seed)
+    data = {}
+    categories = {encoder['column']: encoder['categories'] for encoder in manifest['encoders']}
+    numeric_ranges = {
+        'bedroomCount': (0, 8), 'bathroomCount': (0, 4), 'postCode': (1000, 9999),
+        'habitableSurface': (20, 500), 'buildingConstructionYear': (1850, 2025),
+        'facedeCount': (1, 4), 'landSurface': (0, 2000), 'gardenSurface': (0, 1000),
+        'toiletCount': (0, 3), 'building_floors': (0, 4), 'apartment_floor': (0, 10),
+    }
+    for col in EXPECTED_COLUMNS_ORDER:
+        if col in categories:
+            data[col] = rng.choice(categories[col] + ['INCONNU'], n_rows).astype(object)
+        elif col in numeric_ranges:
+            low, high = numeric_ranges[col]
+            data[col] = rng.integers(low, high + 1, n_rows).astype(float)
+        elif col == 'epcNumeric':
+            data[col] = rng.choice(EPC_CLASSES, n_rows)
+        else:
+            data[col] = rng.random(n_rows) < 0.5
+    df = pd.DataFrame(data)[EXPECTED_COLUMNS_ORDER]
+
+    # Valeurs manquantes pour couvrir les imputers
+    df.loc[df.sample(frac=0.05, random_state=seed).index, 'habitableSurface'] = np.nan
+    df.loc[df.sample(frac=0.05, random_state=seed + 1).index, 'locality'] = None
+    return add_region_and_epc(df)
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compilation du pipeline en format d'inférence compact")
+    parser.add_argument('--rows', type=int, default=5000, help="Nombre de lignes de validation")
+    parser.add_argument('--rtol', type=float, default=1e-6, help="Tolérance relative acceptée")
+    args = parser.parse_args()
+
+    print("🚀 Compilation du pipeline Immo Eliza")
+    print("=" * 40)
+
+    if not os.path.exists(JOBLIB_MODEL_PATH):
+        print(f"❌ Erreur : le fichier '{JOBLIB_MODEL_PATH}' n'existe pas !")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    pipeline = joblib.load(JOBLIB_MODEL_PATH)
+    joblib_load_seconds = time.perf_counter() - start
+    print(f"✅ Pipeline joblib chargé en {joblib_load_seconds * 1000:.0f} ms")
+
+    try:
+        manifest, arrays = compile_pipeline(pipeline, EXPECTED_COLUMNS_ORDER)
+    except ValueError as e:
+        print(f"❌ Compilation impossible : {e}")
+        sys.exit(1)
+
+    tmp_dir = COMPILED_MODEL_DIR + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    save_compiled(manifest, arrays, tmp_dir)
+
+    start = time.perf_counter()
+    compiled = CompiledModel.load(tmp_dir)
+    compiled_load_seconds = time.perf_counter() - start
+    print(f"✅ Modèle compilé chargé en {compiled_load_seconds * 1000:.1f} ms")
+
+    print("🔍 Vérification des prédictions...")
+    df = validation_frame(manifest, args.rows)
+    epc_coverage = float(df['epcNumeric'].notna().mean())
+    if epc_coverage == 0:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        print("❌ Aucun score PEB dans les données de validation, la branche PEB ne serait pas vérifiée")
+        sys.exit(1)
+    expected = np.asarray(pipeline.predict(df.copy()))
+    start = time.perf_counter()
+    actual = compiled.predict(df)
+    compiled_predict_seconds = time.perf_counter() - start
+
+    max_abs = float(np.max(np.abs(actual - expected)))
+    close = np.allclose(actual, expected, rtol=args.rtol, atol=1e-6)
+    print(f"   {len(df)} lignes ({epc_coverage:.0%} avec score PEB) - écart absolu max : {max_abs:.6f} €")
+    print(f"   Prédiction compilée : {compiled_predict_seconds * 1000:.1f} ms "
+          f"({len(df) / compiled_predict_seconds:,.0f} lignes/s)")
+
+    if not close:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        print("❌ Les prédictions compilées s'écartent du pipeline d'origine, artefact non écrit")
+        sys.exit(1)
+
+    shutil.rmtree(COMPILED_MODEL_DIR, ignore_errors=True)
+    os.replace(tmp_dir, COMPILED_MODEL_DIR)
+
+    print(f"\n📊 Comparaison :")
+    print(f"   📦 Joblib : {os.path.getsize(JOBLIB_MODEL_PATH) / 1024:.0f} KB, "
+          f"chargement {joblib_load_seconds * 1000:.0f} ms")
+    print(f"   ⚡ Compilé : {directory_size(COMPILED_MODEL_DIR) / 1024:.0f} KB, "
+          f"chargement {compiled_load_seconds * 1000:.1f} ms")
+    print(f"\n🎉 Modèle compilé prêt : {COMPILED_MODEL_DIR}")
+    print("   Activez-le avec IMMO_ELIZA_MODEL_FORMAT=compiled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Job de détection de dérive : compare les entrées du journal des prédictions
+(data/prediction_log/) aux histogrammes de référence du dataset d'entraînement.
+Seuls les fichiers du journal pas encore vus sont lus (comptages mis en cache par fichier).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.drift import MIN_OBSERVATIONS, drift_reference_path, drift_report, file_histograms, load_reference, sum_counts
+from src.prediction_log import completed_log_files, prediction_log_path
+
+STATUS_ICONS = {'ok': '✅', 'warning': '⚠️ ', 'drift': '🚨', 'insufficient': '⏳', 'no_data': '➖'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dérive des entrées du modèle (PSI par feature)")
+    parser.add_argument('--log-dir', default=prediction_log_path(BASE_DIR))
+    parser.add_argument('--reference', default=drift_reference_path(BASE_DIR))
+    parser.add_argument('--days', type=float, default=None,
+                        help="Fenêtre : fichiers modifiés depuis N jours (défaut : tout le journal)")
+    parser.add_argument('--output', default=None, help="Rapport JSON (optionnel)")
+    args = parser.parse_args()
+
+    print("🚀 Détection de dérive des entrées")
+    print("=" * 70)
+    if not os.path.exists(args.reference):
+        print(f"❌ Erreur : référence absente ('{args.reference}'), lancez scripts/build_drift_reference.py")
+        sys.exit(1)
+
+    reference = load_reference(args.reference)
+    paths = completed_log_files(args.log_dir)
+    if args.days is not None:
+        since = time.time() - args.days * 86400
+        paths = [path for path in paths if os.path.getmtime(path) >= since]
+    if not paths:
+        print(f"❌ Aucun fichier de journal terminé dans '{args.log_dir}'")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    histograms = [file_histograms(reference, path) for path in paths]
+    counts = sum_counts(histograms)
+    rows = drift_report(reference, counts)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    n_predictions = sum(histogram['rows'] for histogram in histograms)
+
+    print(f"📊 {n_predictions:,} prédictions ({len(paths)} fichiers) vs {reference['rows']:,} biens "
+          f"d'entraînement · {elapsed_ms:.0f} ms\n")
+    print(f"{'feature':<26} | {'PSI':>7} | {'manquants réf.':>14} | {'manquants obs.':>14} | statut")
+    print("-" * 78)
+    for row in rows:
+        psi = f"{row['psi']:.3f}" if row['psi'] is not None else '-'
+        observed = f"{row['missing_observed']:.1%}" if row['missing_observed'] is not None else '-'
+        print(f"{row['feature']:<26} | {psi:>7} | {row['missing_reference']:>14.1%} | {observed:>14} | "
+              f"{STATUS_ICONS[row['status']]} {row['status']}")
+
+    drifted = [row['feature'] for row in rows if row['status'] == 'drift']
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'predictions': n_predictions, 'files': len(paths), 'features': rows}, f,
+                      ensure_ascii=False, indent=2)
+        print(f"\n💾 Rapport : {args.output}")
+    if n_predictions < MIN_OBSERVATIONS:
+        print(f"\n⏳ Moins de {MIN_OBSERVATIONS} prédictions : PSI indicatif, pas de conclusion")
+    else:
+        print(f"\n{'🚨 Dérive : ' + ', '.join(drifted) if drifted else '🎉 Aucune dérive significative'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script de preprocessing du dataset Immo Eliza (remplace notebooks/preprocess_code.ipynb)
+Exécute les étapes de src/cleaning.py avec un cache Parquet par étape, indexé par
+l'empreinte de l'entrée, des paramètres et du code : une relance ne recalcule que les
+étapes modifiées. Affiche le temps de chaque étape et écrit le dataset nettoyé.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.cleaning import clean_dataset
+
+DATASET_PATH = os.path.join(BASE_DIR, 'data', 'Kangaroo_cleaned_deployement.csv')
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'training_cache')
+OUTPUT_PATH = os.path.join(BASE_DIR, 'data', 'Kangaroo_cleaned.parquet')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessing du dataset par étapes en cache")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="Dataset brut (CSV ou Parquet)")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="Dataset nettoyé (.parquet ou .csv)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true', help="Recalcule toutes les étapes")
+    args = parser.parse_args()
+
+    print("🚀 Preprocessing du dataset")
+    print("=" * 60)
+    if not os.path.exists(args.dataset):
+        print(f"❌ Erreur : le fichier '{args.dataset}' n'existe pas !")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    df, _, report = clean_dataset(args.dataset, args.cache_dir, use_cache=not args.no_cache)
+    total_s = time.perf_counter() - start
+
+    print(f"{'étape':<28} | {'lignes':>8} | {'temps (ms)':>10} | cache")
+    print("-" * 60)
+    for stage in report:
+        rows = stage.get('rows_out', '')
+        print(f"{stage['stage']:<28} | {rows:>8} | {stage['seconds'] * 1000:>10.1f} | "
+              f"{'💾' if stage['cached'] else '⚙️'}")
+    recomputed = sum(1 for stage in report
+                     if not stage['cached'] and stage['stage'] not in ('hash_dataset', 'read_dataset'))
+    print(f"\n⏱️  {total_s * 1000:.0f} ms au total, {recomputed} étape(s) recalculée(s)")
+
+    if args.output.endswith('.csv'):
+        df.to_csv(args.output, index=False)
+    else:
+        df.to_parquet(args.output, index=False)
+    print(f"🎉 {len(df)} biens → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
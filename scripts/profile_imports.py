@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Profilage du temps d'import au démarrage (équivalent lisible de `python -X importtime`)
+Lance un interpréteur neuf, importe les modules de l'application et affiche
+les paquets les plus coûteux
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules importés par app.py au démarrage
+APP_MODULES = [
+    'streamlit',
+    'src.settings',
+    'src.logging_config',
+    'src.model_registry',
+    'src.model_router',
+    'src.prediction',
+    'src.prediction_cache',
+    'src.local_storage',
+    'src.traduction_fr',
+    'src.feedback_form',
+    'src.warmup',
+]
+
+
+def run_importtime(modules):
+    """Retourne les lignes (self_us, cumulative_us, depth, module) de -X importtime"""
+    code = '; '.join(f'import {module}' for module in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=BASE_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rapport des temps d'import au démarrage")
+    parser.add_argument('modules', nargs='*', default=APP_MODULES, help="Modules à importer")
+    parser.add_argument('--top', type=int, default=15, help="Nombre de paquets affichés")
+    args = parser.parse_args()
+
+    print("🔍 Profilage des imports")
+    print("=" * 60)
+    entries = run_importtime(args.modules)
+
+    # Modules demandés (niveau racine de l'arbre d'import)
+    total_us = 0
+    print(f"{'module':<35} | {'cumulé (ms)':>12}")
+    print("-" * 60)
+    for self_us, cumulative_us, depth, name in entries:
+        if depth == 0:
+            total_us += cumulative_us
+            print(f"{name:<35} | {cumulative_us / 1000:>12.1f}")
+
+    # Temps propre agrégé par paquet de premier niveau
+    by_package = defaultdict(int)
+    for self_us, _, _, name in entries:
+        by_package[name.split('.')[0]] += self_us
+
+    print(f"\n📦 Paquets les plus coûteux (temps propre cumulé) :")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"   {package:<30} {self_us / 1000:>8.1f} ms")
+
+    print(f"\n⏱️  Total des imports : {total_us / 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Ajout d'un modèle au registre (model/registry/) ou modification de son rôle
+Copie l'artefact (.joblib, .pkl PyCaret ou dossier compilé) dans model/registry/<nom>/,
+vérifie ses features et une prédiction, puis met à jour le manifest (métriques du
+rapport d'entraînement, part du trafic, évaluation en ombre).
+
+    python scripts/register_model.py --name lgbm-v1 --artifact model/pipeline_immo_eliza.joblib --traffic 1
+    python scripts/register_model.py --name lgbm-v2 --artifact model/training/pipeline_immo_eliza.joblib \\
+        --report model/training/training_report.json --shadow
+    python scripts/register_model.py --name lgbm-v2 --traffic 0.1 --no-shadow
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.benchmark_sensitivity import BASE_ROW
+from src.model_registry import (ModelSpec, check_features, read_manifest, registry, registry_dir_path,
+                                registry_manifest_path, write_manifest)
+from src.prediction import predict_frame, prepare_input_frame
+from src.schema import TARGET_COLUMNS
+
+
+def artifact_type(path):
+    """Type de l'artefact d'après son chemin"""
+    if os.path.isdir(path) or os.path.basename(path) == 'manifest.json':
+        return 'compiled'
+    if path.endswith('.joblib'):
+        return 'joblib'
+    if path.endswith('.pkl'):
+        return 'pycaret'
+    raise ValueError(f"Format d'artefact inconnu : {path}")
+
+
+def copy_artifact(source, model_type, target_dir):
+    """Copie l'artefact dans le dossier du modèle ; retourne le chemin à charger"""
+    os.makedirs(target_dir, exist_ok=True)
+    if model_type == 'compiled':
+        source_dir = source if os.path.isdir(source) else os.path.dirname(source)
+        destination = os.path.join(target_dir, os.path.basename(os.path.normpath(source_dir)))
+        shutil.rmtree(destination, ignore_errors=True)
+        shutil.copytree(source_dir, destination)
+        return os.path.join(destination, 'manifest.json')
+    destination = os.path.join(target_dir, os.path.basename(source))
+    shutil.copy2(source, destination)
+    return destination
+
+
+def model_features(model, model_type):
+    """Colonnes d'entrée attendues par le modèle chargé (sans la cible)"""
+    if model_type == 'compiled':
+        return list(model.manifest['input_columns'])
+    return [str(col) for col in model.feature_names_in_ if col not in TARGET_COLUMNS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajout ou modification d'un modèle du registre")
+    parser.add_argument('--name', required=True, help="Nom du modèle dans le registre (ex. lgbm-v2)")
+    parser.add_argument('--artifact', help="Artefact à copier (.joblib, .pkl ou dossier compilé)")
+    parser.add_argument('--report', help="Rapport de scripts/train_pipeline.py (métriques du jeu de test)")
+    parser.add_argument('--traffic', type=float, help="Part du trafic servie par ce modèle (0 = aucun)")
+    parser.add_argument('--shadow', action=argparse.BooleanOptionalAction, default=None,
+                        help="Évaluer le modèle en ombre sur le trafic des autres modèles")
+    parser.add_argument('--remove', action='store_true', help="Retire le modèle du manifest")
+    args = parser.parse_args()
+
+    print(f"🚀 Registre des modèles : {args.name}")
+    print("=" * 60)
+    manifest_path = registry_manifest_path(BASE_DIR)
+    specs = read_manifest(manifest_path) if os.path.exists(manifest_path) else []
+    by_name = {spec.name: spec for spec in specs}
+    spec = by_name.get(args.name)
+
+    if args.remove:
+        if spec is None:
+            print(f"❌ Modèle '{args.name}' absent du registre")
+            sys.exit(1)
+        specs.remove(spec)
+        try:
+            write_manifest(manifest_path, specs)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"🗑️  Modèle retiré du manifest (artefacts conservés dans {os.path.dirname(spec.path)})")
+        return
+
+    if args.artifact:
+        if not os.path.exists(args.artifact):
+            print(f"❌ Erreur : '{args.artifact}' n'existe pas !")
+            sys.exit(1)
+        model_type = artifact_type(args.artifact)
+        path = copy_artifact(args.artifact, model_type, os.path.join(registry_dir_path(BASE_DIR), args.name))
+        print(f"📦 Artefact {model_type} copié : {os.path.relpath(path, BASE_DIR)}")
+
+        start = time.perf_counter()
+        entry = registry.get(path, model_type, args.name)
+        print(f"✅ Chargé en {time.perf_counter() - start:.2f} s (version {entry.version})")
+        new_spec = ModelSpec(args.name, path, model_type, model_features(entry.model, model_type),
+                             spec.metrics if spec else {}, spec.traffic if spec else 0.0,
+                             spec.shadow if spec else False)
+        try:
+            check_features(new_spec)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        predicted = float(predict_frame(entry.model, model_type, prepare_input_frame([BASE_ROW]))[0])
+        print(f"🔍 Prédiction de contrôle : {predicted:,.0f} €")
+        if spec is not None:
+            specs.remove(spec)
+        specs.append(new_spec)
+        spec = new_spec
+    elif spec is None:
+        print(f"❌ Modèle '{args.name}' absent du registre : indiquez --artifact")
+        sys.exit(1)
+
+    if args.report:
+        with open(args.report, encoding='utf-8') as f:
+            report = json.load(f)
+        spec.metrics = {'best_model': report.get('best_model'), **report.get('holdout_metrics', {})}
+    if args.traffic is not None:
+        spec.traffic = args.traffic
+    if args.shadow is not None:
+        spec.shadow = args.shadow
+
+    try:
+        write_manifest(manifest_path, specs)
+        specs = read_manifest(manifest_path)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    total = sum(s.traffic for s in specs)
+    print(f"\n📊 Manifest : {os.path.relpath(manifest_path, BASE_DIR)}")
+    for s in specs:
+        share = f"{s.traffic / total * 100:5.1f} %" if s.traffic else "   -   "
+        role = '👥 ombre' if s.shadow else ''
+        metrics = " · ".join(f"{name} {value:,.4f}" for name, value in s.metrics.items()
+                             if isinstance(value, (int, float)) and name in ('R2', 'MAE', 'RMSE'))
+        print(f"   {s.name:<16} {s.model_type:<9} trafic {share} {role:<9} {metrics}")
+    print("\n🎉 Registre à jour (rechargé automatiquement par l'application et l'API)")
+
+
+if __name__ == "__main__":
+    main()
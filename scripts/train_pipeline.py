@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Pipeline d'entraînement reproductible pour Immo Eliza (remplace les notebooks)
+1. Nettoyage du dataset par étapes vectorisées (src/cleaning.py), chaque sortie mise
+   en cache en Parquet dans data/training_cache/ (clé = empreinte de l'entrée de l'étape)
+2. Comparaison des modèles PyCaret sur un pool de processus, avec budget de temps
+3. Entraînement du meilleur modèle, évaluation sur le jeu de test, sauvegarde
+   (.pkl PyCaret + .joblib) et rapport JSON des métriques et des temps
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import joblib
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.cleaning import clean_dataset
+from src.model_registry import MODEL_BASENAME
+from src.model_search import CANDIDATE_MODELS, SORT_METRIC, compare_models_parallel, create_experiment
+
+DATASET_PATH = os.path.join(BASE_DIR, 'data', 'Kangaroo_cleaned_deployement.csv')
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'training_cache')
+OUTPUT_DIR = os.path.join(BASE_DIR, 'model', 'training')
+REPORT_NAME = 'training_report.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline d'entraînement Immo Eliza")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="Dataset brut ou nettoyé (CSV ou Parquet)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Dossier du modèle entraîné et du rapport")
+    parser.add_argument('--no-cache', action='store_true', help="Recalcule toutes les étapes de nettoyage")
+    parser.add_argument('--models', nargs='+', default=CANDIDATE_MODELS, help="Identifiants PyCaret à comparer")
+    parser.add_argument('--workers', type=int, default=None, help="Processus du pool (défaut : nombre de cœurs)")
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help="Budget de la comparaison en secondes (défaut : illimité)")
+    parser.add_argument('--fold', type=int, default=10, help="Nombre de folds de validation croisée")
+    parser.add_argument('--sort', default=SORT_METRIC, help="Métrique de classement (R2, MAE, RMSE...)")
+    args = parser.parse_args()
+
+    print("🚀 Pipeline d'entraînement Immo Eliza")
+    print("=" * 60)
+    if not os.path.exists(args.dataset):
+        print(f"❌ Erreur : le fichier '{args.dataset}' n'existe pas !")
+        sys.exit(1)
+
+    total_start = time.perf_counter()
+    timings = {}
+
+    # 1. Nettoyage
+    start = time.perf_counter()
+    data, clean_path, stage_report = clean_dataset(args.dataset, args.cache_dir, use_cache=not args.no_cache)
+    timings['cleaning'] = round(time.perf_counter() - start, 2)
+    print(f"\n🧹 Nettoyage ({timings['cleaning']} s)")
+    for stage in stage_report:
+        rows = f"{stage['rows_out']:>8} lignes" if 'rows_out' in stage else ' ' * 15
+        print(f"   {'💾' if stage['cached'] else '⚙️ '} {stage['stage']:<26} {rows} {stage['seconds']:>8.3f} s")
+
+    # 2. Comparaison des modèles
+    print(f"\n🏁 Comparaison de {len(args.models)} modèles"
+          + (f" (budget {args.time_budget:.0f} s)" if args.time_budget else ""))
+    start = time.perf_counter()
+    results = compare_models_parallel(clean_path, models=args.models, n_workers=args.workers,
+                                      time_budget=args.time_budget, fold=args.fold, sort=args.sort)
+    timings['model_search'] = round(time.perf_counter() - start, 2)
+    for result in results:
+        if result['status'] == 'ok':
+            metrics = result['metrics']
+            print(f"   ✅ {result['model']:<10} R2 {metrics.get('R2', float('nan')):.4f} · "
+                  f"MAE {metrics.get('MAE', float('nan')):,.0f} · {result['seconds']} s")
+        else:
+            print(f"   ⏱️  {result['model']:<10} {result['status']} {result.get('error', '')}")
+
+    best = next((r for r in results if r['status'] == 'ok'), None)
+    if best is None:
+        print("❌ Aucun modèle n'a terminé dans le budget de temps")
+        sys.exit(1)
+
+    # 3. Entraînement du meilleur modèle (même setup que le notebook) et sauvegarde
+    start = time.perf_counter()
+    experiment = create_experiment(data, fold=args.fold)
+    model = experiment.create_model(best['model'], verbose=False)
+    experiment.predict_model(model, verbose=False)
+    holdout = experiment.pull()
+    holdout_metrics = {name: float(value) for name, value in holdout.iloc[0].items()
+                       if isinstance(value, (int, float))}
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    model_base = os.path.join(args.output_dir, MODEL_BASENAME)
+    pipeline, _ = experiment.save_model(model, model_base, verbose=False)
+    joblib.dump(pipeline, f'{model_base}.joblib', compress=3)
+    timings['final_training'] = round(time.perf_counter() - start, 2)
+    timings['total'] = round(time.perf_counter() - total_start, 2)
+
+    report = {
+        'dataset': os.path.abspath(args.dataset),
+        'rows': len(data),
+        'cleaning': stage_report,
+        'comparison': results,
+        'sort_metric': args.sort,
+        'best_model': best['model'],
+        'holdout_metrics': holdout_metrics,
+        'artifacts': [f'{model_base}.pkl', f'{model_base}.joblib'],
+        'timings_seconds': timings,
+    }
+    report_path = os.path.join(args.output_dir, REPORT_NAME)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n📊 Meilleur modèle : {best['model']} · jeu de test : "
+          + " · ".join(f"{name} {value:,.4f}" for name, value in holdout_metrics.items()))
+    print(f"⏱️  Temps : " + " · ".join(f"{name} {value} s" for name, value in timings.items()))
+    print(f"\n🎉 Modèle : {model_base}.joblib · rapport : {report_path}")
+    print("   Copiez les artefacts dans model/ pour les mettre en production")
+
+
+if __name__ == "__main__":
+    main()
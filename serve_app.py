@@ -0,0 +1,92 @@
+"""
+Lancement de l'interface Streamlit préchauffée, hors session utilisateur
+
+    python serve_app.py --port 8501 --ready-port 8502
+
+Les modèles du registre sont chargés et préchauffés (src/warmup.py) avant que Streamlit
+n'ouvre son port : la première session ne paie ni le chargement ni la première prédiction.
+app.py tourne dans ce même processus et réutilise le routeur et le préchauffage déjà faits.
+
+GET /health (port --ready-port) : vivacité du processus (toujours 200)
+GET /ready  (port --ready-port) : 200 une fois le préchauffage terminé, 503 avant ou en cas d'échec
+"""
+
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src import settings
+from src.logging_config import get_logger
+from src.model_router import get_model_router
+from src.prediction_log import get_prediction_log
+from src.warmup import READY, get_warmup
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, 'app.py')
+
+logger = get_logger(__name__)
+
+
+def serve_readiness(warmup, host, port):
+    """Expose /health et /ready dans un thread démon, à côté de Streamlit"""
+
+    class ReadinessHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, {'status': 'ok'})
+            elif self.path == '/ready':
+                state = warmup.state()
+                self._reply(200 if state['status'] == READY else 503, state)
+            else:
+                self._reply(404, {'error': 'not found'})
+
+        def _reply(self, code, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), ReadinessHandler)
+    threading.Thread(target=server.serve_forever, name='readiness', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interface Streamlit Immo Eliza, préchauffée au lancement")
+    parser.add_argument('--address', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8501)
+    parser.add_argument('--ready-port', type=int, default=8502, help="Port de /health et /ready (0 pour désactiver)")
+    args = parser.parse_args()
+
+    # app.py lit ses fichiers (image, data/...) en chemins relatifs
+    os.chdir(BASE_DIR)
+
+    router = get_model_router(BASE_DIR)
+    prediction_log = get_prediction_log(BASE_DIR) if settings.PREDICTION_LOG_ENABLED else None
+    # Pas de lot synthétique : l'interface prédit un bien à la fois
+    warmup = get_warmup(router, prediction_log, batch_size=0)
+    if args.ready_port:
+        serve_readiness(warmup, args.address, args.ready_port)
+
+    if warmup.run():
+        logger.info(f"Préchauffage terminé en {warmup.timings_ms['total']:.0f} ms")
+    else:
+        # L'interface démarre quand même : les modèles seront chargés à la première session
+        logger.warning(f"Préchauffage incomplet : {warmup.error}")
+
+    from streamlit.web import bootstrap
+
+    flag_options = {'server_address': args.address, 'server_port': args.port}
+    bootstrap.load_config_options(flag_options)
+    bootstrap.run(APP_PATH, False, [], flag_options)
+
+
+if __name__ == "__main__":
+    main()
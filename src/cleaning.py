@@ -0,0 +1,206 @@
+"""
+Nettoyage du dataset d'entraînement (reprise de notebooks/preprocess_code.ipynb)
+Chaque étape est une fonction vectorisée DataFrame -> DataFrame ; CLEANING_STAGES
+les enchaîne dans l'ordre du notebook (exécutées et mises en cache par src/stage_runner.py). Les étapes tolèrent un dataset déjà nettoyé
+(colonnes absentes ignorées) pour pouvoir repartir de Kangaroo_cleaned_deployement.csv.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import features, schema
+from src.features import REGIONS, epc_class_codes, epc_scores, region_codes
+from src.prediction import EXPECTED_COLUMNS_ORDER
+from src.schema import apply_schema
+from src.stage_runner import Stage, StageRunner, file_digest
+
+TARGET = 'price'
+
+COLUMNS_TO_DROP = [
+    "Unnamed: 0", "id", "url", "roomCount", "monthlyCost",
+    "hasAttic", "hasBasement", "hasDressingRoom", "diningRoomSurface", "hasDiningRoom",
+    "streetFacadeWidth", "hasLift", "hasHeatPump",
+    "hasPhotovoltaicPanels", "hasThermicPanels", "kitchenSurface",
+    "hasLivingRoom", "livingRoomSurface", "hasBalcony",
+    "gardenOrientation", "parkingCountIndoor", "parkingCountOutdoor",
+    "hasAirConditioning", "hasArmoredDoor", "hasVisiophone", "hasOffice",
+    "terraceSurface", "terraceOrientation", "accessibleDisabledPeople"
+]
+
+EXCLUDED_TYPES = ['APARTMENT_GROUP', 'HOUSE_GROUP']
+
+SUBTYPE_MAPPING = {
+    'EXCEPTIONAL_PROPERTY': 'LUXURY_PROPERTY',
+    'VILLA': 'LUXURY_PROPERTY',
+    'MANSION': 'LUXURY_PROPERTY',
+    'CASTLE': 'LUXURY_PROPERTY',
+    'MANOR_HOUSE': 'LUXURY_PROPERTY',
+    'HOUSE': 'STANDARD_HOUSE',
+    'TOWN_HOUSE': 'STANDARD_HOUSE',
+    'BUNGALOW': 'STANDARD_HOUSE',
+    'PAVILION': 'STANDARD_HOUSE',
+    'COUNTRY_COTTAGE': 'RURAL_HOUSE',
+    'FARMHOUSE': 'RURAL_HOUSE',
+    'CHALET': 'RURAL_HOUSE',
+    'APARTMENT': 'STANDARD_APARTMENT',
+    'GROUND_FLOOR': 'STANDARD_APARTMENT',
+    'FLAT_STUDIO': 'STANDARD_APARTMENT',
+    'SERVICE_FLAT': 'STANDARD_APARTMENT',
+    'KOT': 'STANDARD_APARTMENT',
+    'PENTHOUSE': 'SPECIAL_APARTMENT',
+    'DUPLEX': 'SPECIAL_APARTMENT',
+    'TRIPLEX': 'SPECIAL_APARTMENT',
+    'LOFT': 'SPECIAL_APARTMENT',
+    'MIXED_USE_BUILDING': 'MIXED_USE',
+    'OTHER_PROPERTY': 'OTHER'
+}
+
+# Bornes incluses (None = pas de borne) ; les valeurs manquantes sont conservées comme dans le notebook.
+# Le filtre habitableSurface 5-500 m² du notebook était affecté à df_domain sans être appliqué :
+# il n'est pas repris pour produire le même dataset que le modèle en production.
+OUTLIER_FILTERS = {
+    'bedroomCount': (None, 7),
+    'buildingConstructionYear': (1850, 2025),
+    'bathroomCount': (None, 3),
+    'facedeCount': (None, 4),
+    'landSurface': (None, 2000),
+    'gardenSurface': (None, 2000),
+    'toiletCount': (None, 3),
+    'price': (None, 1000000),
+}
+
+BOOLEAN_COLUMNS = ['hasGarden', 'hasSwimmingPool', 'hasFireplace', 'hasTerrace']
+
+
+def drop_unused_columns(df, columns=COLUMNS_TO_DROP):
+    return df.drop(columns=columns, errors='ignore')
+
+
+def filter_types(df, excluded=EXCLUDED_TYPES):
+    return df[~df['type'].isin(excluded)]
+
+
+def group_subtypes(df, mapping=SUBTYPE_MAPPING):
+    """subtype -> subtype_grouped (catégories du modèle)"""
+    if 'subtype' not in df.columns:
+        return df
+    df = df.assign(subtype_grouped=df['subtype'].map(mapping))
+    return df.drop(columns=['subtype'])
+
+
+def filter_outliers(df, filters=OUTLIER_FILTERS):
+    """Tous les filtres de valeurs aberrantes en un seul masque"""
+    keep = np.ones(len(df), dtype=bool)
+    for column, (low, high) in filters.items():
+        if column not in df.columns:
+            continue
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+        in_range = np.ones(len(df), dtype=bool)
+        if low is not None:
+            in_range &= values >= low
+        if high is not None:
+            in_range &= values <= high
+        keep &= in_range | np.isnan(values)
+    return df[keep]
+
+
+def split_floor_count(df):
+    """
+    floorCount -> building_floors (maisons) et apartment_floor (appartements),
+    0 quand la notion ne s'applique pas au type de bien
+    """
+    if 'floorCount' not in df.columns:
+        return df
+    floors = df['floorCount'].fillna(0).to_numpy(dtype=float)
+    is_house = (df['type'] == 'HOUSE').to_numpy()
+    is_apartment = (df['type'] == 'APARTMENT').to_numpy()
+    df = df.assign(
+        building_floors=np.where(is_house, floors, np.where(is_apartment, 0.0, np.nan)),
+        apartment_floor=np.where(is_apartment, floors, np.where(is_house, 0.0, np.nan)),
+    )
+    return df.drop(columns=['floorCount'])
+
+
+def fill_booleans(df, columns=BOOLEAN_COLUMNS):
+    """Booléens manquants -> False ; pas de jardin -> surface de jardin 0"""
+    df = df.assign(**{col: df[col].fillna(False).astype(bool) for col in columns if col in df.columns})
+    if 'hasGarden' in df.columns and 'gardenSurface' in df.columns:
+        df = df.assign(gardenSurface=df['gardenSurface'].where(df['hasGarden'], 0))
+    return df
+
+
+def add_region_and_epc_score(df):
+    """Région depuis le code postal et score PEB numérique (tables de src/features.py)"""
+    codes = region_codes(df['postCode'].to_numpy())
+    labels = np.array(REGIONS + [pd.NA], dtype=object)  # code -1 (inconnu) -> pd.NA
+    df = df.assign(region=labels[codes])
+    epc_column = 'epcScore' if 'epcScore' in df.columns else 'epcNumeric'
+    if epc_column in df.columns and not pd.api.types.is_numeric_dtype(df[epc_column]):
+        df = df.assign(epcNumeric=epc_scores(codes, epc_class_codes(df[epc_column].to_numpy())))
+    return df.drop(columns=['epcScore'], errors='ignore')
+
+
+def drop_missing_target(df, target=TARGET):
+    return df.dropna(subset=[target])
+
+
+def convert_dtypes(df):
+    """
+    Types homogènes (équivalent du convert_dtypes du notebook, relu depuis CSV par PyCaret) :
+    numériques en float64, booléens en bool, texte en object
+    """
+    converted = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            converted[column] = series.astype(bool)
+        elif pd.api.types.is_numeric_dtype(series):
+            converted[column] = series.astype('float64')
+        else:
+            converted[column] = series.astype(object).where(series.notna(), None)
+    return pd.DataFrame(converted, index=df.index)
+
+
+def select_model_columns(df, columns=tuple(EXPECTED_COLUMNS_ORDER), target=TARGET):
+    """Colonnes d'entrée du modèle (ordre de l'application) + prix"""
+    return df.reindex(columns=list(columns) + [target]).reset_index(drop=True)
+
+
+# Ordre du notebook preprocess_code.ipynb ; les paramètres et le code des dépendances
+# (depends_on) font partie de la clé de cache
+CLEANING_STAGES = [
+    Stage('drop_unused_columns', drop_unused_columns, columns=COLUMNS_TO_DROP),
+    Stage('filter_types', filter_types, excluded=EXCLUDED_TYPES),
+    Stage('group_subtypes', group_subtypes, mapping=SUBTYPE_MAPPING),
+    Stage('filter_outliers', filter_outliers, filters=OUTLIER_FILTERS),
+    Stage('split_floor_count', split_floor_count),
+    Stage('fill_booleans', fill_booleans, columns=BOOLEAN_COLUMNS),
+    Stage('add_region_and_epc_score', add_region_and_epc_score, depends_on=[features]),
+    Stage('drop_missing_target', drop_missing_target, target=TARGET),
+    Stage('convert_dtypes', convert_dtypes),
+    Stage('select_model_columns', select_model_columns, columns=tuple(EXPECTED_COLUMNS_ORDER), target=TARGET),
+    # Code de src/schema.py dans la clé : modifier un type ou un vocabulaire recalcule l'étape
+    Stage('apply_schema', apply_schema, depends_on=[schema]),
+]
+
+
+def read_dataset(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, low_memory=False)
+
+
+def clean_dataset(dataset_path, cache_dir, use_cache=True, stages=CLEANING_STAGES):
+    """
+    Nettoyage par étapes avec cache Parquet par empreinte d'entrée (src/stage_runner.py) :
+    seules les étapes dont l'entrée, les paramètres ou le code ont changé sont recalculées.
+    Retourne (DataFrame nettoyé, chemin du Parquet final, rapport par étape).
+    """
+    start = time.perf_counter()
+    digest = file_digest(dataset_path)
+    report = [{'stage': 'hash_dataset', 'cached': False, 'seconds': round(time.perf_counter() - start, 4)}]
+    runner = StageRunner(cache_dir, use_cache=use_cache)
+    df, clean_path, stage_report = runner.run(lambda: read_dataset(dataset_path), digest, stages)
+    return df, clean_path, report + stage_report
@@ -0,0 +1,270 @@
+"""
+Biens comparables (plus proches voisins dans le dataset d'entraînement)
+L'index est construit une fois (scripts/build_comparables_index.py) : features numériques
+standardisées, catégories en one-hot et coordonnées du code postal, écrites en .npy
+mappables en mémoire. Au chargement, un KD-tree (scipy cKDTree) est construit sur ces
+vecteurs ; une requête top-k prend alors quelques millisecondes.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.features import epc_numeric_scores, region_codes
+from src.geodata import LATITUDE_COLUMN, LONGITUDE_COLUMN
+
+INDEX_DIR_NAME = 'comparables_index'
+MANIFEST_NAME = 'manifest.json'
+# Version 2 : score PEB numérique (et non plus rang de classe) ; un index plus ancien est ignoré
+FORMAT_VERSION = 2
+TARGET = 'price'
+
+# Features numériques (log1p pour les surfaces, très asymétriques)
+NUMERIC_FEATURES = ['habitableSurface', 'bedroomCount', 'bathroomCount', 'toiletCount',
+                    'buildingConstructionYear', 'facedeCount', 'landSurface']
+LOG_FEATURES = {'habitableSurface', 'landSurface'}
+CATEGORICAL_FEATURES = ['type', 'subtype_grouped', 'buildingCondition']
+
+# Poids des blocs dans la distance (1 = un écart-type d'une feature numérique)
+FEATURE_WEIGHTS = {
+    'habitableSurface': 2.0,
+    'type': 3.0,
+    'epcNumeric': 0.5,
+}
+# Coordonnées en km : GEO_SCALE_KM d'écart comptent comme un écart-type, avec le poids GEO_WEIGHT
+GEO_SCALE_KM = 10.0
+GEO_WEIGHT = 1.5
+KM_PER_DEGREE_LATITUDE = 111.2
+KM_PER_DEGREE_LONGITUDE = 111.2 * np.cos(np.radians(50.5))  # latitude moyenne de la Belgique
+
+# Colonnes des annonces renvoyées avec les comparables
+LISTING_NUMERIC_COLUMNS = ['price', 'postCode', 'habitableSurface', 'bedroomCount',
+                           'buildingConstructionYear', 'landSurface', 'epcNumeric']
+LISTING_TEXT_COLUMNS = ['type', 'locality']
+DISTANCE_COLUMN = 'distance'
+
+DEFAULT_K = 5
+
+
+def _epc_scores(df):
+    """
+    Score PEB numérique (kWh/m²) : dataset nettoyé et biens de l'application portent déjà
+    le score, une classe A++ ... G éventuelle est convertie selon la région du code postal
+    """
+    return epc_numeric_scores(region_codes(df['postCode'].to_numpy()), df['epcNumeric'].to_numpy())
+
+
+class ComparablesEncoder:
+    """Transforme des biens (colonnes de l'application) en vecteurs de l'espace de distance"""
+
+    def __init__(self, means, stds, categories, use_geo):
+        self.means = means
+        self.stds = stds
+        self.categories = categories
+        self.use_geo = use_geo
+
+    @classmethod
+    def fit(cls, data, use_geo):
+        raw = cls._numeric_block(data, use_geo)
+        means = {col: float(np.nanmean(raw[col])) if np.isfinite(raw[col]).any() else 0.0 for col in raw}
+        stds = {col: float(np.nanstd(raw[col])) or 1.0 if np.isfinite(raw[col]).any() else 1.0 for col in raw}
+        categories = {col: sorted(data[col].dropna().astype(str).unique().tolist())
+                      for col in CATEGORICAL_FEATURES}
+        return cls(means, stds, categories, use_geo)
+
+    @staticmethod
+    def _numeric_block(df, use_geo, coordinates=None):
+        values = df[NUMERIC_FEATURES].to_numpy(dtype=float, na_value=np.nan)
+        block = {col: values[:, j] for j, col in enumerate(NUMERIC_FEATURES)}
+        for col in LOG_FEATURES:
+            block[col] = np.log1p(np.clip(block[col], 0, None))
+        block['epcNumeric'] = _epc_scores(df)
+        if use_geo:
+            if coordinates is None:
+                coordinates = (df[LATITUDE_COLUMN].to_numpy(dtype=float, na_value=np.nan),
+                               df[LONGITUDE_COLUMN].to_numpy(dtype=float, na_value=np.nan))
+            block[LATITUDE_COLUMN], block[LONGITUDE_COLUMN] = coordinates
+        return block
+
+    def dimension_names(self):
+        names = NUMERIC_FEATURES + ['epcNumeric']
+        if self.use_geo:
+            names = names + [LATITUDE_COLUMN, LONGITUDE_COLUMN]
+        for col in CATEGORICAL_FEATURES:
+            names = names + [f"{col}_{value}" for value in self.categories[col]]
+        return names
+
+    def transform(self, df, coordinates=None):
+        """
+        Matrice float32 (n, d) ; valeurs manquantes imputées par la moyenne (0 après standardisation).
+        coordinates : (latitudes, longitudes) à utiliser à la place des colonnes de df
+        """
+        block = self._numeric_block(df, self.use_geo, coordinates)
+        columns = []
+        for col in NUMERIC_FEATURES + ['epcNumeric']:
+            scaled = (block[col] - self.means[col]) / self.stds[col]
+            columns.append(np.nan_to_num(scaled, nan=0.0) * FEATURE_WEIGHTS.get(col, 1.0))
+        if self.use_geo:
+            # Écarts en km (et non en écarts-types) pour que la distance géographique soit isotrope
+            for col, km_per_degree in ((LATITUDE_COLUMN, KM_PER_DEGREE_LATITUDE),
+                                       (LONGITUDE_COLUMN, KM_PER_DEGREE_LONGITUDE)):
+                km = (block[col] - self.means[col]) * km_per_degree
+                columns.append(np.nan_to_num(km / GEO_SCALE_KM, nan=0.0) * GEO_WEIGHT)
+        matrix = np.column_stack(columns)
+
+        one_hots = []
+        for col in CATEGORICAL_FEATURES:
+            values = df[col].astype(str).to_numpy()
+            categories = np.asarray(self.categories[col], dtype=object)
+            one_hot = (values[:, None] == categories[None, :]).astype(float)
+            # Vecteur one-hot de norme 1/sqrt(2) : deux catégories différentes sont à distance 1 (× poids)
+            one_hots.append(one_hot * FEATURE_WEIGHTS.get(col, 1.0) / np.sqrt(2))
+        return np.hstack([matrix] + one_hots).astype(np.float32)
+
+    def to_dict(self):
+        return {'means': self.means, 'stds': self.stds, 'categories': self.categories, 'use_geo': self.use_geo}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['means'], data['stds'], data['categories'], data['use_geo'])
+
+
+def build_comparables_index(data, postcode_index=None):
+    """
+    Construit les tableaux de l'index depuis le dataset nettoyé (une ligne par annonce,
+    colonnes de l'application + price). Les coordonnées viennent du dataset
+    (zipcode_Latitude/zipcode_Longitude) ou, à défaut, de l'index des codes postaux.
+    Retourne (manifest, arrays).
+    """
+    data = data.dropna(subset=[TARGET]).reset_index(drop=True)
+    data = data.assign(epcNumeric=_epc_scores(data))
+    if LATITUDE_COLUMN not in data.columns and postcode_index is not None:
+        data = data.copy()
+        data[LATITUDE_COLUMN], data[LONGITUDE_COLUMN] = postcode_index.coordinates(data['postCode'].to_numpy())
+    use_geo = bool(LATITUDE_COLUMN in data.columns and data[LATITUDE_COLUMN].notna().any())
+
+    encoder = ComparablesEncoder.fit(data, use_geo)
+    arrays = {'vectors': encoder.transform(data)}
+    for col in LISTING_NUMERIC_COLUMNS:
+        arrays[col] = pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=np.float64)
+
+    # Colonnes texte : vocabulaire dans le manifest + codes int32 (-1 si manquant)
+    vocabularies = {}
+    for col in LISTING_TEXT_COLUMNS:
+        codes, uniques = pd.factorize(data[col].astype('string'), sort=True)
+        arrays[f'{col}_codes'] = codes.astype(np.int32)
+        vocabularies[col] = [str(value) for value in uniques]
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'n_listings': int(len(data)),
+        'dimensions': encoder.dimension_names(),
+        'encoder': encoder.to_dict(),
+        'vocabularies': vocabularies,
+    }
+    return manifest, arrays
+
+
+def save_comparables_index(manifest, arrays, output_dir):
+    """Écrit le manifest JSON et un .npy non compressé par tableau (mappables en mémoire)"""
+    os.makedirs(output_dir, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(output_dir, f'{name}.npy'), array, allow_pickle=False)
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+
+class ComparablesIndex:
+    """Index des biens comparables chargé depuis le disque (tableaux en mémoire mappée + KD-tree)"""
+
+    def __init__(self, manifest, arrays):
+        from scipy.spatial import cKDTree
+
+        self.manifest = manifest
+        self.encoder = ComparablesEncoder.from_dict(manifest['encoder'])
+        self.vocabularies = manifest['vocabularies']
+        self.arrays = arrays
+        self.tree = cKDTree(arrays['vectors'])
+
+    @classmethod
+    def load(cls, index_dir, mmap=True):
+        with open(os.path.join(index_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        names = ['vectors'] + LISTING_NUMERIC_COLUMNS + [f'{col}_codes' for col in LISTING_TEXT_COLUMNS]
+        arrays = {
+            name: np.load(os.path.join(index_dir, f'{name}.npy'),
+                          mmap_mode='r' if mmap else None, allow_pickle=False)
+            for name in names
+        }
+        return cls(manifest, arrays)
+
+    def __len__(self):
+        return self.manifest['n_listings']
+
+    def query(self, df, k=DEFAULT_K, coordinates=None):
+        """
+        k plus proches annonces pour chaque bien de df. Retourne (distances (n, k), positions (n, k)),
+        vectorisé. coordinates : (latitudes, longitudes) si df n'a pas les colonnes du notebook.
+        """
+        k = min(k, len(self))
+        distances, positions = self.tree.query(self.encoder.transform(df, coordinates), k=k)
+        return distances.reshape(len(df), k), positions.reshape(len(df), k)
+
+    def listings(self, positions, distances=None):
+        """Annonces aux positions données (DataFrame), avec la distance si fournie"""
+        positions = np.asarray(positions).ravel()
+        columns = {}
+        for col in LISTING_TEXT_COLUMNS:
+            # Code -1 (manquant) -> dernier élément du vocabulaire : None
+            vocabulary = np.asarray(self.vocabularies[col] + [None], dtype=object)
+            columns[col] = vocabulary[np.asarray(self.arrays[f'{col}_codes'][positions])]
+        for col in LISTING_NUMERIC_COLUMNS:
+            columns[col] = np.asarray(self.arrays[col][positions])
+        if distances is not None:
+            columns[DISTANCE_COLUMN] = np.asarray(distances).ravel()
+        return pd.DataFrame(columns)
+
+    def comparables(self, df_row, k=DEFAULT_K, postcode_index=None):
+        """
+        Top-k comparables d'un bien (DataFrame d'une ligne, colonnes de l'application).
+        Les coordonnées sont celles de son code postal (NaN -> critère géographique neutre).
+        """
+        coordinates = None
+        if self.encoder.use_geo and LATITUDE_COLUMN not in df_row.columns:
+            if postcode_index is not None:
+                coordinates = postcode_index.coordinates(df_row['postCode'].to_numpy())
+            else:
+                coordinates = (np.full(len(df_row), np.nan), np.full(len(df_row), np.nan))
+        distances, positions = self.query(df_row, k, coordinates)
+        return self.listings(positions[0], distances[0])
+
+
+def comparables_index_path(base_dir):
+    return os.path.join(base_dir, 'data', INDEX_DIR_NAME)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_comparables_index(base_dir):
+    """
+    Index partagé par le processus (chargé une fois), None s'il n'a pas été construit
+    ou s'il date d'un format antérieur (à reconstruire avec scripts/build_comparables_index.py)
+    """
+    index_dir = comparables_index_path(base_dir)
+    if index_dir in _indexes:
+        return _indexes[index_dir]
+    with _indexes_lock:
+        if index_dir not in _indexes:
+            manifest_path = os.path.join(index_dir, MANIFEST_NAME)
+            index = None
+            if os.path.exists(manifest_path):
+                with open(manifest_path, encoding='utf-8') as f:
+                    if json.load(f).get('format_version') == FORMAT_VERSION:
+                        index = ComparablesIndex.load(index_dir)
+            _indexes[index_dir] = index
+        return _indexes[index_dir]
@@ -0,0 +1,304 @@
+"""
+Format d'inférence compact pour Immo Eliza
+Le pipeline PyCaret ajusté (imputers, encodeurs, Yeo-Johnson, MinMax, LightGBM)
+est compilé en tables de correspondance et tableaux NumPy stockés non compressés
+(chargeables en mémoire mappée), et prédit sans pycaret / category_encoders / sklearn.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = 'manifest.json'
+FORMAT_VERSION = 1
+
+# Types de valeurs manquantes des splits LightGBM
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_MISSING_TYPES = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+_ZERO_THRESHOLD = 1e-35
+
+_UNKNOWN_PROBE = '__immo_eliza_unknown__'
+
+
+# --- Compilation (nécessite l'environnement d'entraînement) ---
+
+def _probe_encoder(encoder, columns, categories_by_column):
+    """
+    Construit, pour chaque colonne, la table de sortie de l'encodeur pour :
+    chaque catégorie connue, une catégorie inconnue, puis une valeur manquante
+    """
+    probes = {col: list(categories_by_column[col]) + [_UNKNOWN_PROBE, np.nan] for col in columns}
+    n_rows = max(len(values) for values in probes.values())
+    frame = pd.DataFrame({
+        col: values + [categories_by_column[col][0]] * (n_rows - len(values))
+        for col, values in probes.items()
+    })
+    encoded = encoder.transform(frame)
+
+    lookups = []
+    for col in columns:
+        if len(columns) == 1:
+            output_columns = list(encoded.columns)
+        else:
+            output_columns = [c for c in encoded.columns if c == col or c.startswith(f"{col}_")]
+        table = encoded[output_columns].to_numpy(dtype=float)[:len(probes[col])]
+        lookups.append({
+            'column': col,
+            'categories': [str(c) for c in categories_by_column[col]],
+            'output_columns': output_columns,
+            'table': table,
+        })
+    return lookups
+
+
+def _encoder_categories(encoder):
+    """Catégories apprises par un encodeur category_encoders (via son OrdinalEncoder interne)"""
+    ordinal = getattr(encoder, 'ordinal_encoder', None) or encoder
+    categories = {}
+    for mapping in ordinal.mapping:
+        index = [value for value in mapping['mapping'].index if not pd.isna(value)]
+        categories[mapping['col']] = index
+    return categories
+
+
+def _compile_trees(booster):
+    """Aplatit les arbres LightGBM en tableaux (noeuds internes + feuilles)"""
+    dump = booster.dump_model()
+    feature, threshold, default_left, missing_type, left, right = [], [], [], [], [], []
+    leaf_value, roots = [], []
+
+    def visit(node):
+        if 'leaf_index' in node:
+            leaf_value.append(node['leaf_value'])
+            return -len(leaf_value)  # feuille encodée -(index + 1)
+
+        if node['decision_type'] != '<=':
+            raise ValueError(f"Split non supporté : {node['decision_type']}")
+        index = len(feature)
+        feature.append(node['split_feature'])
+        threshold.append(node['threshold'])
+        default_left.append(node['default_left'])
+        missing_type.append(_MISSING_TYPES[node['missing_type']])
+        left.append(0)
+        right.append(0)
+        left[index] = visit(node['left_child'])
+        right[index] = visit(node['right_child'])
+        return index
+
+    for tree in dump['tree_info']:
+        roots.append(visit(tree['tree_structure']))
+
+    arrays = {
+        'tree_feature': np.array(feature, dtype=np.int32),
+        'tree_threshold': np.array(threshold, dtype=np.float64),
+        'tree_default_left': np.array(default_left, dtype=bool),
+        'tree_missing_type': np.array(missing_type, dtype=np.int8),
+        'tree_left': np.array(left, dtype=np.int32),
+        'tree_right': np.array(right, dtype=np.int32),
+        'tree_leaf_value': np.array(leaf_value, dtype=np.float64),
+        'tree_roots': np.array(roots, dtype=np.int32),
+    }
+    return dump['feature_names'], arrays
+
+
+def compile_pipeline(pipeline, input_columns):
+    """
+    Compile un pipeline PyCaret ajusté en (manifest, tableaux).
+    Lève ValueError si une étape n'est pas supportée.
+    """
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'input_columns': list(input_columns),
+        'numeric_fill': {},
+        'categorical_fill': {},
+        'encoders': [],
+    }
+    arrays = {}
+    n_steps = len(pipeline.steps)
+
+    for step_index, (name, step) in enumerate(pipeline.steps):
+        transformer = getattr(step, 'transformer', step)
+        kind = type(transformer).__name__
+
+        if step_index == n_steps - 1:
+            if not hasattr(transformer, 'booster_'):
+                raise ValueError(f"Estimateur final non supporté : {kind}")
+            lgb_feature_names, tree_arrays = _compile_trees(transformer.booster_)
+            arrays.update(tree_arrays)
+
+        elif kind == 'SimpleImputer':
+            for col, value in zip(transformer.feature_names_in_, transformer.statistics_):
+                if isinstance(value, str):
+                    manifest['categorical_fill'][col] = value
+                else:
+                    manifest['numeric_fill'][col] = float(value)
+
+        elif kind in ('OrdinalEncoder', 'OneHotEncoder', 'TargetEncoder'):
+            columns = list(transformer.feature_names_in_)
+            for lookup in _probe_encoder(transformer, columns, _encoder_categories(transformer)):
+                table_name = f"encoder_{len(manifest['encoders'])}"
+                arrays[table_name] = lookup.pop('table')
+                lookup['table'] = table_name
+                manifest['encoders'].append(lookup)
+
+        elif kind == 'PowerTransformer':
+            if transformer.method != 'yeo-johnson':
+                raise ValueError(f"Méthode non supportée : {transformer.method}")
+            manifest['feature_names'] = [str(c) for c in transformer.feature_names_in_]
+            arrays['yeo_johnson_lambdas'] = np.asarray(transformer.lambdas_, dtype=np.float64)
+            if transformer.standardize:
+                arrays['standard_mean'] = np.asarray(transformer._scaler.mean_, dtype=np.float64)
+                arrays['standard_scale'] = np.asarray(transformer._scaler.scale_, dtype=np.float64)
+
+        elif kind == 'MinMaxScaler':
+            manifest.setdefault('feature_names', [str(c) for c in transformer.feature_names_in_])
+            arrays['minmax_scale'] = np.asarray(transformer.scale_, dtype=np.float64)
+            arrays['minmax_min'] = np.asarray(transformer.min_, dtype=np.float64)
+
+        else:
+            raise ValueError(f"Étape '{name}' non supportée : {kind}")
+
+    if len(manifest.get('feature_names', [])) != len(lgb_feature_names):
+        raise ValueError("Nombre de features incohérent entre les transformations et le modèle")
+    return manifest, arrays
+
+
+def array_digest(array):
+    """Empreinte SHA-1 d'un tableau (type, forme et contenu)"""
+    array = np.ascontiguousarray(array)
+    digest = hashlib.sha1(f"{array.dtype.str}{array.shape}".encode('utf-8'))
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def save_compiled(manifest, arrays, output_dir):
+    """
+    Écrit le manifest JSON et un fichier .npy non compressé par tableau.
+    Le manifest porte l'empreinte de chaque tableau : il change dès qu'un arbre ou une table
+    change, et son sha1 identifie donc tout le modèle compilé (version du registre).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for array_name, array in arrays.items():
+        np.save(os.path.join(output_dir, f"{array_name}.npy"), array, allow_pickle=False)
+    manifest = dict(manifest, arrays=sorted(arrays),
+                    array_digests={array_name: array_digest(array) for array_name, array in sorted(arrays.items())})
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+
+# --- Inférence (NumPy + pandas uniquement) ---
+
+def _yeo_johnson(X, lambdas):
+    """Transformation de Yeo-Johnson colonne par colonne (mêmes conventions que sklearn)"""
+    out = np.empty_like(X)
+    eps = np.spacing(1.0)
+    positive = X >= 0
+    for j, lmbda in enumerate(lambdas):
+        x = X[:, j]
+        pos = positive[:, j]
+        neg = ~pos & ~np.isnan(x)
+        col = np.full(len(x), np.nan)
+        if abs(lmbda) < eps:
+            col[pos] = np.log1p(x[pos])
+        else:
+            col[pos] = (np.power(x[pos] + 1, lmbda) - 1) / lmbda
+        if abs(lmbda - 2) > eps:
+            col[neg] = -(np.power(-x[neg] + 1, 2 - lmbda) - 1) / (2 - lmbda)
+        else:
+            col[neg] = -np.log1p(-x[neg])
+        out[:, j] = col
+    return out
+
+
+class CompiledModel:
+    """Prédicteur pur NumPy chargé depuis un dossier produit par save_compiled"""
+
+    def __init__(self, manifest, arrays):
+        self.manifest = manifest
+        self.arrays = arrays
+        self.feature_names = manifest['feature_names']
+        self._feature_index = {name: j for j, name in enumerate(self.feature_names)}
+        self._encoded_columns = set()
+        self._encoders = []
+        for encoder in manifest['encoders']:
+            self._encoded_columns.add(encoder['column'])
+            self._encoders.append((
+                encoder['column'],
+                pd.Index(encoder['categories']),
+                [self._feature_index[c] for c in encoder['output_columns']],
+                arrays[encoder['table']],
+            ))
+
+    @classmethod
+    def load(cls, model_dir, mmap=True):
+        with open(os.path.join(model_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        arrays = {
+            array_name: np.load(os.path.join(model_dir, f"{array_name}.npy"),
+                                mmap_mode='r' if mmap else None, allow_pickle=False)
+            for array_name in manifest['arrays']
+        }
+        return cls(manifest, arrays)
+
+    def transform(self, df):
+        """Matrice de features (n, 69) équivalente aux étapes de prétraitement du pipeline"""
+        n_rows = len(df)
+        X = np.full((n_rows, len(self.feature_names)), np.nan)
+
+        for col in self.manifest['input_columns']:
+            if col in self._encoded_columns or col not in self._feature_index:
+                continue
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            fill = self.manifest['numeric_fill'].get(col)
+            if fill is not None:
+                values = np.where(np.isnan(values), fill, values)
+            X[:, self._feature_index[col]] = values
+
+        categorical_fill = self.manifest['categorical_fill']
+        for col, categories, output_index, table in self._encoders:
+            values = df[col].to_numpy(dtype=object)
+            if col in categorical_fill:
+                # Comme SimpleImputer : seuls les NaN flottants sont imputés
+                is_nan = np.array([isinstance(v, float) and np.isnan(v) for v in values], dtype=bool)
+                values = np.where(is_nan, categorical_fill[col], values)
+            codes = categories.get_indexer(values)
+            codes[codes < 0] = len(categories)              # catégorie inconnue
+            codes[pd.isna(values)] = len(categories) + 1    # valeur manquante
+            X[:, output_index] = table[codes]
+
+        X = _yeo_johnson(X, self.arrays['yeo_johnson_lambdas'])
+        if 'standard_mean' in self.arrays:
+            X = (X - self.arrays['standard_mean']) / self.arrays['standard_scale']
+        if 'minmax_scale' in self.arrays:
+            X = X * self.arrays['minmax_scale'] + self.arrays['minmax_min']
+        return X
+
+    def predict_transformed(self, X):
+        """Somme des feuilles atteintes dans chaque arbre (parcours vectorisé sur toutes les lignes)"""
+        a = self.arrays
+        roots = np.asarray(a['tree_roots'])
+        node = np.tile(roots, (len(X), 1))
+        rows = np.repeat(np.arange(len(X))[:, None], len(roots), axis=1)
+
+        active = node >= 0
+        while active.any():
+            idx = node[active]
+            x = X[rows[active], a['tree_feature'][idx]]
+            missing_type = a['tree_missing_type'][idx]
+
+            is_nan = np.isnan(x)
+            x = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, x)
+            use_default = ((missing_type == MISSING_NAN) & is_nan) | \
+                          ((missing_type == MISSING_ZERO) & (np.abs(x) <= _ZERO_THRESHOLD))
+            go_left = np.where(use_default, a['tree_default_left'][idx], x <= a['tree_threshold'][idx])
+
+            node[active] = np.where(go_left, a['tree_left'][idx], a['tree_right'][idx])
+            active = node >= 0
+
+        return np.asarray(a['tree_leaf_value'])[-node - 1].sum(axis=1)
+
+    def predict(self, df):
+        return self.predict_transformed(self.transform(df))
@@ -0,0 +1,171 @@
+"""
+Détection de dérive des entrées du modèle (journal des prédictions vs dataset d'entraînement)
+Les histogrammes de référence sont précalculés une fois sur le dataset nettoyé
+(bornes aux déciles pour les features numériques, fréquences pour les catégorielles).
+Les comptages d'un fichier du journal sont calculés une seule fois (fichier fermé,
+jamais réécrit) et gardés dans un sous-dossier _histograms/ (ignoré par les lecteurs
+Parquet du dossier) : le job ne lit que les nouveaux fichiers.
+La dérive de chaque feature est mesurée par le PSI (population stability index).
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.prediction import EXPECTED_COLUMNS_ORDER, prepare_frame
+
+REFERENCE_NAME = 'drift_reference.json'
+HISTOGRAM_DIR_NAME = '_histograms'
+NUMERIC_BINS = 10
+MAX_CATEGORIES = 30
+
+# Seuils usuels du PSI
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+# En dessous, le PSI est dominé par le bruit d'échantillonnage : pas de statut
+MIN_OBSERVATIONS = 200
+# Proportion plancher (évite log(0) pour un intervalle vide d'un côté)
+_EPSILON = 1e-4
+
+
+def drift_reference_path(base_dir):
+    return os.path.join(base_dir, 'data', REFERENCE_NAME)
+
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def _bin_counts(feature, values):
+    """Comptages d'une colonne dans les intervalles de la référence (dernier élément : manquants)"""
+    if feature['kind'] == 'numeric':
+        numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        missing = np.isnan(numbers)
+        bins = np.searchsorted(feature['edges'], numbers[~missing], side='right')
+        counts = np.bincount(bins, minlength=len(feature['edges']) + 1)
+        return counts.tolist() + [int(missing.sum())]
+
+    labels = feature['categories']
+    positions = {label: i for i, label in enumerate(labels)}
+    counts = [0] * (len(labels) + 2)
+    for value, count in values.astype(object).where(values.notna(), None).value_counts(dropna=False).items():
+        if value is None:
+            counts[-1] += int(count)
+        else:
+            counts[positions.get(str(value), len(labels))] += int(count)
+    return counts
+
+
+def build_reference(df, bins=NUMERIC_BINS, max_categories=MAX_CATEGORIES):
+    """Histogrammes de référence (proportions) des features du modèle dans df (features déjà préparées)"""
+    features = {}
+    for col in EXPECTED_COLUMNS_ORDER:
+        values = df[col]
+        if _is_numeric(values):
+            numbers = values.to_numpy(dtype=float, na_value=np.nan)
+            present = numbers[~np.isnan(numbers)]
+            quantiles = np.quantile(present, np.linspace(0, 1, bins + 1)[1:-1]) if len(present) else []
+            feature = {'kind': 'numeric', 'edges': np.unique(quantiles).tolist()}
+        else:
+            top = values.dropna().astype(str).value_counts().index[:max_categories]
+            feature = {'kind': 'categorical', 'categories': top.tolist()}
+        counts = np.array(_bin_counts(feature, values), dtype=float)
+        feature['proportions'] = (counts / counts.sum()).tolist()
+        features[col] = feature
+
+    reference = {'rows': len(df), 'created_at': time.time(), 'features': features}
+    reference['fingerprint'] = hashlib.sha1(json.dumps(features, sort_keys=True).encode('utf-8')).hexdigest()
+    return reference
+
+
+def save_reference(reference, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(reference, f, ensure_ascii=False)
+
+
+def load_reference(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def log_features(log_df):
+    """Features telles que vues par le modèle (région et score PEB recalculés) depuis le journal"""
+    return prepare_frame(log_df)
+
+
+def histogram_counts(reference, df):
+    """Comptages par feature d'un DataFrame de features préparées"""
+    return {col: _bin_counts(feature, df[col]) for col, feature in reference['features'].items()}
+
+
+def file_histograms(reference, path):
+    """
+    Comptages d'un fichier du journal, mis en cache dans _histograms/
+    (recalculés seulement si la référence change)
+    """
+    cache_dir = os.path.join(os.path.dirname(path), HISTOGRAM_DIR_NAME)
+    cache_path = os.path.join(cache_dir, os.path.basename(path) + '.json')
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['reference'] == reference['fingerprint']:
+            return cached
+
+    log_df = pd.read_parquet(path, columns=EXPECTED_COLUMNS_ORDER)
+    result = {'reference': reference['fingerprint'], 'rows': len(log_df),
+              'counts': histogram_counts(reference, log_features(log_df))}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    return result
+
+
+def psi(expected, actual_counts):
+    """Population stability index entre proportions de référence et comptages observés"""
+    expected = np.maximum(np.asarray(expected, dtype=float), _EPSILON)
+    actual = np.asarray(actual_counts, dtype=float)
+    if actual.sum() == 0:
+        return None
+    actual = np.maximum(actual / actual.sum(), _EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def drift_report(reference, counts):
+    """Une ligne par feature (PSI, part de manquants, statut), de la plus dérivée à la moins dérivée"""
+    rows = []
+    for col, feature in reference['features'].items():
+        observed = counts[col]
+        total = sum(observed)
+        value = psi(feature['proportions'], observed)
+        if value is None:
+            status = 'no_data'
+        elif total < MIN_OBSERVATIONS:
+            status = 'insufficient'
+        else:
+            status = 'drift' if value >= PSI_DRIFT else 'warning' if value >= PSI_WARNING else 'ok'
+        rows.append({
+            'feature': col,
+            'psi': value,
+            'status': status,
+            'missing_reference': feature['proportions'][-1],
+            'missing_observed': observed[-1] / total if total else None,
+        })
+    rows.sort(key=lambda row: -1 if row['psi'] is None else row['psi'], reverse=True)
+    return rows
+
+
+def sum_counts(histograms):
+    """Somme des comptages de plusieurs fichiers"""
+    total = {}
+    for histogram in histograms:
+        for col, counts in histogram['counts'].items():
+            if col in total:
+                total[col] = [a + b for a, b in zip(total[col], counts)]
+            else:
+                total[col] = list(counts)
+    return total
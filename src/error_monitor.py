@@ -0,0 +1,298 @@
+"""
+Suivi en continu de l'erreur du modèle à partir des prix réels donnés dans les feedbacks
+Pour chaque segment (global, région, type de bien, tranche de prix estimé) : MAE, MAPE et
+biais glissants (moyennes exponentielles), moyennes depuis le début, et quantiles de
+l'erreur relative par t-digest. Mémoire constante quel que soit le nombre de feedbacks ;
+mis à jour à chaque écriture dans la base (src/feedback_store.py), dont l'état est
+sauvegardé dans la même base : un redémarrage ne relit que les feedbacks postérieurs.
+"""
+
+import bisect
+import math
+import threading
+
+MONITOR_STATE = 'error_monitor'
+
+# Bornes des tranches de prix estimé (€) : la tranche est connue dès la prédiction
+PRICE_BANDS = [200_000, 300_000, 400_000, 500_000, 750_000]
+SEGMENT_KINDS = ('global', 'region', 'type', 'price_band')
+
+# Demi-vie des moyennes glissantes, en nombre de feedbacks avec prix réel du segment
+DEFAULT_HALFLIFE = 100
+# Le t-digest courant est archivé tous les `window` points : les quantiles portent sur les
+# `window` à 2 × `window` derniers feedbacks du segment
+DEFAULT_WINDOW = 500
+DEFAULT_COMPRESSION = 100
+QUANTILES = (0.5, 0.9)
+
+
+class TDigest:
+    """
+    t-digest fusionnant (Dunning) : centroïdes triés, fonction d'échelle k1.
+    Quantiles approchés avec au plus ~compression centroïdes, quel que soit le nombre de points.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = []
+        self.weights = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+
+    def add(self, value, weight=1.0):
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other):
+        other._compress()
+        self._buffer.extend(zip(other.means, other.weights))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+        means, weights = [], []
+        cumulative = 0.0
+        mean, weight = points[0]
+        k_limit = self._k(0.0) + 1
+        for value, value_weight in points[1:]:
+            if self._k((cumulative + weight + value_weight) / total) <= k_limit:
+                weight += value_weight
+                mean += (value - mean) * value_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                cumulative += weight
+                k_limit = self._k(cumulative / total) + 1
+                mean, weight = value, value_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def quantile(self, q):
+        """Quantile approché (interpolation entre les centres des centroïdes), None si vide"""
+        self._compress()
+        if not self.means:
+            return None
+        target = q * self.count
+        cumulative = 0.0
+        previous_mid, previous_mean = 0.0, self.min
+        for mean, weight in zip(self.means, self.weights):
+            mid = cumulative + weight / 2
+            if target < mid:
+                span = mid - previous_mid
+                return previous_mean + (mean - previous_mean) * ((target - previous_mid) / span if span else 0.0)
+            cumulative += weight
+            previous_mid, previous_mean = mid, mean
+        span = self.count - previous_mid
+        return previous_mean + (self.max - previous_mean) * ((target - previous_mid) / span if span else 0.0)
+
+    def to_dict(self):
+        self._compress()
+        return {'compression': self.compression, 'means': self.means, 'weights': self.weights,
+                'count': self.count, 'min': self.min if self.count else None, 'max': self.max if self.count else None}
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(data['compression'])
+        digest.means, digest.weights, digest.count = list(data['means']), list(data['weights']), data['count']
+        if data['count']:
+            digest.min, digest.max = data['min'], data['max']
+        return digest
+
+
+class SegmentErrors:
+    """Erreurs d'un segment : moyennes glissantes et cumulées, t-digests courant et précédent"""
+
+    def __init__(self, halflife=DEFAULT_HALFLIFE, window=DEFAULT_WINDOW, compression=DEFAULT_COMPRESSION):
+        self.halflife = halflife
+        self.window = window
+        self.compression = compression
+        self.count = 0
+        self.sums = {'abs_error': 0.0, 'abs_pct_error': 0.0, 'error': 0.0}
+        self.rolling = {'abs_error': 0.0, 'abs_pct_error': 0.0, 'error': 0.0}
+        self.digest = TDigest(compression)
+        self.previous_digest = None
+
+    def update(self, predicted_price, actual_price):
+        error = predicted_price - actual_price
+        values = {'abs_error': abs(error), 'abs_pct_error': abs(error) / actual_price, 'error': error}
+        self.count += 1
+        # Moyenne simple tant que le segment a peu de points, puis exponentielle (demi-vie en feedbacks)
+        alpha = max(1 - 0.5 ** (1 / self.halflife), 1 / self.count)
+        for name, value in values.items():
+            self.sums[name] += value
+            self.rolling[name] += alpha * (value - self.rolling[name])
+        self.digest.add(values['abs_pct_error'])
+        if self.digest.count >= self.window:
+            self.previous_digest, self.digest = self.digest, TDigest(self.compression)
+
+    def quantiles(self, quantiles=QUANTILES):
+        digest = TDigest(self.compression)
+        for part in (self.previous_digest, self.digest):
+            if part is not None and part.count:
+                digest.merge(part)
+        return {q: digest.quantile(q) for q in quantiles}
+
+    def summary(self):
+        count = self.count
+        quantiles = self.quantiles()
+        mape = self.sums['abs_pct_error'] / count if count else None
+        return {
+            'count': count,
+            'mae': self.rolling['abs_error'] if count else None,
+            'mape': self.rolling['abs_pct_error'] if count else None,
+            'bias': self.rolling['error'] if count else None,
+            'mape_all_time': mape,
+            # > 1 : l'erreur récente dépasse l'erreur habituelle du segment
+            'drift_ratio': self.rolling['abs_pct_error'] / mape if mape else None,
+            **{f'pct_error_p{int(q * 100)}': value for q, value in quantiles.items()},
+        }
+
+    def to_dict(self):
+        return {'halflife': self.halflife, 'window': self.window, 'compression': self.compression,
+                'count': self.count, 'sums': self.sums, 'rolling': self.rolling, 'digest': self.digest.to_dict(),
+                'previous_digest': self.previous_digest.to_dict() if self.previous_digest else None}
+
+    @classmethod
+    def from_dict(cls, data):
+        segment = cls(data['halflife'], data['window'], data['compression'])
+        segment.count, segment.sums, segment.rolling = data['count'], dict(data['sums']), dict(data['rolling'])
+        segment.digest = TDigest.from_dict(data['digest'])
+        if data['previous_digest']:
+            segment.previous_digest = TDigest.from_dict(data['previous_digest'])
+        return segment
+
+
+def price_band(predicted_price):
+    """Libellé de la tranche de prix estimé"""
+    index = bisect.bisect_right(PRICE_BANDS, predicted_price)
+    if index == 0:
+        return f"< {PRICE_BANDS[0] // 1000} k€"
+    if index == len(PRICE_BANDS):
+        return f">= {PRICE_BANDS[-1] // 1000} k€"
+    return f"{PRICE_BANDS[index - 1] // 1000}-{PRICE_BANDS[index] // 1000} k€"
+
+
+def feedback_segments(feedback):
+    """Segments (type de segment, valeur) auxquels contribue un feedback"""
+    segments = [('global', 'tous')]
+    if feedback.get('region'):
+        segments.append(('region', feedback['region']))
+    if feedback.get('type'):
+        segments.append(('type', feedback['type']))
+    segments.append(('price_band', price_band(feedback['predicted_price'])))
+    return segments
+
+
+class ErrorMonitor:
+    """Erreurs par segment, mises à jour feedback par feedback (thread-safe)"""
+
+    def __init__(self, halflife=DEFAULT_HALFLIFE, window=DEFAULT_WINDOW, compression=DEFAULT_COMPRESSION):
+        self.halflife = halflife
+        self.window = window
+        self.compression = compression
+        self.segments = {}
+        self.last_id = 0
+        self.store = None
+        self.save_every = None
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+    def update(self, feedback):
+        """Ajoute un feedback (ignoré sans prix réel) ; retourne True s'il a été pris en compte"""
+        actual_price = feedback.get('actual_price')
+        if actual_price is None or actual_price <= 0:
+            return False
+        predicted_price = float(feedback['predicted_price'])
+        for key in feedback_segments(feedback):
+            segment = self.segments.get(key)
+            if segment is None:
+                segment = self.segments[key] = SegmentErrors(self.halflife, self.window, self.compression)
+            segment.update(predicted_price, float(actual_price))
+        return True
+
+    def summary(self):
+        """Une ligne par segment, triée par type de segment puis nombre de feedbacks"""
+        with self._lock:
+            rows = [dict(segment.summary(), kind=kind, segment=value)
+                    for (kind, value), segment in self.segments.items()]
+        rows.sort(key=lambda row: (SEGMENT_KINDS.index(row['kind']), -row['count']))
+        return rows
+
+    def to_dict(self):
+        return {'halflife': self.halflife, 'window': self.window, 'compression': self.compression,
+                'last_id': self.last_id,
+                'segments': [[kind, value, segment.to_dict()] for (kind, value), segment in self.segments.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        monitor = cls(data['halflife'], data['window'], data['compression'])
+        monitor.last_id = data['last_id']
+        monitor.segments = {(kind, value): SegmentErrors.from_dict(segment)
+                            for kind, value, segment in data['segments']}
+        return monitor
+
+    # --- Suivi d'une base de feedbacks ---
+
+    @classmethod
+    def attach(cls, store, save_every=50, **kwargs):
+        """
+        Moniteur restauré depuis la base (ou créé), rattrapé sur les feedbacks écrits depuis
+        la dernière sauvegarde, puis abonné aux écritures suivantes
+        """
+        state = store.load_state(MONITOR_STATE)
+        monitor = cls.from_dict(state) if state else cls(**kwargs)
+        monitor.store = store
+        monitor.save_every = save_every
+        with monitor._lock:
+            monitor._catch_up()
+        store.subscribe(monitor.on_feedback)
+        return monitor
+
+    def _catch_up(self, batch_size=5000):
+        while True:
+            rows = self.store.after(self.last_id, limit=batch_size)
+            if not rows:
+                return
+            for feedback_id, feedback in rows:
+                self.update(feedback)
+                self._unsaved += 1
+            self.last_id = rows[-1][0]
+
+    def on_feedback(self, feedback_id, feedback):
+        """Appelé par FeedbackStore après chaque écriture"""
+        with self._lock:
+            if feedback_id == self.last_id + 1:
+                self.update(feedback)
+                self.last_id = feedback_id
+                self._unsaved += 1
+            elif feedback_id > self.last_id:
+                # Feedbacks écrits entre-temps par un autre processus : relus depuis la base
+                self._catch_up()
+            if self.save_every and self._unsaved >= self.save_every:
+                self._save()
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        if self.store is not None and self._unsaved:
+            self.store.save_state(MONITOR_STATE, self.to_dict())
+            self._unsaved = 0
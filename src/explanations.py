@@ -0,0 +1,112 @@
+"""
+Explication des prédictions (contributions des features)
+Le dernier estimateur du pipeline est un LightGBM : ses contributions TreeSHAP exactes
+(pred_contrib) sont calculées sur les features transformées, puis regroupées par colonne
+d'entrée (province_Namur, province_Liège... -> province). L'explainer est construit une
+fois par version du modèle.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.model_registry import MODEL_BASENAME, MODEL_DIR_NAME, registry
+from src.prediction import EXPECTED_COLUMNS_ORDER
+
+BASE_VALUE_COLUMN = 'base_value'
+CONTRIBUTION_PREFIX = 'contrib_'
+
+
+def input_column_for(feature_name):
+    """Colonne d'entrée à l'origine d'une feature transformée (one-hot inclus)"""
+    if feature_name in EXPECTED_COLUMNS_ORDER:
+        return feature_name
+    matches = [col for col in EXPECTED_COLUMNS_ORDER if feature_name.startswith(f"{col}_")]
+    return max(matches, key=len) if matches else feature_name
+
+
+class Explainer:
+    """
+    transform : DataFrame préparé -> matrice des features transformées (ordre du booster)
+    booster   : lightgbm.Booster du dernier étage du pipeline
+    """
+
+    def __init__(self, transform, booster, feature_names):
+        self.transform = transform
+        self.booster = booster
+        self.feature_names = list(feature_names)
+        self.input_columns = [input_column_for(name) for name in self.feature_names]
+        # Matrice de regroupement (features transformées x colonnes d'entrée)
+        self.group_columns = list(dict.fromkeys(self.input_columns))
+        self._grouping = np.zeros((len(self.feature_names), len(self.group_columns)))
+        for j, column in enumerate(self.input_columns):
+            self._grouping[j, self.group_columns.index(column)] = 1.0
+
+    def contributions(self, df):
+        """(contributions par feature transformée (n, f), valeur de base (n,)), en un appel"""
+        X = np.asarray(self.transform(df), dtype=float)
+        raw = self.booster.predict(X, pred_contrib=True)
+        return raw[:, :-1], raw[:, -1]
+
+    def explain(self, df):
+        """
+        Contributions regroupées par colonne d'entrée : DataFrame (une ligne par bien)
+        avec base_value ; base_value + somme des contributions = prix prédit
+        """
+        contributions, base_values = self.contributions(df)
+        grouped = pd.DataFrame(contributions @ self._grouping, columns=self.group_columns, index=df.index)
+        grouped.insert(0, BASE_VALUE_COLUMN, base_values)
+        return grouped
+
+    def top_contributions(self, df_row, limit=8):
+        """Les `limit` colonnes qui pèsent le plus (en valeur absolue) pour un bien : Series triée"""
+        explanation = self.explain(df_row).iloc[0].drop(BASE_VALUE_COLUMN)
+        order = explanation.abs().sort_values(ascending=False).index[:limit]
+        return explanation[order]
+
+
+def _reference_pipeline(base_dir):
+    """Pipeline joblib de référence (le modèle compilé n'embarque pas le booster LightGBM)"""
+    joblib_path = os.path.join(base_dir, MODEL_DIR_NAME, f'{MODEL_BASENAME}.joblib')
+    pkl_path = os.path.join(base_dir, MODEL_DIR_NAME, f'{MODEL_BASENAME}.pkl')
+    if os.path.exists(joblib_path):
+        return registry.get(joblib_path, 'joblib').model
+    return registry.get(pkl_path, 'pycaret').model
+
+
+def build_explainer(model_entry, base_dir):
+    """Explainer pour le modèle servi (transformations compilées si disponibles)"""
+    pipeline = model_entry.model if model_entry.model_type != 'compiled' else _reference_pipeline(base_dir)
+    estimator = pipeline.steps[-1][1]
+    if not hasattr(estimator, 'booster_'):
+        raise ValueError(f"Explications non supportées pour {type(estimator).__name__}")
+
+    if model_entry.model_type == 'compiled':
+        # Même matrice que le pipeline, sans le coût des transformers sklearn/PyCaret
+        transform = model_entry.model.transform
+        feature_names = model_entry.model.feature_names
+    else:
+        preprocessing = pipeline[:-1]
+        transform = lambda df: preprocessing.transform(df.copy())
+        feature_names = list(getattr(estimator, 'feature_names_in_', estimator.booster_.feature_name()))
+    return Explainer(transform, estimator.booster_, feature_names)
+
+
+_explainers = {}
+_explainers_lock = threading.Lock()
+
+
+def get_explainer(model_entry, base_dir):
+    """Explainer mis en cache par version du modèle (reconstruit après un hot-swap)"""
+    key = (model_entry.model_type, model_entry.version)
+    explainer = _explainers.get(key)
+    if explainer is None:
+        with _explainers_lock:
+            explainer = _explainers.get(key)
+            if explainer is None:
+                explainer = build_explainer(model_entry, base_dir)
+                _explainers.clear()
+                _explainers[key] = explainer
+    return explainer
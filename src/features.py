@@ -0,0 +1,124 @@
+"""
+Feature engineering vectorisé pour Immo Eliza
+Région depuis le code postal et score PEB numérique via des tables de correspondance
+précalculées, appliquées par indexation NumPy (une ligne ou des millions)
+"""
+
+import numpy as np
+import pandas as pd
+
+REGIONS = ['Bruxelles', 'Wallonia', 'Flanders']
+EPC_CLASSES = ['A++', 'A+', 'A', 'B', 'C', 'D', 'E', 'F', 'G']
+
+# Score PEB (kWh/m²) par région et par classe
+EPC_MAPPING = {
+    'Flanders': {
+        'A++': 0, 'A+': 0, 'A': 100, 'B': 200, 'C': 300,
+        'D': 400, 'E': 500, 'F': 600, 'G': 700
+    },
+    'Wallonia': {
+        'A++': 0, 'A+': 50, 'A': 90, 'B': 170, 'C': 250,
+        'D': 330, 'E': 420, 'F': 510, 'G': 600
+    },
+    'Bruxelles': {
+        'A++': 0, 'A+': 0, 'A': 45, 'B': 95, 'C': 145,
+        'D': 210, 'E': 275, 'F': 345, 'G': 450
+    }
+}
+
+POSTCODE_MIN = 1000
+POSTCODE_MAX = 9999
+
+UNKNOWN_CODE = -1
+BRUXELLES, WALLONIA, FLANDERS = range(len(REGIONS))
+
+
+def _build_region_lookup():
+    """Tableau postcode -> code région pour tous les codes postaux belges (1000-9999)"""
+    lookup = np.full(POSTCODE_MAX + 1, FLANDERS, dtype=np.int8)
+    lookup[1000:1300] = BRUXELLES
+    lookup[1300:1500] = WALLONIA
+    lookup[4000:8000] = WALLONIA
+    return lookup
+
+
+def _build_epc_table():
+    """Table (région, classe PEB) -> score, avec une ligne/colonne NaN pour les inconnus"""
+    table = np.full((len(REGIONS) + 1, len(EPC_CLASSES) + 1), np.nan)
+    for region_code, region in enumerate(REGIONS):
+        for epc_code, epc_class in enumerate(EPC_CLASSES):
+            table[region_code, epc_code] = EPC_MAPPING[region][epc_class]
+    return table
+
+
+REGION_BY_POSTCODE = _build_region_lookup()
+EPC_TABLE = _build_epc_table()
+
+# L'index -1 (inconnu) tombe sur le dernier élément : pd.NA pour la région, NaN pour le PEB
+_REGION_LABELS = np.array(REGIONS + [pd.NA], dtype=object)
+_EPC_CODES = {epc_class: code for code, epc_class in enumerate(EPC_CLASSES)}
+
+
+def region_codes(postcodes):
+    """Codes région (0/1/2, -1 si le code postal n'est pas numérique)"""
+    zip_codes = np.asarray(postcodes)
+    if zip_codes.dtype.kind in 'iuf':
+        zip_codes = zip_codes.astype(float)
+    else:
+        zip_codes = pd.to_numeric(pd.Series(zip_codes), errors='coerce').to_numpy(dtype=float)
+    codes = np.full(len(zip_codes), FLANDERS, dtype=np.int8)
+
+    known = ~np.isnan(zip_codes)
+    codes[~known] = UNKNOWN_CODE
+
+    zip_int = np.trunc(zip_codes[known])
+    in_range = (zip_int >= POSTCODE_MIN) & (zip_int <= POSTCODE_MAX)
+    known_codes = codes[known]
+    known_codes[in_range] = REGION_BY_POSTCODE[zip_int[in_range].astype(np.int64)]
+    codes[known] = known_codes
+    return codes
+
+
+def epc_class_codes(epc_classes):
+    """Codes des classes PEB (index dans EPC_CLASSES, -1 si inconnue)"""
+    epc_classes = np.asarray(epc_classes, dtype=object)
+    return np.fromiter((_EPC_CODES.get(value, UNKNOWN_CODE) for value in epc_classes),
+                       dtype=np.int8, count=len(epc_classes))
+
+
+def regions_from_postcodes(postcodes):
+    """Nom de région pour chaque code postal"""
+    return _REGION_LABELS[region_codes(postcodes)]
+
+
+def epc_scores(region_code_array, epc_code_array):
+    """Score PEB numérique par indexation dans EPC_TABLE"""
+    return EPC_TABLE[region_code_array, epc_code_array]
+
+
+def epc_numeric_scores(region_code_array, epc_values):
+    """
+    Score PEB numérique : les classes (lettres) passent par EPC_TABLE, les scores déjà
+    numériques (dataset nettoyé, fichiers batch) sont gardés tels quels
+    """
+    values = np.asarray(epc_values)
+    if values.dtype.kind in 'iuf':
+        return values.astype(float)
+    epc_codes = epc_class_codes(values)
+    scores = epc_scores(region_code_array, epc_codes)
+    unknown = epc_codes == UNKNOWN_CODE
+    if unknown.any():
+        # Colonne objet mêlant classes et scores (ex. 'B' et 180.0 ou '180')
+        scores[unknown] = pd.to_numeric(pd.Series(values[unknown]), errors='coerce').to_numpy(dtype=float)
+    return scores
+
+
+def add_region_and_epc(df):
+    """
+    Ajoute la région (depuis postCode) et convertit la classe PEB de 'epcNumeric'
+    en score numérique (les scores déjà numériques sont conservés), sur tout le DataFrame à la fois
+    """
+    codes = region_codes(df['postCode'].to_numpy())
+    df['region'] = _REGION_LABELS[codes]
+    df['epcNumeric'] = epc_numeric_scores(codes, df['epcNumeric'].to_numpy())
+    return df
@@ -2,7 +2,35 @@ from datetime import datetime
 import streamlit as st
 import pandas as pd
 import os
-from src.google_sheets_feedback import GoogleSheetsFeedback
+import atexit
+from src.feedback_writer import CsvAppendWriter
+from src.error_monitor import ErrorMonitor
+from src.features import regions_from_postcodes
+from src.feedback_store import FEEDBACK_DB_PATH, FeedbackStore
+from src.feedback_sync import PENDING_CSV_PATH, FeedbackUploader
+from src.prediction import EXPECTED_COLUMNS_ORDER
+
+# Fichier CSV local (fallback si la base est inaccessible), partagé par toutes les sessions du processus
+FEEDBACK_CSV_PATH = os.path.join("data", "feedbacks.csv")
+local_feedback_writer = CsvAppendWriter(FEEDBACK_CSV_PATH)
+
+# Base SQLite locale : destination principale des feedbacks et source des statistiques
+feedback_store = FeedbackStore(FEEDBACK_DB_PATH)
+
+# Erreur du modèle par segment, mise à jour à chaque feedback avec prix réel
+error_monitor = ErrorMonitor.attach(feedback_store)
+atexit.register(error_monitor.save)
+
+# Export groupé vers Google Sheets en arrière-plan (client partagé par le processus)
+feedback_uploader = FeedbackUploader(store=feedback_store)
+atexit.register(feedback_uploader.stop)
+
+# Reprise (une seule fois, tous processus confondus) des feedbacks des anciens CSV, puis rejeu
+# des lignes écrites dans le CSV de secours pendant une indisponibilité de la base (curseur en base)
+feedback_store.import_legacy_csvs([FEEDBACK_CSV_PATH, PENDING_CSV_PATH])
+feedback_store.replay_csv(FEEDBACK_CSV_PATH)
+# Vrai après une écriture dans le CSV de secours par ce processus : rejeu au prochain succès
+_fallback_written = False
 
 def save_feedback_to_session(rating, comment, predicted_price, actual_price=None):
     """Sauvegarde le feedback dans session state"""
@@ -36,8 +64,16 @@ def save_feedback_to_session(rating, comment, predicted_price, actual_price=None
     
     return True
 
-def save_feedback_to_file(rating, comment, predicted_price, actual_price=None):
-    """Sauvegarde le feedback dans Google Sheets avec fallback vers CSV local"""
+def feedback_context(input_data):
+    """Type de bien et région du bien estimé (segments du suivi d'erreur)"""
+    if not input_data:
+        return {}
+    row = dict(zip(EXPECTED_COLUMNS_ORDER, input_data))
+    region = regions_from_postcodes([row.get('postCode')])[0]
+    return {'type': row.get('type') or "", 'region': region if isinstance(region, str) else ""}
+
+def save_feedback_to_file(rating, comment, predicted_price, actual_price=None, model_version=None, context=None):
+    """Sauvegarde le feedback dans la base locale (export Google Sheets en arrière-plan) avec fallback vers CSV local"""
     
     # Créer l'entrée de feedback
     feedback_entry = {
@@ -45,50 +81,50 @@ def save_feedback_to_file(rating, comment, predicted_price, actual_price=None):
         'rating': rating,
         'comment': comment if comment else "",
         'predicted_price': predicted_price,
-        'actual_price': actual_price if actual_price and actual_price > 0 else None
+        'actual_price': actual_price if actual_price and actual_price > 0 else None,
+        'model_version': model_version or "",
+        **(context or {})
     }
     
     try:
-        # Initialiser le gestionnaire Google Sheets
-        gs_feedback = GoogleSheetsFeedback()
-        
-        # Essayer de sauvegarder dans Google Sheets
-        if gs_feedback.save_feedback(feedback_entry):
-            return True
-        else:
-            # Si Google Sheets échoue, utiliser le fallback local
-            return _save_feedback_to_local_csv(feedback_entry)
-            
+        # Écriture en base puis mise en file : l'export (lots, retries) se fait en arrière-plan
+        saved = feedback_uploader.submit(feedback_entry)
+        if _fallback_written:
+            _replay_fallback_csv()
+        return saved
+
     except Exception as e:
-        # En cas d'erreur avec Google Sheets, utiliser le fallback local
-        st.warning(f"Google Sheets indisponible, sauvegarde locale activée")
+        # En cas d'erreur de la base, utiliser le fallback local
+        st.warning(f"Base des feedbacks indisponible, sauvegarde CSV activée")
         return _save_feedback_to_local_csv(feedback_entry)
 
+def _replay_fallback_csv():
+    """Base de nouveau disponible : feedbacks du CSV de secours repris (curseur en base, sans doublon)"""
+    global _fallback_written
+    try:
+        feedback_store.replay_csv(FEEDBACK_CSV_PATH)
+        _fallback_written = False
+    except Exception:
+        pass  # Nouvel essai au prochain feedback (ou au prochain démarrage)
+
 def _save_feedback_to_local_csv(feedback_entry):
     """Sauvegarde le feedback dans un fichier CSV local (fonction de fallback)"""
+    global _fallback_written
     try:
-        # Créer le dossier s'il n'existe pas
-        os.makedirs("data", exist_ok=True)
-        
-        # Fichier CSV
-        csv_file = "data/feedbacks.csv"
-        
-        # Si le fichier existe, l'ajouter, sinon le créer
-        if os.path.exists(csv_file):
-            df = pd.read_csv(csv_file)
-            df = pd.concat([df, pd.DataFrame([feedback_entry])], ignore_index=True)
-        else:
-            df = pd.DataFrame([feedback_entry])
-        
-        df.to_csv(csv_file, index=False)
-        return True
-        
+        # Ajout en fin de fichier sous verrou : pas de relecture/réécriture du CSV complet
+        saved = local_feedback_writer.append(feedback_entry)
+        _fallback_written = True
+        return saved
+
     except Exception as e:
         st.error(f"Erreur lors de la sauvegarde locale : {str(e)}")
         return False
 
-def display_feedback_section(predicted_price):
-    """Affiche la section feedback avec st.form"""
+def display_feedback_section(predicted_price, model_version=None, input_data=None):
+    """
+    Affiche la section feedback avec st.form
+    (model_version : version du modèle qui a prédit, input_data : features du bien estimé)
+    """
     
     # Vérifier que predicted_price est valide
     if not isinstance(predicted_price, (int, float)):
@@ -153,7 +189,8 @@ def display_feedback_section(predicted_price):
                 
                 # Sauvegarder dans session ET dans fichier CSV
                 success_session = save_feedback_to_session(rating, comment, predicted_price, actual_price_to_save)
-                success_file = save_feedback_to_file(rating, comment, predicted_price, actual_price_to_save)
+                success_file = save_feedback_to_file(rating, comment, predicted_price, actual_price_to_save,
+                                                     model_version, feedback_context(input_data))
                 
                 if success_session and success_file:
                     st.session_state.feedback_submitted = True
@@ -169,33 +206,78 @@ def export_feedback_to_csv():
         return df.to_csv(index=False)
     return None
 
-def get_feedback_stats():
-    """Retourne des statistiques sur les feedbacks"""
-    if 'all_feedback' not in st.session_state or not st.session_state.all_feedback:
+def get_feedback_stats(days=None, model_version=None):
+    """Retourne des statistiques sur les feedbacks de toutes les sessions (base locale)"""
+    stats = feedback_store.stats(days=days, model_version=model_version)
+    if not stats['total_feedback']:
         return None
-    
-    df = pd.DataFrame(st.session_state.all_feedback)
-    return {
-        'total_feedback': len(df),
-        'average_rating': df['rating'].mean(),
-        'price_accuracy': df[df['actual_price'].notna()]['actual_price'].count()
-    }
+    return stats
 
 def display_feedback_admin():
     """Section admin pour gérer les feedbacks"""
-    if 'all_feedback' in st.session_state and st.session_state.all_feedback:
+    stats = get_feedback_stats()
+    if stats:
         st.markdown("### 📊 Administration des feedbacks")
         
         # Afficher les stats
-        stats = get_feedback_stats()
-        if stats:
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total feedbacks", stats['total_feedback'])
-            with col2:
-                st.metric("Note moyenne", f"{stats['average_rating']:.1f}/5")
-            with col3:
-                st.metric("Prix réels fournis", stats['price_accuracy'])
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total feedbacks", stats['total_feedback'])
+        with col2:
+            st.metric("Note moyenne", f"{stats['average_rating']:.1f}/5")
+        with col3:
+            st.metric("Prix réels fournis", stats['price_accuracy'])
+
+        # Écart entre prix estimé et prix réel, par fenêtre de temps
+        windows = {"7 derniers jours": 7, "30 derniers jours": 30, "Depuis le début": None}
+        rows = []
+        for label, days in windows.items():
+            window = feedback_store.stats(days=days)
+            rows.append({
+                'Période': label,
+                'Feedbacks': window['total_feedback'],
+                'Note moyenne': window['average_rating'],
+                'Prix réels': window['price_accuracy'],
+                'Erreur absolue moyenne (€)': window['mae'],
+                'Erreur relative moyenne (%)': None if window['mape'] is None else window['mape'] * 100,
+                'Biais (€)': window['bias'],
+            })
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+        # Qualité par version du modèle qui a prédit (comparaison champion / challengers)
+        versions = feedback_store.model_versions()
+        if len(versions) > 1:
+            st.markdown("#### 🆚 Qualité par version du modèle")
+            version_rows = []
+            for model_version in versions:
+                window = feedback_store.stats(model_version=model_version)
+                version_rows.append({
+                    'Version': model_version or "inconnue",
+                    'Feedbacks': window['total_feedback'],
+                    'Note moyenne': window['average_rating'],
+                    'Prix réels': window['price_accuracy'],
+                    'Erreur absolue moyenne (€)': window['mae'],
+                    'Erreur relative moyenne (%)': None if window['mape'] is None else window['mape'] * 100,
+                    'Biais (€)': window['bias'],
+                })
+            st.dataframe(pd.DataFrame(version_rows), hide_index=True, use_container_width=True)
+
+        # Erreur glissante par segment (moyennes exponentielles sur les derniers prix réels)
+        segments = error_monitor.summary()
+        if segments:
+            st.markdown("#### 📉 Erreur récente du modèle par segment")
+            kind_labels = {'global': 'Global', 'region': 'Région', 'type': 'Type', 'price_band': 'Prix estimé'}
+            monitor_df = pd.DataFrame([{
+                'Segment': f"{kind_labels[row['kind']]} · {row['segment']}",
+                'Prix réels': row['count'],
+                'MAE récente (€)': row['mae'],
+                'MAPE récente (%)': row['mape'] * 100,
+                'Biais récent (€)': row['bias'],
+                'Erreur médiane (%)': row['pct_error_p50'] * 100,
+                'Erreur p90 (%)': row['pct_error_p90'] * 100,
+                'Dérive (récent / habituel)': row['drift_ratio'],
+            } for row in segments])
+            st.dataframe(monitor_df, hide_index=True, use_container_width=True)
         
         # Bouton de téléchargement
         csv_data = export_feedback_to_csv()
@@ -0,0 +1,364 @@
+"""
+Stockage local des feedbacks dans une base SQLite (mode WAL)
+Source de vérité des feedbacks : chaque soumission y est écrite avant l'export vers
+Google Sheets (src/feedback_sync.py), qui suit un curseur d'export (dernier id envoyé).
+Les agrégats par jour et par version du modèle sont tenus à jour par un trigger à
+chaque insertion : les statistiques ne relisent jamais la table des feedbacks entière.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+logger = logging.getLogger('immo_eliza.feedback_store')
+
+FEEDBACK_DB_PATH = os.path.join("data", "feedbacks.sqlite3")
+
+# Curseur d'export vers Google Sheets dans la table sync_state
+SHEETS_EXPORT = 'google_sheets'
+# Marqueur de l'import unique des CSV d'avant la base (sync_state, last_id = 1 une fois fait)
+LEGACY_IMPORT = 'legacy_import'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedbacks (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    comment TEXT NOT NULL DEFAULT '',
+    predicted_price REAL NOT NULL,
+    actual_price REAL,
+    model_version TEXT NOT NULL DEFAULT '',
+    region TEXT NOT NULL DEFAULT '',
+    type TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_feedbacks_timestamp ON feedbacks (timestamp);
+CREATE INDEX IF NOT EXISTS idx_feedbacks_model_version ON feedbacks (model_version, timestamp);
+
+-- Une ligne par (jour, version) ; l'erreur est predicted - actual (positive = surestimation)
+CREATE TABLE IF NOT EXISTS feedback_daily (
+    day TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    feedbacks INTEGER NOT NULL,
+    rating_sum INTEGER NOT NULL,
+    priced INTEGER NOT NULL,
+    error_sum REAL NOT NULL,
+    abs_error_sum REAL NOT NULL,
+    abs_pct_error_sum REAL NOT NULL,
+    PRIMARY KEY (day, model_version)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS feedbacks_daily_insert AFTER INSERT ON feedbacks
+BEGIN
+    INSERT INTO feedback_daily VALUES (
+        substr(NEW.timestamp, 1, 10), NEW.model_version, 1, NEW.rating,
+        NEW.actual_price IS NOT NULL,
+        coalesce(NEW.predicted_price - NEW.actual_price, 0),
+        coalesce(abs(NEW.predicted_price - NEW.actual_price), 0),
+        coalesce(abs(NEW.predicted_price - NEW.actual_price) / NEW.actual_price, 0)
+    )
+    ON CONFLICT (day, model_version) DO UPDATE SET
+        feedbacks = feedbacks + 1,
+        rating_sum = rating_sum + excluded.rating_sum,
+        priced = priced + excluded.priced,
+        error_sum = error_sum + excluded.error_sum,
+        abs_error_sum = abs_error_sum + excluded.abs_error_sum,
+        abs_pct_error_sum = abs_pct_error_sum + excluded.abs_pct_error_sum;
+END;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL
+);
+
+-- États sérialisés en JSON des composants qui suivent les feedbacks (ex. src/error_monitor.py)
+CREATE TABLE IF NOT EXISTS component_state (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Colonnes ajoutées après la première version du schéma (bases existantes migrées à l'ouverture)
+_ADDED_COLUMNS = {
+    'region': "TEXT NOT NULL DEFAULT ''",
+    'type': "TEXT NOT NULL DEFAULT ''",
+}
+
+_COLUMNS = ('timestamp', 'rating', 'comment', 'predicted_price', 'actual_price', 'model_version', 'region', 'type')
+_INSERT = f'INSERT INTO feedbacks ({", ".join(_COLUMNS)}) VALUES ({", ".join("?" * len(_COLUMNS))})'
+
+# Mêmes sommes, calculées sur feedback_daily ou directement sur feedbacks (fenêtres horaires)
+_DAILY_AGGREGATES = """
+    SUM(feedbacks), SUM(rating_sum), SUM(priced), SUM(error_sum), SUM(abs_error_sum), SUM(abs_pct_error_sum)
+"""
+_RAW_AGGREGATES = """
+    COUNT(*), SUM(rating), COUNT(actual_price), SUM(predicted_price - actual_price),
+    SUM(abs(predicted_price - actual_price)), SUM(abs(predicted_price - actual_price) / actual_price)
+"""
+
+
+def _stats_from_sums(sums):
+    """Statistiques (note moyenne, MAE, MAPE, biais) à partir des sommes agrégées"""
+    total, rating_sum, priced, error_sum, abs_error_sum, abs_pct_error_sum = sums
+    total, priced = total or 0, priced or 0
+    return {
+        'total_feedback': total,
+        'average_rating': rating_sum / total if total else None,
+        'price_accuracy': priced,
+        'mae': abs_error_sum / priced if priced else None,
+        'mape': abs_pct_error_sum / priced if priced else None,
+        'bias': error_sum / priced if priced else None,
+    }
+
+
+def _csv_cursor_name(path):
+    """Curseur de rejeu d'un CSV dans sync_state (nombre de lignes déjà importées)"""
+    return f'csv:{os.path.basename(path)}'
+
+
+def _read_csv_entries(path):
+    """Lignes complètes d'un CSV de feedbacks (une ligne en cours d'écriture est ignorée)"""
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return []
+    content = content[:content.rfind('\n') + 1]
+    return [row for row in csv.DictReader(io.StringIO(content)) if row.get('timestamp')]
+
+
+def _row_values(entry):
+    actual_price = entry.get('actual_price')
+    return (
+        entry['timestamp'],
+        int(entry['rating']),
+        entry.get('comment') or "",
+        float(entry['predicted_price']),
+        float(actual_price) if actual_price not in (None, '') else None,
+        entry.get('model_version') or "",
+        entry.get('region') or "",
+        entry.get('type') or "",
+    )
+
+
+class FeedbackStore:
+    """
+    Base SQLite des feedbacks, partagée par les threads (une connexion par thread) et les processus.
+    Les fonctions abonnées (subscribe) sont appelées avec (id, feedback) après chaque écriture.
+    """
+
+    def __init__(self, path=FEEDBACK_DB_PATH, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._listeners = []
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            existing = {row[1] for row in conn.execute('PRAGMA table_info(feedbacks)')}
+            if existing:
+                for column, definition in _ADDED_COLUMNS.items():
+                    if column not in existing:
+                        conn.execute(f'ALTER TABLE feedbacks ADD COLUMN {column} {definition}')
+            conn.executescript(_SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            # WAL : les lectures (statistiques, export) ne bloquent pas les écritures ;
+            # synchronous=NORMAL : pas de fsync par transaction, la base reste cohérente après un crash
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def _immediate(self):
+        """Connexion en transaction BEGIN IMMEDIATE (verrou d'écriture pris dès le début), à utiliser avec `with`"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        return conn
+
+    @staticmethod
+    def _insert_many(conn, rows):
+        """Insère des lignes dans la transaction en cours ; retourne [(id, valeurs)]"""
+        conn.executemany(_INSERT, rows)
+        # Ids consécutifs : la transaction garde le verrou d'écriture jusqu'au commit
+        last_id = conn.execute('SELECT MAX(id) FROM feedbacks').fetchone()[0] or 0
+        return list(zip(range(last_id - len(rows) + 1, last_id + 1), rows))
+
+    @staticmethod
+    def _cursor(conn, name):
+        row = conn.execute('SELECT last_id FROM sync_state WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _set_cursor(conn, name, value):
+        conn.execute('INSERT INTO sync_state VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET last_id = excluded.last_id',
+                     (name, value))
+
+    def _notify(self, rows):
+        """
+        Appelle les abonnés après le commit : une erreur d'un abonné (suivi d'erreur...) est
+        journalisée et ne fait jamais échouer l'écriture, déjà enregistrée
+        """
+        for listener in self._listeners:
+            try:
+                for feedback_id, values in rows:
+                    listener(feedback_id, dict(zip(_COLUMNS, values)))
+            except Exception:
+                logger.exception("Échec d'un abonné aux feedbacks (%s)", getattr(listener, '__qualname__', listener))
+
+    def add(self, entry):
+        """Enregistre un feedback (dict au format de feedback_form) ; retourne son id"""
+        values = _row_values(entry)
+        with self._connection() as conn:
+            feedback_id = conn.execute(_INSERT, values).lastrowid
+        self._notify([(feedback_id, values)])
+        return feedback_id
+
+    def add_many(self, entries):
+        """Enregistre plusieurs feedbacks en une seule transaction"""
+        rows = [_row_values(entry) for entry in entries]
+        with self._connection() as conn:
+            inserted = self._insert_many(conn, rows)
+        if self._listeners:
+            self._notify(inserted)
+        return True
+
+    def count(self):
+        return self._connection().execute('SELECT COALESCE(SUM(feedbacks), 0) FROM feedback_daily').fetchone()[0]
+
+    def stats(self, days=None, model_version=None, today=None):
+        """
+        Statistiques sur les `days` derniers jours calendaires (None = depuis le début),
+        lues dans les agrégats journaliers : coût proportionnel au nombre de jours, pas de feedbacks
+        """
+        clauses, params = [], []
+        if days is not None:
+            clauses.append('day >= ?')
+            params.append(((today or date.today()) - timedelta(days=days - 1)).isoformat())
+        if model_version is not None:
+            clauses.append('model_version = ?')
+            params.append(model_version)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sums = self._connection().execute(f'SELECT {_DAILY_AGGREGATES} FROM feedback_daily {where}', params).fetchone()
+        return _stats_from_sums(sums)
+
+    def window_stats(self, since, until=None, model_version=None):
+        """Statistiques exactes entre deux instants (datetime ou ISO), via l'index sur timestamp"""
+        since = since.isoformat() if isinstance(since, datetime) else since
+        until = until.isoformat() if isinstance(until, datetime) else until
+        clauses, params = ['timestamp >= ?'], [since]
+        if until is not None:
+            clauses.append('timestamp < ?')
+            params.append(until)
+        if model_version is not None:
+            clauses.append('model_version = ?')
+            params.append(model_version)
+        sums = self._connection().execute(
+            f"SELECT {_RAW_AGGREGATES} FROM feedbacks WHERE {' AND '.join(clauses)}", params).fetchone()
+        return _stats_from_sums(sums)
+
+    def daily_stats(self, days=30, model_version=None, today=None):
+        """Statistiques jour par jour (liste de dicts avec 'day'), pour les graphiques"""
+        since = ((today or date.today()) - timedelta(days=days - 1)).isoformat()
+        version_clause = 'AND model_version = ?' if model_version is not None else ''
+        params = [since] + ([model_version] if model_version is not None else [])
+        rows = self._connection().execute(
+            f'SELECT day, {_DAILY_AGGREGATES} FROM feedback_daily WHERE day >= ? {version_clause} '
+            f'GROUP BY day ORDER BY day', params).fetchall()
+        return [dict(_stats_from_sums(row[1:]), day=row[0]) for row in rows]
+
+    def model_versions(self):
+        rows = self._connection().execute(
+            'SELECT model_version, SUM(feedbacks) FROM feedback_daily GROUP BY model_version').fetchall()
+        return dict(rows)
+
+    def recent(self, limit=1000):
+        """Derniers feedbacks, du plus récent au plus ancien"""
+        rows = self._connection().execute(
+            f'SELECT {", ".join(_COLUMNS)} FROM feedbacks ORDER BY timestamp DESC LIMIT ?', (limit,)).fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def after(self, last_id, limit=500):
+        """Feedbacks d'id supérieur à last_id : liste de (id, entry) par id croissant"""
+        rows = self._connection().execute(
+            f'SELECT id, {", ".join(_COLUMNS)} FROM feedbacks WHERE id > ? ORDER BY id LIMIT ?',
+            (last_id, limit)).fetchall()
+        return [(row[0], dict(zip(_COLUMNS, row[1:]))) for row in rows]
+
+    def unsynced(self, limit=500, name=SHEETS_EXPORT):
+        """Feedbacks pas encore exportés : liste de (id, entry) par id croissant"""
+        row = self._connection().execute('SELECT last_id FROM sync_state WHERE name = ?', (name,)).fetchone()
+        return self.after(row[0] if row else 0, limit)
+
+    def mark_synced(self, last_id, name=SHEETS_EXPORT):
+        """Avance le curseur d'export (jamais en arrière)"""
+        with self._connection() as conn:
+            conn.execute('INSERT INTO sync_state VALUES (?, ?) '
+                         'ON CONFLICT (name) DO UPDATE SET last_id = MAX(last_id, excluded.last_id)',
+                         (name, last_id))
+
+    def save_state(self, name, state):
+        with self._connection() as conn:
+            conn.execute('INSERT INTO component_state VALUES (?, ?) '
+                         'ON CONFLICT (name) DO UPDATE SET value = excluded.value', (name, json.dumps(state)))
+
+    def load_state(self, name):
+        row = self._connection().execute('SELECT value FROM component_state WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def import_legacy_csvs(self, paths):
+        """
+        Import unique des CSV d'avant la base (format de CsvAppendWriter) ; retourne le nombre de lignes.
+        Le marqueur LEGACY_IMPORT, l'import et les curseurs de rejeu sont écrits dans une même
+        transaction BEGIN IMMEDIATE : plusieurs processus qui démarrent ensemble n'importent qu'une fois.
+        Une base déjà remplie (import fait avant le marqueur) est seulement marquée.
+        """
+        inserted = []
+        with self._immediate() as conn:
+            if self._cursor(conn, LEGACY_IMPORT):
+                return 0
+            fresh = conn.execute('SELECT COUNT(*) FROM feedbacks').fetchone()[0] == 0
+            for path in paths:
+                entries = _read_csv_entries(path)
+                if fresh and entries:
+                    inserted += self._insert_many(conn, [_row_values(entry) for entry in entries])
+                self._set_cursor(conn, _csv_cursor_name(path), len(entries))
+            self._set_cursor(conn, LEGACY_IMPORT, 1)
+        if inserted and self._listeners:
+            self._notify(inserted)
+        return len(inserted)
+
+    def replay_csv(self, path):
+        """
+        Importe les lignes d'un CSV en ajout seul (ex. fallback quand la base était indisponible)
+        au-delà de son curseur dans sync_state ; retourne le nombre de lignes importées.
+        Lecture du curseur, insertion et avance du curseur dans une même transaction BEGIN IMMEDIATE.
+        """
+        inserted = []
+        name = _csv_cursor_name(path)
+        with self._immediate() as conn:
+            entries = _read_csv_entries(path)
+            done = self._cursor(conn, name)
+            if len(entries) > done:
+                inserted = self._insert_many(conn, [_row_values(entry) for entry in entries[done:]])
+                self._set_cursor(conn, name, len(entries))
+        if inserted and self._listeners:
+            self._notify(inserted)
+        return len(inserted)
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,252 @@
+"""
+Envoi des feedbacks vers Google Sheets en arrière-plan
+Les soumissions sont mises en file et envoyées par lots (append_rows) par un thread
+dédié, avec retries et backoff exponentiel. Si Google Sheets reste indisponible,
+les feedbacks sont conservés dans un CSV local d'attente, renvoyé au prochain envoi réussi.
+Avec une base locale (src/feedback_store.py), chaque feedback y est d'abord enregistré et
+le thread exporte les lignes au-delà du curseur d'export : pas de CSV d'attente.
+"""
+
+import csv
+import logging
+import os
+import queue
+import threading
+import time
+
+from src.feedback_writer import FSYNC_ALWAYS, CsvAppendWriter
+
+logger = logging.getLogger('immo_eliza.feedback_sync')
+
+PENDING_CSV_PATH = os.path.join("data", "feedbacks_pending.csv")
+
+_STOP = object()
+
+
+def _default_client_factory():
+    # Import différé : gspread n'est chargé qu'au premier envoi
+    from src.google_sheets_feedback import get_shared_client
+    return get_shared_client()
+
+
+class FeedbackUploader:
+    """
+    File d'envoi des feedbacks, partagée par toutes les sessions du processus.
+
+    client_factory : retourne un objet avec `connected`, `configured` et `append_feedbacks(entries)`
+                     (GoogleSheetsFeedback, ou un faux client en test)
+    local_writer   : destination quand Google Sheets n'est pas configuré
+    pending_path   : CSV d'attente quand Google Sheets est configuré mais en erreur
+                     (y compris injoignable à la connexion), renvoyé au prochain envoi réussi
+    store          : FeedbackStore, destination principale ; Google Sheets devient un export
+    """
+
+    def __init__(self, client_factory=_default_client_factory, local_writer=None,
+                 pending_path=PENDING_CSV_PATH, batch_size=50, flush_interval=2.0,
+                 max_retries=3, backoff_seconds=0.5, sleep=time.sleep, store=None):
+        self.client_factory = client_factory
+        self.local_writer = local_writer
+        self.store = store
+        self.pending_path = pending_path
+        # Le CSV d'attente est le seul exemplaire des feedbacks : fsync à chaque écriture
+        self.pending_writer = CsvAppendWriter(pending_path, fsync=FSYNC_ALWAYS)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._sleep = sleep
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        # Compteurs mis à jour par les sessions (submit) et par le thread d'envoi
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'sent': 0,
+            'batches': 0,
+            'retries': 0,
+            'spilled': 0,
+            'drained': 0,
+            'local': 0,
+            'stored': 0,
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='feedback-uploader', daemon=True)
+                self._thread.start()
+
+    def submit(self, entry):
+        """Met un feedback en file d'envoi (retour immédiat, après écriture dans la base si présente)"""
+        if self.store is not None:
+            self.store.add(entry)
+            self._count('stored')
+        self._ensure_started()
+        self._count('submitted')
+        self._queue.put(entry)
+        return True
+
+    def flush(self, timeout=None):
+        """Attend que tous les feedbacks soumis avant l'appel soient traités"""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout=10.0):
+        """Envoie ce qui reste en file puis arrête le thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def metrics(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return dict(stats, queued=self._queue.qsize())
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch, waiters, stop = [], [], False
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    # flush() demandé : on envoie sans attendre la fin de la fenêtre
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or waiters or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._flush_batch(batch)
+                except Exception:
+                    logger.exception("Échec de l'envoi d'un lot de feedbacks")
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def _get_client(self):
+        try:
+            return self.client_factory()
+        except Exception:
+            logger.exception("Client Google Sheets indisponible")
+            return None
+
+    def _flush_batch(self, batch):
+        if self.store is not None:
+            # Les éléments de la file ne servent qu'à réveiller l'export : les lignes viennent de la base
+            self._export_from_store()
+            return
+        client = self._get_client()
+        if client is None or not client.connected:
+            if self.local_writer is not None and client is not None and not _is_configured(client):
+                # Google Sheets non configuré : même comportement qu'avant, CSV local
+                self.local_writer.append_many(batch)
+                self._count('local', len(batch))
+            else:
+                # Configuré mais injoignable (ou client en erreur) : CSV d'attente, renvoyé plus tard
+                self._spill(batch)
+            return
+
+        pending = self._take_pending()
+        if self._append_with_retry(client, pending + batch):
+            self._count('sent', len(pending) + len(batch))
+            self._count('drained', len(pending))
+            self._count('batches')
+        else:
+            self._spill(pending + batch)
+        # Supprimé seulement une fois les feedbacks envoyés ou réécrits dans le CSV d'attente
+        if pending:
+            os.remove(self._draining_path)
+
+    def _export_from_store(self):
+        """Envoie les feedbacks non exportés par lots ; en cas d'échec ils restent en base pour le prochain réveil"""
+        client = self._get_client()
+        if client is None or not client.connected:
+            return
+        while True:
+            rows = self.store.unsynced(limit=self.batch_size)
+            if not rows:
+                return
+            entries = [entry for _, entry in rows]
+            if not self._append_with_retry(client, entries):
+                return
+            self.store.mark_synced(rows[-1][0])
+            self._count('sent', len(entries))
+            self._count('batches')
+
+    def _append_with_retry(self, client, entries):
+        delay = self.backoff_seconds
+        for attempt in range(self.max_retries + 1):
+            try:
+                client.append_feedbacks(entries)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.warning("Google Sheets indisponible après %d tentatives : %s", attempt + 1, e)
+                    return False
+                self._count('retries')
+                self._sleep(delay)
+                delay *= 2
+        return False
+
+    def _spill(self, entries):
+        self.pending_writer.append_many(entries)
+        self._count('spilled', len(entries))
+
+    @property
+    def _draining_path(self):
+        return self.pending_path + '.draining'
+
+    def _take_pending(self):
+        """
+        Récupère les feedbacks en attente. Le CSV est renommé (atomique) : les écritures
+        concurrentes repartent sur un nouveau fichier. Un fichier .draining laissé par un
+        arrêt brutal est repris tel quel.
+        """
+        if not os.path.exists(self._draining_path):
+            try:
+                os.replace(self.pending_path, self._draining_path)
+            except FileNotFoundError:
+                return []
+        with open(self._draining_path, newline='', encoding='utf-8') as f:
+            entries = [_parse_pending_row(row) for row in csv.DictReader(f)]
+        if not entries:
+            os.remove(self._draining_path)
+        return entries
+
+
+def _is_configured(client):
+    """Google Sheets configuré (identifiants présents) ; sans l'attribut, un client déconnecté ne l'est pas"""
+    return getattr(client, 'configured', client.connected)
+
+
+def _parse_pending_row(row):
+    # Le CSV ne garde que du texte : on restaure les types envoyés à l'origine
+    entry = {
+        'timestamp': row['timestamp'],
+        'rating': int(row['rating']),
+        'comment': row['comment'] or "",
+        'predicted_price': float(row['predicted_price']),
+        'actual_price': float(row['actual_price']) if row['actual_price'] else None,
+    }
+    return entry
@@ -0,0 +1,94 @@
+"""
+Écriture des feedbacks en CSV local, en mode ajout uniquement
+Chaque écriture ajoute ses lignes en fin de fichier sous verrou exclusif
+(coût constant, quel que soit le nombre de feedbacks déjà enregistrés)
+"""
+
+import csv
+import io
+import os
+import threading
+import time
+
+FEEDBACK_COLUMNS = ['timestamp', 'rating', 'comment', 'predicted_price', 'actual_price']
+
+# Politiques de synchronisation disque (fsync)
+FSYNC_NEVER = 'never'        # laisse le système décider (le plus rapide)
+FSYNC_ALWAYS = 'always'      # chaque écriture est durable avant de rendre la main
+FSYNC_INTERVAL = 'interval'  # au plus un fsync toutes les `fsync_interval` secondes
+
+try:
+    import fcntl
+
+    def _lock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CsvAppendWriter:
+    """Ajoute des lignes à un CSV, avec en-tête écrit une seule fois et verrouillage inter-processus"""
+
+    def __init__(self, path, columns=FEEDBACK_COLUMNS, fsync=FSYNC_INTERVAL, fsync_interval=1.0):
+        if fsync not in (FSYNC_NEVER, FSYNC_ALWAYS, FSYNC_INTERVAL):
+            raise ValueError(f"Politique fsync inconnue : {fsync}")
+        self.path = path
+        self.columns = list(columns)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._last_fsync = 0.0
+        # Verrou local : sérialise les threads du processus (flock protège entre processus)
+        self._thread_lock = threading.Lock()
+
+    def _encode(self, entries, with_header):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.columns, extrasaction='ignore', lineterminator='\n')
+        if with_header:
+            writer.writeheader()
+        for entry in entries:
+            writer.writerow({col: ('' if entry.get(col) is None else entry.get(col)) for col in self.columns})
+        return buffer.getvalue()
+
+    def _should_fsync(self):
+        if self.fsync == FSYNC_ALWAYS:
+            return True
+        if self.fsync == FSYNC_INTERVAL and time.monotonic() - self._last_fsync >= self.fsync_interval:
+            return True
+        return False
+
+    def append_many(self, entries):
+        """Ajoute plusieurs feedbacks en une seule écriture"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._thread_lock, open(self.path, 'a', newline='', encoding='utf-8') as f:
+            _lock(f)
+            try:
+                # La taille est lue sous verrou : un seul écrivain ajoute l'en-tête
+                f.seek(0, os.SEEK_END)
+                with_header = f.tell() == 0
+                f.write(self._encode(entries, with_header))
+                f.flush()
+                if self._should_fsync():
+                    os.fsync(f.fileno())
+                    self._last_fsync = time.monotonic()
+            finally:
+                _unlock(f)
+        return True
+
+    def append(self, entry):
+        """Ajoute un feedback (dict colonne -> valeur)"""
+        return self.append_many([entry])
@@ -0,0 +1,227 @@
+"""
+Index précalculé des codes postaux belges pour Immo Eliza
+Construit une fois (scripts/build_postcode_index.py) depuis les données GeoNames de pgeocode,
+puis chargé en mémoire mappée au démarrage : postcode -> latitude, longitude, province,
+région, localités. Aucun appel réseau ni géocodage par requête.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.features import POSTCODE_MAX, POSTCODE_MIN, REGION_BY_POSTCODE, REGIONS, UNKNOWN_CODE
+
+INDEX_DIR_NAME = 'postcode_index'
+MANIFEST_NAME = 'manifest.json'
+
+# Libellés de province du modèle (cf. onehot_encoding du pipeline)
+PROVINCES = ['Brussels', 'Walloon Brabant', 'Flemish Brabant', 'Antwerp', 'Limburg', 'Liège',
+             'Namur', 'Hainaut', 'Luxembourg', 'West Flanders', 'East Flanders']
+
+# Plages de codes postaux belges par province (bornes incluses)
+PROVINCE_RANGES = [
+    (1000, 1299, 'Brussels'),
+    (1300, 1499, 'Walloon Brabant'),
+    (1500, 1999, 'Flemish Brabant'),
+    (2000, 2999, 'Antwerp'),
+    (3000, 3499, 'Flemish Brabant'),
+    (3500, 3999, 'Limburg'),
+    (4000, 4999, 'Liège'),
+    (5000, 5999, 'Namur'),
+    (6000, 6599, 'Hainaut'),
+    (6600, 6999, 'Luxembourg'),
+    (7000, 7999, 'Hainaut'),
+    (8000, 8999, 'West Flanders'),
+    (9000, 9999, 'East Flanders'),
+]
+
+# Colonnes de coordonnées du notebook de preprocessing
+LATITUDE_COLUMN = 'zipcode_Latitude'
+LONGITUDE_COLUMN = 'zipcode_Longitude'
+
+
+def _build_province_lookup():
+    lookup = np.full(POSTCODE_MAX + 1, UNKNOWN_CODE, dtype=np.int8)
+    for low, high, province in PROVINCE_RANGES:
+        lookup[low:high + 1] = PROVINCES.index(province)
+    return lookup
+
+
+PROVINCE_BY_POSTCODE = _build_province_lookup()
+
+
+def build_postcode_index(places):
+    """
+    Construit les tableaux de l'index depuis un DataFrame GeoNames
+    (colonnes postal_code, place_name, latitude, longitude ; une ligne par localité).
+    Retourne (manifest, arrays).
+    """
+    places = places[['postal_code', 'place_name', 'latitude', 'longitude']].copy()
+    places['postal_code'] = pd.to_numeric(places['postal_code'], errors='coerce')
+    places = places.dropna(subset=['postal_code'])
+    places['postal_code'] = places['postal_code'].astype(np.int64)
+    places = places[(places['postal_code'] >= POSTCODE_MIN) & (places['postal_code'] <= POSTCODE_MAX)]
+    places = places.sort_values(['postal_code', 'place_name'], kind='stable')
+
+    size = POSTCODE_MAX + 1
+    latitude = np.full(size, np.nan, dtype=np.float32)
+    longitude = np.full(size, np.nan, dtype=np.float32)
+    # Comme pgeocode.query_postal_code : coordonnées moyennes des localités du code postal
+    coords = places.groupby('postal_code')[['latitude', 'longitude']].mean()
+    latitude[coords.index.to_numpy()] = coords['latitude'].to_numpy()
+    longitude[coords.index.to_numpy()] = coords['longitude'].to_numpy()
+
+    # Localités : table de noms unique + liste d'identifiants par code postal (format CSR)
+    places = places.dropna(subset=['place_name']).drop_duplicates(['postal_code', 'place_name'])
+    locality_names = sorted(places['place_name'].unique().tolist())
+    name_ids = {name: i for i, name in enumerate(locality_names)}
+    counts = np.bincount(places['postal_code'].to_numpy(), minlength=size)
+    locality_offsets = np.zeros(size + 1, dtype=np.int32)
+    np.cumsum(counts, out=locality_offsets[1:])
+    locality_ids = np.fromiter((name_ids[name] for name in places['place_name']),
+                               dtype=np.int32, count=len(places))
+
+    manifest = {
+        'format_version': 1,
+        'provinces': PROVINCES,
+        'regions': REGIONS,
+        'localities': locality_names,
+        'n_postcodes': int(len(coords)),
+    }
+    arrays = {
+        'latitude': latitude,
+        'longitude': longitude,
+        'province': PROVINCE_BY_POSTCODE.copy(),
+        'region': REGION_BY_POSTCODE.copy(),
+        'locality_offsets': locality_offsets,
+        'locality_ids': locality_ids,
+    }
+    return manifest, arrays
+
+
+def save_postcode_index(manifest, arrays, output_dir):
+    """Écrit le manifest JSON et un .npy non compressé par tableau (mappables en mémoire)"""
+    os.makedirs(output_dir, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(output_dir, f'{name}.npy'), array, allow_pickle=False)
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+
+def _postcode_positions(postcodes):
+    """Positions dans les tableaux (-1 si le code postal est invalide)"""
+    zip_codes = pd.to_numeric(pd.Series(np.asarray(postcodes).ravel()), errors='coerce').to_numpy(dtype=float)
+    positions = np.full(len(zip_codes), -1, dtype=np.int64)
+    valid = ~np.isnan(zip_codes)
+    valid[valid] = (zip_codes[valid] >= POSTCODE_MIN) & (zip_codes[valid] <= POSTCODE_MAX)
+    positions[valid] = zip_codes[valid].astype(np.int64)
+    return positions
+
+
+class PostcodeIndex:
+    """Index des codes postaux chargé depuis le disque (tableaux en mémoire mappée)"""
+
+    def __init__(self, manifest, arrays):
+        self.manifest = manifest
+        self.provinces = manifest['provinces']
+        self.regions = manifest['regions']
+        self.localities = manifest['localities']
+        self.latitude = arrays['latitude']
+        self.longitude = arrays['longitude']
+        self.province = arrays['province']
+        self.region = arrays['region']
+        self.locality_offsets = arrays['locality_offsets']
+        self.locality_ids = arrays['locality_ids']
+
+    @classmethod
+    def load(cls, index_dir, mmap=True):
+        with open(os.path.join(index_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(index_dir, f'{name}.npy'),
+                          mmap_mode='r' if mmap else None, allow_pickle=False)
+            for name in ('latitude', 'longitude', 'province', 'region', 'locality_offsets', 'locality_ids')
+        }
+        return cls(manifest, arrays)
+
+    def localities_for(self, postcode):
+        """Localités connues pour un code postal (liste vide si inconnu)"""
+        position = _postcode_positions([postcode])[0]
+        if position < 0:
+            return []
+        start, end = self.locality_offsets[position], self.locality_offsets[position + 1]
+        return [self.localities[i] for i in self.locality_ids[start:end]]
+
+    def lookup(self, postcode):
+        """Informations de localisation d'un code postal, None s'il est inconnu"""
+        position = _postcode_positions([postcode])[0]
+        if position < 0 or np.isnan(self.latitude[position]):
+            return None
+        return {
+            'postCode': int(position),
+            'latitude': float(self.latitude[position]),
+            'longitude': float(self.longitude[position]),
+            'province': self.provinces[self.province[position]],
+            'region': self.regions[self.region[position]],
+            'localities': self.localities_for(position),
+        }
+
+    def coordinates(self, postcodes):
+        """Latitude et longitude pour chaque code postal (NaN si inconnu), vectorisé"""
+        positions = _postcode_positions(postcodes)
+        # Position -1 -> dernier élément du tableau (9999) : on remet NaN explicitement
+        latitude = np.asarray(self.latitude[positions], dtype=float)
+        longitude = np.asarray(self.longitude[positions], dtype=float)
+        latitude[positions < 0] = np.nan
+        longitude[positions < 0] = np.nan
+        return latitude, longitude
+
+    def validate(self, postcode, province=None, region=None, locality=None):
+        """
+        Compare les champs saisis avec le code postal.
+        Retourne un dict champ -> valeur attendue pour chaque incohérence.
+        """
+        info = self.lookup(postcode)
+        if info is None:
+            return {'postCode': None}
+        mismatches = {}
+        if province is not None and province != info['province']:
+            mismatches['province'] = info['province']
+        if region is not None and region != info['region']:
+            mismatches['region'] = info['region']
+        if locality and info['localities']:
+            known = {name.casefold() for name in info['localities']}
+            if locality.strip().casefold() not in known:
+                mismatches['locality'] = info['localities']
+        return mismatches
+
+
+def add_coordinates(df, index):
+    """Ajoute latitude/longitude du code postal (colonnes du notebook de preprocessing)"""
+    df[LATITUDE_COLUMN], df[LONGITUDE_COLUMN] = index.coordinates(df['postCode'].to_numpy())
+    return df
+
+
+def postcode_index_path(base_dir):
+    return os.path.join(base_dir, 'data', INDEX_DIR_NAME)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_postcode_index(base_dir):
+    """Index partagé par le processus (chargé une fois), None s'il n'a pas été construit"""
+    index_dir = postcode_index_path(base_dir)
+    if index_dir in _indexes:
+        return _indexes[index_dir]
+    with _indexes_lock:
+        if index_dir not in _indexes:
+            if os.path.exists(os.path.join(index_dir, MANIFEST_NAME)):
+                _indexes[index_dir] = PostcodeIndex.load(index_dir)
+            else:
+                _indexes[index_dir] = None
+        return _indexes[index_dir]
@@ -4,29 +4,43 @@ Module pour gérer les feedbacks via Google Sheets
 Integration sécurisée pour le projet Immo Eliza
 """
 
-import gspread
-from google.oauth2.service_account import Credentials
 import streamlit as st
 from datetime import datetime
 import json
 import os
+import threading
+import time
+
+# Délai minimal entre deux tentatives de (re)connexion du client partagé
+RECONNECT_INTERVAL_SECONDS = 60.0
 
 class GoogleSheetsFeedback:
     """Gestionnaire des feedbacks via Google Sheets avec sécurité renforcée"""
     
-    def __init__(self):
-        """Initialise la connexion Google Sheets"""
+    def __init__(self, sheet=None):
+        """
+        Initialise la connexion Google Sheets.
+        `sheet` permet de fournir directement une feuille (ex. un faux gspread pour les tests).
+        """
         self.gc = None
-        self.sheet = None
+        self.sheet = sheet
         self.sheet_name = "Immo_Eliza_Feedbacks"
-        self.connected = False
-        self.setup_connection()
+        self.connected = sheet is not None
+        # Identifiants trouvés : une connexion en échec est alors une panne, pas une absence de configuration
+        self.configured = sheet is not None
+        if sheet is None:
+            self.setup_connection()
     
     def setup_connection(self):
         """Configure la connexion avec Google Sheets de manière sécurisée"""
         try:
+            # Imports différés : gspread et google-auth coûtent plusieurs centaines de ms au démarrage
+            import gspread
+            from google.oauth2.service_account import Credentials
+
             # En production (Streamlit Cloud), utilise les secrets
             if hasattr(st, 'secrets') and 'gcp_service_account' in st.secrets:
+                self.configured = True
                 credentials_info = st.secrets["gcp_service_account"]
                 credentials = Credentials.from_service_account_info(
                     credentials_info,
@@ -46,9 +60,11 @@ class GoogleSheetsFeedback:
                 project_path = 'credentials.json'
                 
                 if os.path.exists(secure_path):
+                    self.configured = True
                     # Utilise le fichier sécurisé
                     self.gc = gspread.service_account(filename=secure_path)
                 elif os.path.exists(project_path):
+                    self.configured = True
                     # Fallback temporaire (à éviter en production)
                     self.gc = gspread.service_account(filename=project_path)
                 else:
@@ -72,25 +88,37 @@ class GoogleSheetsFeedback:
         """Test la connexion à Google Sheets"""
         return self.connected
     
+    @staticmethod
+    def feedback_to_row(feedback_data):
+        """Ligne de la feuille pour un feedback"""
+        return [
+            feedback_data['timestamp'],
+            feedback_data['rating'],
+            feedback_data['comment'],
+            feedback_data['predicted_price'],
+            feedback_data['actual_price'] or ""
+        ]
+
     def save_feedback(self, feedback_data):
         """Sauvegarde un feedback dans Google Sheets"""
         if not self.connected or not self.sheet:
             return False
         
         try:
-            row_data = [
-                feedback_data['timestamp'],
-                feedback_data['rating'],
-                feedback_data['comment'],
-                feedback_data['predicted_price'],
-                feedback_data['actual_price'] or ""
-            ]
-            
-            self.sheet.append_row(row_data)
+            self.sheet.append_row(self.feedback_to_row(feedback_data))
             return True
             
         except Exception as e:
             return False
+
+    def append_feedbacks(self, feedbacks):
+        """
+        Ajoute plusieurs feedbacks en un seul appel API (append_rows).
+        Contrairement à save_feedback, les erreurs sont propagées pour permettre les retries.
+        """
+        if not self.connected or not self.sheet:
+            raise ConnectionError("Google Sheets non connecté")
+        self.sheet.append_rows([self.feedback_to_row(feedback) for feedback in feedbacks])
     
     def get_feedback_stats(self):
         """Récupère des statistiques sur les feedbacks"""
@@ -121,3 +149,36 @@ class GoogleSheetsFeedback:
                 
         except Exception as e:
             return None
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+_last_connect_attempt = 0.0
+
+
+def get_shared_client():
+    """
+    Client Google Sheets unique par processus (authentification et ouverture de la feuille une seule fois).
+    Si la connexion a échoué, une nouvelle tentative n'est faite qu'après RECONNECT_INTERVAL_SECONDS.
+    """
+    global _shared_client, _last_connect_attempt
+    client = _shared_client
+    if client is not None and client.connected:
+        return client
+
+    with _shared_client_lock:
+        if _shared_client is not None and _shared_client.connected:
+            return _shared_client
+        now = time.monotonic()
+        if _shared_client is None or now - _last_connect_attempt >= RECONNECT_INTERVAL_SECONDS:
+            _last_connect_attempt = now
+            _shared_client = GoogleSheetsFeedback()
+        return _shared_client
+
+
+def reset_shared_client():
+    """Force une reconnexion au prochain appel (ex. après une erreur d'authentification)"""
+    global _shared_client, _last_connect_attempt
+    with _shared_client_lock:
+        _shared_client = None
+        _last_connect_attempt = 0.0
@@ -0,0 +1,196 @@
+"""
+Fourchettes de prix par prédiction conforme (split conformal)
+Les résidus relatifs log(prix réel / prix prédit) sont mesurés sur le jeu de test du notebook
+d'entraînement (scripts/calibrate_intervals.py), par tranche de prix prédit. Les quantiles
+obtenus sont stockés à côté de l'artefact du modèle calibré (une calibration par modèle
+du registre, rattachée à sa version) et appliqués en une opération vectorisée après la
+prédiction ponctuelle.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from src.model_registry import MODEL_BASENAME, file_sha1
+
+CALIBRATION_FILENAME = f'{MODEL_BASENAME}_intervals.json'
+FORMAT_VERSION = 1
+DEFAULT_LEVELS = (0.8, 0.9)
+DEFAULT_LEVEL = 0.8
+# Prix prédit minimal pris en compte dans le logarithme
+_MIN_PRICE = 1.0
+
+
+def _log_residuals(y_true, y_pred):
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.maximum(np.asarray(y_pred, dtype=float), _MIN_PRICE)
+    return np.log(y_true) - np.log(y_pred)
+
+
+def _conformal_bounds(residuals, level):
+    """
+    Quantiles bas/haut des résidus signés avec la correction en (n + 1) du split conformal :
+    couverture garantie >= level sur des données échangeables
+    """
+    residuals = np.sort(residuals)
+    n = len(residuals)
+    alpha = 1.0 - level
+    k_low = int(np.floor((n + 1) * alpha / 2))
+    k_high = int(np.ceil((n + 1) * (1 - alpha / 2)))
+    low = residuals[min(max(k_low, 1), n) - 1]
+    high = residuals[min(max(k_high, 1), n) - 1]
+    return float(low), float(high)
+
+
+class IntervalCalibration:
+    """Quantiles conformes par tranche de prix prédit, pour un ou plusieurs niveaux de confiance"""
+
+    def __init__(self, bin_edges, bounds, model_version=None, n_calibration=0):
+        self.bin_edges = np.asarray(bin_edges, dtype=float)
+        # niveau -> (tableau des bornes basses par tranche, tableau des bornes hautes)
+        self.bounds = {
+            float(level): (np.asarray(low, dtype=float), np.asarray(high, dtype=float))
+            for level, (low, high) in bounds.items()
+        }
+        self.model_version = model_version
+        self.n_calibration = n_calibration
+
+    @property
+    def levels(self):
+        return sorted(self.bounds)
+
+    @classmethod
+    def fit(cls, y_true, y_pred, levels=DEFAULT_LEVELS, n_bins=5, min_bin_size=100, model_version=None):
+        """Calibre sur des données non vues à l'entraînement (prix réels > 0 uniquement)"""
+        y_true = np.asarray(y_true, dtype=float)
+        y_pred = np.asarray(y_pred, dtype=float)
+        keep = np.isfinite(y_true) & np.isfinite(y_pred) & (y_true > 0)
+        y_true, y_pred = y_true[keep], y_pred[keep]
+        if len(y_true) == 0:
+            raise ValueError("Aucune ligne exploitable pour la calibration")
+
+        # Moins de tranches si le jeu de calibration est petit
+        n_bins = max(1, min(n_bins, len(y_true) // min_bin_size))
+        bin_edges = np.unique(np.quantile(y_pred, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        bins = np.searchsorted(bin_edges, y_pred, side='right')
+        residuals = _log_residuals(y_true, y_pred)
+
+        bounds = {}
+        for level in levels:
+            per_bin = [_conformal_bounds(residuals[bins == b] if np.any(bins == b) else residuals, level)
+                       for b in range(len(bin_edges) + 1)]
+            bounds[level] = ([low for low, _ in per_bin], [high for _, high in per_bin])
+        return cls(bin_edges, bounds, model_version=model_version, n_calibration=int(len(y_true)))
+
+    def interval(self, predictions, level=DEFAULT_LEVEL):
+        """Bornes (basse, haute) pour un tableau de prix prédits, en une passe vectorisée"""
+        if level not in self.bounds:
+            raise ValueError(f"Niveau {level} non calibré (disponibles : {self.levels})")
+        low, high = self.bounds[level]
+        predictions = np.asarray(predictions, dtype=float)
+        bins = np.searchsorted(self.bin_edges, predictions, side='right')
+        base = np.maximum(predictions, _MIN_PRICE)
+        return base * np.exp(low[bins]), base * np.exp(high[bins])
+
+    def coverage(self, y_true, y_pred, level=DEFAULT_LEVEL):
+        """Part des prix réels dans la fourchette (contrôle sur un autre jeu de données)"""
+        lower, upper = self.interval(y_pred, level)
+        y_true = np.asarray(y_true, dtype=float)
+        return float(np.mean((y_true >= lower) & (y_true <= upper)))
+
+    def to_dict(self):
+        return {
+            'format_version': FORMAT_VERSION,
+            'model_version': self.model_version,
+            'n_calibration': self.n_calibration,
+            'bin_edges': self.bin_edges.tolist(),
+            'levels': {
+                str(level): {'lower': low.tolist(), 'upper': high.tolist()}
+                for level, (low, high) in self.bounds.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        bounds = {float(level): (values['lower'], values['upper']) for level, values in data['levels'].items()}
+        return cls(data['bin_edges'], bounds, model_version=data.get('model_version'),
+                   n_calibration=data.get('n_calibration', 0))
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def calibration_path(model_path, model_type):
+    """
+    Fichier de calibration d'un artefact, dans le dossier qui le contient : à côté de
+    pipeline_immo_eliza.joblib pour le modèle du projet, dans model/registry/<nom>/ pour
+    un modèle du registre (un modèle compilé partage le dossier parent de son dossier compilé)
+    """
+    model_dir = os.path.dirname(model_path)
+    if model_type == 'compiled':
+        model_dir = os.path.dirname(model_dir)
+    return os.path.join(model_dir, CALIBRATION_FILENAME)
+
+
+def calibration_versions(model_entry):
+    """
+    Versions de modèle auxquelles une calibration peut être rattachée pour ce modèle : la sienne
+    et, pour un modèle compilé, celle du pipeline joblib voisin dont il est la traduction exacte
+    """
+    versions = {model_entry.version}
+    if model_entry.model_type == 'compiled':
+        joblib_path = os.path.join(os.path.dirname(os.path.dirname(model_entry.path)), f'{MODEL_BASENAME}.joblib')
+        if os.path.exists(joblib_path):
+            versions.add(_joblib_version(joblib_path))
+    return versions
+
+
+_joblib_versions = {}
+
+
+def _joblib_version(path):
+    """sha1 court du pipeline joblib, recalculé seulement si le fichier change"""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _joblib_versions:
+        _joblib_versions[key] = file_sha1(path)[:12]
+    return _joblib_versions[key]
+
+
+_calibrations = {}
+_calibrations_lock = threading.Lock()
+
+
+def get_interval_calibration(model_entry):
+    """
+    Calibration propre au modèle servi (LoadedModel), chargée une fois par processus
+    (rechargée si le fichier change). None si elle n'existe pas ou si elle a été produite
+    pour une autre version : un challenger ou un champion du registre sans sa propre
+    calibration n'a pas de fourchette.
+    """
+    path = calibration_path(model_entry.path, model_entry.model_type)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    cache_key = (path, stat.st_mtime_ns, stat.st_size)
+    cached = _calibrations.get(path)
+    if cached is None or cached[0] != cache_key:
+        with _calibrations_lock:
+            cached = _calibrations.get(path)
+            if cached is None or cached[0] != cache_key:
+                cached = _calibrations[path] = (cache_key, IntervalCalibration.load(path))
+    calibration = cached[1]
+    if calibration.model_version not in calibration_versions(model_entry):
+        return None
+    return calibration
@@ -1,39 +1,58 @@
-from streamlit_local_storage import LocalStorage
+import streamlit as st
+import json
 import os
 
+# Tout l'état du formulaire est stocké sous une seule clé sérialisée (JSON versionné) :
+# une lecture et au plus une écriture (round-trip composant) par exécution du script
+STATE_KEY_SUFFIX = 'state'
+STATE_VERSION = 1
+# Clés modifiées depuis la dernière écriture ; conservées dans st.session_state car
+# les callbacks s'exécutent avant le rerun, sur l'instance de l'exécution précédente
+DIRTY_KEYS_STATE = '_immo_eliza_dirty_keys'
+
+# Valeurs par défaut du formulaire (aussi utilisées pour le bien synthétique du préchauffage, cf. src/warmup.py)
+DEFAULT_SESSION_VALUES = {
+    'type_key': '--- Choisissez un type ---',
+    'bedroomCount_key': 1,
+    'bathroomCount_key': 1,
+    'postCode_key': 1000,
+    'habitableSurface_key': 1,
+    'buildingCondition_key': 'GOOD',
+    'buildingConstructionYear_key': 1900,
+    'facedeCount_key': 2,
+    'toiletCount_key': 1,
+    'landSurface_key': 1,
+    'hasGarden_key': False,
+    'gardenSurface_key': 1,
+    'hasSwimmingPool_key': False,
+    'hasFireplace_key': False,
+    'hasTerrace_key': False,
+    'subtype_grouped_key': 'STANDARD_HOUSE',
+    'floodZoneType_key': 'NON_FLOOD_ZONE',
+    'heatingType_key': 'GAS',
+    'kitchenType_key': 'INSTALLED',
+    'building_floors_key': 1,
+    'apartment_floor_key': 1,
+    'region_key': "Wallonia",
+    'epcNumeric_key': 'A',
+    'province_key': 'Brussels',
+    'locality_key': None
+}
+
+
 class LocalStorageWrapper:
 
-    def __init__(self):
-        self.localS = LocalStorage()
+    def __init__(self, storage=None):
+        # `storage` permet de fournir un autre backend (ex. faux LocalStorage pour les benchmarks)
+        if storage is None:
+            from streamlit_local_storage import LocalStorage
+            storage = LocalStorage()
+        self.localS = storage
 
         self.prefix = 'immo_eliza_'
-        self.default_session_values = {
-            'type_key': '--- Choisissez un type ---',
-            'bedroomCount_key': 1,
-            'bathroomCount_key': 1,
-            'postCode_key': 1000,
-            'habitableSurface_key': 1,
-            'buildingCondition_key': 'GOOD',
-            'buildingConstructionYear_key': 1900,
-            'facedeCount_key': 2,
-            'toiletCount_key': 1,
-            'landSurface_key': 1,
-            'hasGarden_key': False,
-            'gardenSurface_key': 1,
-            'hasSwimmingPool_key': False,
-            'hasFireplace_key': False,
-            'hasTerrace_key': False,
-            'subtype_grouped_key': 'STANDARD_HOUSE',
-            'floodZoneType_key': 'NON_FLOOD_ZONE',
-            'heatingType_key': 'GAS',
-            'kitchenType_key': 'INSTALLED',
-            'building_floors_key': 1,
-            'apartment_floor_key': 1,
-            'region_key': "Wallonia",
-            'epcNumeric_key': 'A',
-            'province_key': 'Brussels',
-            'locality_key': None
-    }
+        self._state = None
+        self._writes = 0
+        self.default_session_values = dict(DEFAULT_SESSION_VALUES)
         
         # print("LocalStorageWrapper: Initialized") # --> Debug
 
@@ -60,34 +79,90 @@ class LocalStorageWrapper:
         unique_key = f"set_{prefixed_item_key}"
         self.localS.setItem(prefixed_item_key, value, key=unique_key)
         # print(f"LocalStorageWrapper: SET {prefixed_item_key} = {value}") # --> Debug
-   
-    
 
-    def initialize_state(self):
+
+    def _read_state(self):
         '''
-        Initialize local storage with default values if not already set
+        Read the serialized form state (one lookup), migrating the legacy one-key-per-field layout
         '''
-        # print("LocalStorageWrapper: initialize_state...") # --> Debug
+        raw = self.get(STATE_KEY_SUFFIX)
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError:
+                raw = None
+        if isinstance(raw, dict) and raw.get('version') == STATE_VERSION:
+            return dict(raw.get('values', {}))
 
-        for key_suffix, default_value in self.default_session_values.items():
-            current_value = self.get(key_suffix)
-            if current_value is None:
-                #print(f"LocalStorageWrapper: Initializing {key_suffix} with {default_value}") # --> Debug
-                self.set(key_suffix, default_value)
-            #else:
-                #print(f"LocalStorageWrapper: {key_suffix} already exist to {current_value}") # --> Debug
+        # Ancien format (ou version inconnue) : on reprend les clés individuelles existantes
+        legacy = {}
+        for key_suffix in self.default_session_values:
+            value = self.get(key_suffix)
+            if value is not None:
+                legacy[key_suffix] = value
+        return legacy
+
+    def get_many(self, key_suffixes=None):
+        '''
+        Get several values at once from the serialized state
+        '''
+        if self._state is None:
+            self._state = self._read_state()
+        if key_suffixes is None:
+            key_suffixes = self.default_session_values.keys()
+        return {key_suffix: self._state.get(key_suffix) for key_suffix in key_suffixes}
+
+    def set_many(self, values):
+        '''
+        Set several values at once: a single write of the serialized state, skipped if nothing changed
+        '''
+        if self._state is None:
+            self._state = self._read_state()
+        changed = {key: value for key, value in values.items() if self._state.get(key) != value}
+        if not changed:
+            return False
+        self._state.update(changed)
+        payload = json.dumps({'version': STATE_VERSION, 'values': self._state}, default=str)
+        # Clé de composant distincte si plusieurs écritures ont lieu dans la même exécution
+        prefixed_item_key = self._get_prefixed_key(STATE_KEY_SUFFIX)
+        self.localS.setItem(prefixed_item_key, payload, key=f"set_{prefixed_item_key}_{self._writes}")
+        self._writes += 1
+        return True
+
+    def initialize_state(self):
+        '''
+        Initialize local storage with default values if not already set, return all stored values
+        '''
+        stored_values = self.get_many()
+        missing = {key_suffix: default_value
+                   for key_suffix, default_value in self.default_session_values.items()
+                   if stored_values[key_suffix] is None and default_value is not None}
+        if missing:
+            self.set_many(missing)
+            stored_values.update(missing)
+        return stored_values
 
-    
     def get_all_items(self):
          '''
          Get all local storage values
          '''
-         stored_values = {}
-         for key_suffix in self.default_session_values.keys():
-             stored_values[key_suffix] = self.get(key_suffix) # Utilise la méthode get existante
-         
-         #print(f"LocalStorageWrapper: All items retrieved: {stored_values}") # --> Debug
-         
-         return stored_values
+         return self.get_many()
 
+    def mark_dirty(self, key_suffix):
+        '''
+        Record a changed field; it is written by the next flush() (write-behind)
+        '''
+        st.session_state.setdefault(DIRTY_KEYS_STATE, set()).add(key_suffix)
 
+    def flush(self, source=None):
+        '''
+        Write the changed fields (taken from `source`, st.session_state by default) in one round-trip
+        '''
+        source = st.session_state if source is None else source
+        dirty_keys = st.session_state.get(DIRTY_KEYS_STATE)
+        if not dirty_keys:
+            return False
+        changed = {key_suffix: source[key_suffix] for key_suffix in dirty_keys if key_suffix in source}
+        written = self.set_many(changed)
+        dirty_keys.clear()
+        return written
@@ -0,0 +1,167 @@
+"""
+Correspondance approximative des localités saisies librement
+Le pipeline encode `locality` par target encoding : une faute de frappe tombe sur la
+moyenne des catégories inconnues. L'index trigrammes ci-dessous ramène la saisie vers
+une localité connue du modèle (et propose des suggestions), en moins d'une milliseconde.
+"""
+
+import re
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+LOCALITY_COLUMN = 'locality'
+
+# Candidats retenus par les trigrammes puis reclassés par similarité d'édition
+CANDIDATES = 5
+# Score minimal (similarité d'édition sur les formes normalisées) pour remplacer la saisie
+DEFAULT_MIN_SCORE = 0.8
+# Bonus pour les localités rattachées au code postal saisi
+POSTCODE_BONUS = 0.2
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text):
+    """Minuscules, sans accents ni ponctuation : 'Liège' et 'LIEGE' deviennent 'liege'"""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def trigrams(normalized):
+    """Trigrammes d'un texte normalisé, avec bordures (les débuts de mots comptent davantage)"""
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def model_localities(model, model_type):
+    """Localités connues de l'encodeur `locality` du modèle chargé"""
+    if model_type == 'compiled':
+        for encoder in model.manifest['encoders']:
+            if encoder['column'] == LOCALITY_COLUMN:
+                return list(encoder['categories'])
+        return []
+    for _, step in model.steps:
+        transformer = getattr(step, 'transformer', step)
+        ordinal = getattr(transformer, 'ordinal_encoder', None) or transformer
+        for mapping in getattr(ordinal, 'mapping', None) or []:
+            if isinstance(mapping, dict) and mapping.get('col') == LOCALITY_COLUMN:
+                return [str(value) for value in mapping['mapping'].index if not pd.isna(value)]
+    return []
+
+
+class LocalityMatcher:
+    """Index trigrammes -> localités (listes d'identifiants NumPy), construit une fois par modèle"""
+
+    def __init__(self, localities):
+        self.localities = list(localities)
+        self._exact = set(self.localities)
+
+        # Plusieurs graphies d'une même localité (ANTWERPEN / Antwerpen) : la première rencontrée
+        # est la forme canonique de la version normalisée
+        self.canonical = {}
+        names = []
+        for locality in self.localities:
+            key = normalize(locality)
+            if key and key not in self.canonical:
+                self.canonical[key] = locality
+                names.append(key)
+        self.names = names
+
+        postings = {}
+        sizes = np.zeros(len(names), dtype=np.int32)
+        for name_id, name in enumerate(names):
+            grams = trigrams(name)
+            sizes[name_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(name_id)
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._sizes = sizes
+
+    def __len__(self):
+        return len(self.localities)
+
+    def _scores(self, key):
+        grams = trigrams(key)
+        hits = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not hits:
+            return None
+        common = np.bincount(np.concatenate(hits), minlength=len(self.names))
+        return 2.0 * common / (len(grams) + self._sizes)
+
+    def suggest(self, text, limit=5, postcode_localities=None):
+        """
+        Meilleures localités connues pour une saisie : liste de (localité, score) triée.
+        Les trigrammes présélectionnent CANDIDATES localités, reclassées par similarité d'édition.
+        `postcode_localities` (ex. PostcodeIndex.localities_for) favorise celles du code postal.
+        """
+        key = normalize(text) if text else ''
+        if not key:
+            return []
+        scores = self._scores(key)
+        if scores is None:
+            return []
+        bonus = np.zeros(len(scores))
+        if postcode_localities:
+            for name in {normalize(name) for name in postcode_localities}:
+                bonus[self._ids_containing(name)] = POSTCODE_BONUS
+            scores = scores + bonus
+
+        n_candidates = min(max(limit, CANDIDATES), len(scores))
+        candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+        ranked = []
+        for name_id in candidates:
+            if scores[name_id] <= 0:
+                continue
+            similarity = SequenceMatcher(None, key, self.names[name_id]).ratio() + bonus[name_id]
+            ranked.append((min(similarity, 1.0), -scores[name_id], name_id))
+        ranked.sort(key=lambda item: (-item[0], item[1], item[2]))
+        return [(self.canonical[self.names[name_id]], round(float(similarity), 3))
+                for similarity, _, name_id in ranked[:limit]]
+
+    def _ids_containing(self, name):
+        # 'Schepdaal (Dilbeek)' est rattaché à la localité 'Dilbeek' du code postal
+        key = f" {name} "
+        return [int(i) for i in self._candidate_ids(name) if key in f" {self.names[i]} "]
+
+    def _candidate_ids(self, name):
+        grams = [gram for gram in trigrams(name) if gram in self._postings]
+        if not grams:
+            return []
+        return np.unique(np.concatenate([self._postings[gram] for gram in grams]))
+
+    def resolve(self, text, min_score=DEFAULT_MIN_SCORE, postcode_localities=None):
+        """
+        Localité canonique pour une saisie, ou None si rien n'est assez proche.
+        Une localité déjà connue du modèle est renvoyée telle quelle.
+        """
+        if text in self._exact:
+            return text
+        key = normalize(text) if text else ''
+        if key in self.canonical:
+            return self.canonical[key]
+        suggestions = self.suggest(text, limit=1, postcode_localities=postcode_localities)
+        if suggestions and suggestions[0][1] >= min_score:
+            return suggestions[0][0]
+        return None
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_locality_matcher(model_entry):
+    """Index des localités du modèle, construit une fois par version du modèle"""
+    matcher = _matchers.get(model_entry.version)
+    if matcher is None:
+        with _matchers_lock:
+            matcher = _matchers.get(model_entry.version)
+            if matcher is None:
+                matcher = LocalityMatcher(model_localities(model_entry.model, model_entry.model_type))
+                _matchers.clear()
+                _matchers[model_entry.version] = matcher
+    return matcher
@@ -0,0 +1,63 @@
+"""
+Logs structurés (JSON, une ligne par événement) pour Immo Eliza
+Filtrés par niveau, avec échantillonnage des logs DEBUG pour ne pas
+sérialiser toutes les requêtes sur la sortie standard
+"""
+
+import json
+import logging
+import random
+import sys
+
+from src import settings
+
+_LOGGER_ROOT = 'immo_eliza'
+_configured = False
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate chaque enregistrement en une ligne JSON (champs passés via extra={'fields': {...}})"""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        payload.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Ne laisse passer qu'une fraction des enregistrements de niveau <= DEBUG"""
+
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        return random.random() < self.sample_rate
+
+
+def _configure():
+    global _configured
+    root = logging.getLogger(_LOGGER_ROOT)
+    root.setLevel(settings.LOG_LEVEL)
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATE))
+    root.addHandler(handler)
+    root.propagate = False
+    _configured = True
+
+
+def get_logger(name):
+    """Logger enfant de 'immo_eliza', configuré une seule fois par processus"""
+    if not _configured:
+        _configure()
+    return logging.getLogger(f"{_LOGGER_ROOT}.{name}")
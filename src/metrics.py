@@ -0,0 +1,59 @@
+"""
+Métriques de service pour Immo Eliza : percentiles de latence et histogrammes
+Utilisées par l'API de prédiction (et réutilisables par les scripts de benchmark)
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class LatencyRecorder:
+    """Garde les N dernières latences (en secondes) et calcule p50/p95/p99"""
+
+    def __init__(self, window=10000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        """Percentiles en millisecondes sur la fenêtre glissante"""
+        with self._lock:
+            samples = np.array(self._samples, dtype=float)
+        if len(samples) == 0:
+            return {'count': self.count, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'mean_ms': None}
+
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+        return {
+            'count': self.count,
+            'p50_ms': round(float(p50), 3),
+            'p95_ms': round(float(p95), 3),
+            'p99_ms': round(float(p99), 3),
+            'mean_ms': round(float(samples.mean() * 1000), 3),
+        }
+
+
+class Histogram:
+    """Histogramme à bornes fixes (ex. tailles de batch : 1, 2, 4, 8, ...)"""
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._lock = threading.Lock()
+
+    def record(self, value):
+        index = int(np.searchsorted(self.bounds, value, side='left'))
+        with self._lock:
+            self._counts[index] += 1
+
+    def summary(self):
+        with self._lock:
+            counts = list(self._counts)
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return dict(zip(labels, counts))
@@ -0,0 +1,113 @@
+"""
+Micro-batching des prédictions pour Immo Eliza
+Les requêtes concurrentes sont regroupées (taille max / attente max) afin
+qu'un seul appel à predict serve plusieurs requêtes
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from src.metrics import Histogram, LatencyRecorder
+
+
+class MicroBatcher:
+    """
+    File d'attente + thread de fond : `submit` retourne un Future résolu avec
+    les prédictions des lignes soumises, une fois le batch commun prédit.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+        self.predict_latency = LatencyRecorder()
+        self.isolated_failures = 0
+
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, rows):
+        """Soumet une liste de lignes (listes ordonnées de features)"""
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def predict(self, rows, timeout=None):
+        """Version bloquante de `submit`"""
+        return self.submit(rows).result(timeout=timeout)
+
+    def stop(self):
+        self._stopped.set()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect_batch(self, first):
+        """Accumule des requêtes jusqu'à max_batch_size lignes ou max_wait écoulé"""
+        batch = [first]
+        n_rows = len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._stopped.set()
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = self._collect_batch(first)
+
+            all_rows = [row for rows, _ in batch for row in rows]
+            self.batch_sizes.record(len(all_rows))
+            try:
+                start = time.perf_counter()
+                predictions = self.predict_fn(all_rows)
+                self.predict_latency.record(time.perf_counter() - start)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    self._predict_each(batch)
+                continue
+
+            offset = 0
+            for rows, future in batch:
+                future.set_result(list(predictions[offset:offset + len(rows)]))
+                offset += len(rows)
+
+    def _predict_each(self, batch):
+        """Batch en échec : chaque requête est reprédite seule, seule la fautive reçoit l'exception"""
+        self.isolated_failures += 1
+        for rows, future in batch:
+            try:
+                future.set_result(list(self.predict_fn(rows)))
+            except Exception as e:
+                future.set_exception(e)
+
+    def metrics(self):
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'queue_size': self._queue.qsize(),
+            'isolated_failures': self.isolated_failures,
+            'batch_size_histogram': self.batch_sizes.summary(),
+            'predict_latency': self.predict_latency.summary(),
+        }
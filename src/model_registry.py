@@ -0,0 +1,292 @@
+"""
+Registre des modèles chargés en mémoire pour Immo Eliza
+Le pipeline est désérialisé une seule fois par processus et partagé
+entre toutes les sessions Streamlit (et les scripts batch / API).
+
+Plusieurs modèles peuvent être servis en parallèle (champion / challengers) :
+model/registry/ contient un dossier par version d'artefact et un manifest.json
+(features attendues, métriques, part du trafic, modèles évalués en ombre).
+Sans manifest, le modèle unique model/pipeline_immo_eliza.* est servi.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from src import settings
+
+MODEL_DIR_NAME = 'model'
+MODEL_BASENAME = 'pipeline_immo_eliza'
+COMPILED_DIR_NAME = f'{MODEL_BASENAME}_compiled'
+REGISTRY_DIR_NAME = 'registry'
+REGISTRY_MANIFEST_NAME = 'manifest.json'
+DEFAULT_MODEL_NAME = 'default'
+
+
+class LoadedModel:
+    """Pipeline chargé avec ses métadonnées (version, taille, temps de chargement)"""
+
+    def __init__(self, model, model_type, path, mtime_ns, size_bytes, sha1, load_seconds, name=DEFAULT_MODEL_NAME):
+        self.name = name
+        self.model = model
+        self.model_type = model_type
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size_bytes = size_bytes
+        self.sha1 = sha1
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+    @property
+    def version(self):
+        """Identifiant court de l'artefact (change dès que le fichier change)"""
+        return self.sha1[:12]
+
+    def metrics(self):
+        """Métriques de chargement exposées à l'interface"""
+        return {
+            'name': self.name,
+            'path': self.path,
+            'model_type': self.model_type,
+            'version': self.version,
+            'size_mb': round(self.size_bytes / (1024 * 1024), 2),
+            'load_seconds': round(self.load_seconds, 3),
+            'loaded_at': self.loaded_at,
+        }
+
+
+def resolve_model_path(base_dir):
+    """
+    Retourne (chemin, type) de l'artefact à charger :
+    la version compilée si demandée (IMMO_ELIZA_MODEL_FORMAT=compiled), sinon
+    joblib en priorité (plus léger), puis fallback vers le .pkl PyCaret
+    """
+    model_dir = os.path.join(base_dir, MODEL_DIR_NAME)
+    if settings.MODEL_FORMAT == 'compiled':
+        from src.compiled_model import MANIFEST_NAME
+        manifest_path = os.path.join(model_dir, COMPILED_DIR_NAME, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            return manifest_path, 'compiled'
+
+    joblib_path = os.path.join(model_dir, f'{MODEL_BASENAME}.joblib')
+    pkl_path = os.path.join(model_dir, f'{MODEL_BASENAME}.pkl')
+
+    if os.path.exists(joblib_path):
+        return joblib_path, 'joblib'
+    if os.path.exists(pkl_path):
+        return pkl_path, 'pycaret'
+    raise FileNotFoundError("Aucun modèle trouvé (ni .joblib ni .pkl)")
+
+
+class ModelSpec:
+    """Entrée du manifest : artefact d'un modèle, features attendues, métriques et rôle"""
+
+    def __init__(self, name, path, model_type, features=None, metrics=None, traffic=0.0, shadow=False):
+        self.name = name
+        self.path = path
+        self.model_type = model_type
+        self.features = features
+        self.metrics = metrics or {}
+        self.traffic = traffic
+        self.shadow = shadow
+
+    def to_dict(self, registry_dir):
+        return {'path': os.path.relpath(self.path, registry_dir), 'model_type': self.model_type,
+                'features': self.features, 'metrics': self.metrics}
+
+
+def registry_dir_path(base_dir):
+    return os.path.join(base_dir, MODEL_DIR_NAME, REGISTRY_DIR_NAME)
+
+
+def registry_manifest_path(base_dir):
+    return os.path.join(registry_dir_path(base_dir), REGISTRY_MANIFEST_NAME)
+
+
+def read_manifest(path):
+    """
+    Lit le manifest du registre :
+    {"models": {nom: {"path", "model_type", "features", "metrics"}},
+     "traffic": {nom: part}, "shadow": [nom, ...]}
+    Retourne la liste des ModelSpec (chemins absolus), modèles servis d'abord
+    """
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    registry_dir = os.path.dirname(path)
+    traffic = manifest.get('traffic', {})
+    shadow = set(manifest.get('shadow', []))
+
+    unknown = (set(traffic) | shadow) - set(manifest['models'])
+    if unknown:
+        raise ValueError(f"Modèles absents du manifest : {', '.join(sorted(unknown))}")
+    if not any(share > 0 for share in traffic.values()):
+        raise ValueError("Le manifest doit attribuer du trafic à au moins un modèle")
+
+    specs = []
+    for name, entry in manifest['models'].items():
+        specs.append(ModelSpec(name, os.path.join(registry_dir, entry['path']), entry['model_type'],
+                               entry.get('features'), entry.get('metrics'),
+                               float(traffic.get(name, 0.0)), name in shadow))
+    specs.sort(key=lambda spec: -spec.traffic)
+    return specs
+
+
+def write_manifest(path, specs):
+    """Écrit le manifest (remplacement atomique) ; refusé si aucun modèle ne reçoit de trafic"""
+    if not any(spec.traffic > 0 for spec in specs):
+        raise ValueError("Le manifest doit attribuer du trafic à au moins un modèle")
+    registry_dir = os.path.dirname(path)
+    manifest = {
+        'models': {spec.name: spec.to_dict(registry_dir) for spec in specs},
+        'traffic': {spec.name: spec.traffic for spec in specs if spec.traffic > 0},
+        'shadow': [spec.name for spec in specs if spec.shadow],
+    }
+    os.makedirs(registry_dir, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def check_features(spec):
+    """Refuse un modèle entraîné sur d'autres features que celles construites par l'application"""
+    if spec.features is None:
+        return
+    from src.prediction import EXPECTED_COLUMNS_ORDER
+    if list(spec.features) != EXPECTED_COLUMNS_ORDER:
+        missing = sorted(set(EXPECTED_COLUMNS_ORDER) - set(spec.features))
+        extra = sorted(set(spec.features) - set(EXPECTED_COLUMNS_ORDER))
+        raise ValueError(f"Features du modèle '{spec.name}' incompatibles avec l'application "
+                         f"(manquantes : {missing}, en trop : {extra}, ou ordre différent)")
+
+
+def file_sha1(path, chunk_size=1024 * 1024):
+    """Empreinte SHA-1 d'un fichier, lue par blocs (version des artefacts de modèle)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_artifact(path, model_type):
+    # Imports différés : seule la bibliothèque du format réellement chargé est importée
+    if model_type == 'joblib':
+        import joblib
+        return joblib.load(path)
+    if model_type == 'compiled':
+        from src.compiled_model import CompiledModel
+        return CompiledModel.load(os.path.dirname(path))
+    # PyCaret load_model attend le chemin sans extension
+    from pycaret.regression import load_model
+    return load_model(os.path.splitext(path)[0])
+
+
+class ModelRegistry:
+    """
+    Cache des pipelines par processus, indexé par (nom, chemin) et validé par mtime + taille.
+    Si l'artefact change sur le disque, il est rechargé (hot-swap) au prochain appel ; un modèle
+    retiré du manifest est libéré à la relecture de celui-ci.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._manifest = (None, None)
+        self.load_count = 0
+
+    def get(self, path, model_type, name=DEFAULT_MODEL_NAME):
+        """Retourne le LoadedModel de ce modèle (nom, chemin), en le (re)chargeant si nécessaire"""
+        key = (name, path)
+        stat = os.stat(path)
+        entry = self._entries.get(key)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size_bytes == stat.st_size:
+            return entry
+
+        with self._lock:
+            # Un autre thread a peut-être déjà rechargé pendant qu'on attendait le verrou
+            stat = os.stat(path)
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size_bytes == stat.st_size:
+                return entry
+
+            sha1 = file_sha1(path)
+            if entry is not None and entry.sha1 == sha1:
+                # Fichier touché mais contenu identique : pas besoin de désérialiser
+                entry.mtime_ns = stat.st_mtime_ns
+                return entry
+
+            start = time.perf_counter()
+            model = _load_artifact(path, model_type)
+            load_seconds = time.perf_counter() - start
+
+            entry = LoadedModel(model, model_type, path, stat.st_mtime_ns, stat.st_size, sha1, load_seconds, name)
+            self._entries[key] = entry
+            self.load_count += 1
+            return entry
+
+    def get_default(self, base_dir):
+        """
+        Charge le modèle par défaut : le plus servi du registre s'il existe,
+        sinon celui du projet (model/pipeline_immo_eliza.*)
+        """
+        spec = self.specs(base_dir)[0]
+        return self.get(spec.path, spec.model_type, spec.name)
+
+    def specs(self, base_dir):
+        """Modèles déclarés (manifest relu seulement s'il change), ou le modèle unique du projet"""
+        manifest_path = registry_manifest_path(base_dir)
+        try:
+            mtime_ns = os.stat(manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            path, model_type = resolve_model_path(base_dir)
+            specs = [ModelSpec(DEFAULT_MODEL_NAME, path, model_type, traffic=1.0)]
+            if self._manifest[0] is not None:
+                # Manifest supprimé : retour au modèle unique du projet
+                self._manifest = (None, None)
+                self._prune(specs)
+            return specs
+
+        cached_mtime, specs = self._manifest
+        if cached_mtime != mtime_ns:
+            specs = read_manifest(manifest_path)
+            for spec in specs:
+                check_features(spec)
+            self._manifest = (mtime_ns, specs)
+            self._prune(specs)
+        return specs
+
+    def _prune(self, specs):
+        """Libère les modèles qui ne sont plus déclarés (challenger retiré, artefact remplacé)"""
+        declared = {(spec.name, spec.path) for spec in specs}
+        with self._lock:
+            for key in [key for key in self._entries if key not in declared]:
+                del self._entries[key]
+
+    def get_models(self, base_dir):
+        """Tous les modèles déclarés, chargés une fois par processus : {nom: LoadedModel}"""
+        return {spec.name: self.get(spec.path, spec.model_type, spec.name) for spec in self.specs(base_dir)}
+
+    def metrics(self):
+        """Métriques de tous les modèles actuellement en mémoire"""
+        return {
+            'load_count': self.load_count,
+            'models': [entry.metrics() for entry in self._entries.values()],
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._manifest = (None, None)
+
+
+# Instance unique par processus : les modules importés ne sont pas ré-exécutés
+# par Streamlit lors des reruns, elle est donc partagée entre toutes les sessions.
+registry = ModelRegistry()
+
+
+def get_model(base_dir):
+    """Raccourci vers le modèle par défaut du registre partagé"""
+    return registry.get_default(base_dir)
@@ -0,0 +1,237 @@
+"""
+Répartition du trafic entre les modèles du registre (tests A/B) et évaluation en ombre
+Chaque session est affectée à un modèle servi de façon déterministe (hash de l'identifiant
+de session) selon les parts du manifest. Les modèles « ombre » prédisent les mêmes biens
+dans un thread de fond, après la réponse : aucune latence ajoutée pour l'utilisateur.
+Latences et écart des prédictions sont suivis par modèle ; la qualité face aux prix réels
+vient des feedbacks, enregistrés avec la version du modèle qui a prédit.
+"""
+
+import atexit
+import hashlib
+import logging
+import queue
+import threading
+import time
+
+from src.metrics import LatencyRecorder
+from src.model_registry import registry
+from src.prediction import predict_frame, prepare_input_frame
+
+logger = logging.getLogger('immo_eliza.model_router')
+
+# Changer le sel redistribue toutes les sessions (nouvelle expérience)
+DEFAULT_SALT = 'immo-eliza-ab'
+
+_STOP = object()
+
+
+def assign_model(session_id, traffic, salt=DEFAULT_SALT):
+    """
+    Modèle servi à une session : position stable de la session dans [0, 1) (hash),
+    comparée aux parts cumulées du trafic ({nom: part}, normalisées)
+    """
+    shares = [(name, share) for name, share in sorted(traffic.items()) if share > 0]
+    total = sum(share for _, share in shares)
+    digest = hashlib.sha256(f'{salt}:{session_id}'.encode('utf-8')).digest()
+    position = int.from_bytes(digest[:8], 'big') / 2 ** 64 * total
+    cumulative = 0.0
+    for name, share in shares:
+        cumulative += share
+        if position < cumulative:
+            return name
+    return shares[-1][0]
+
+
+class ModelStats:
+    """Compteurs d'un modèle : prédictions servies, prédictions en ombre et écart au modèle servi"""
+
+    def __init__(self):
+        self.served_latency = LatencyRecorder()
+        self.shadow_latency = LatencyRecorder()
+        self.requests = 0
+        self.served = 0
+        self.shadowed = 0
+        self.errors = 0
+        self._abs_pct_diff = 0.0
+        self._pct_diff = 0.0
+        self._lock = threading.Lock()
+
+    def record_served(self, n_rows, seconds):
+        self.served_latency.record(seconds)
+        with self._lock:
+            self.requests += 1
+            self.served += n_rows
+
+    def record_shadow(self, predictions, served_predictions, seconds):
+        self.shadow_latency.record(seconds)
+        with self._lock:
+            for predicted, served in zip(predictions, served_predictions):
+                if served:
+                    self._abs_pct_diff += abs(predicted - served) / served
+                    self._pct_diff += (predicted - served) / served
+            self.shadowed += len(predictions)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def summary(self):
+        with self._lock:
+            shadowed = self.shadowed
+            return {
+                'requests': self.requests,
+                'served': self.served,
+                'served_latency': self.served_latency.summary(),
+                'shadowed': shadowed,
+                'shadow_latency': self.shadow_latency.summary(),
+                # Écart relatif moyen au modèle servi sur les mêmes biens (|écart| et signe)
+                'shadow_abs_pct_diff': self._abs_pct_diff / shadowed if shadowed else None,
+                'shadow_pct_diff': self._pct_diff / shadowed if shadowed else None,
+                'errors': self.errors,
+            }
+
+
+class ModelRouter:
+    """Modèles du registre, affectation des sessions, prédiction et file d'évaluation en ombre"""
+
+    def __init__(self, base_dir, model_registry=registry, salt=DEFAULT_SALT, max_shadow_queue=1000):
+        self.base_dir = base_dir
+        self.registry = model_registry
+        self.salt = salt
+        self.stats = {}
+        self.shadow_dropped = 0
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_shadow_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def models(self):
+        """{nom: LoadedModel} de tous les modèles déclarés (chargés une fois par processus)"""
+        return self.registry.get_models(self.base_dir)
+
+    def model_for(self, session_id):
+        """LoadedModel servi à cette session"""
+        specs = self.registry.specs(self.base_dir)
+        name = assign_model(session_id, {spec.name: spec.traffic for spec in specs}, self.salt)
+        return self.models()[name]
+
+    def model_stats(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            with self._stats_lock:
+                stats = self.stats.setdefault(name, ModelStats())
+        return stats
+
+    def predict(self, model_entry, rows, df_input_data=None):
+        """Prédit avec le modèle servi et met en file l'évaluation en ombre (retour immédiat)"""
+        if df_input_data is None:
+            df_input_data = prepare_input_frame(rows)
+        stats = self.model_stats(model_entry.name)
+        start = time.perf_counter()
+        try:
+            predictions = predict_frame(model_entry.model, model_entry.model_type, df_input_data)
+        except Exception:
+            stats.record_error()
+            raise
+        stats.record_served(len(rows), time.perf_counter() - start)
+        predictions = [float(value) for value in predictions]
+        self.shadow(model_entry.name, rows, predictions, df_input_data)
+        return predictions
+
+    def shadow(self, served_name, rows, served_predictions, df_input_data=None):
+        """Met en file les mêmes biens pour les modèles ombre (ignoré si la file est pleine)"""
+        if not any(spec.shadow and spec.name != served_name for spec in self.registry.specs(self.base_dir)):
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((served_name, rows, served_predictions, df_input_data))
+        except queue.Full:
+            self.shadow_dropped += 1
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='shadow-scoring', daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout=None):
+        """Attend la fin des évaluations en ombre mises en file avant l'appel"""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout=10.0):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                self._score_shadow(*item)
+            except Exception:
+                logger.exception("Échec de l'évaluation en ombre")
+
+    def _score_shadow(self, served_name, rows, served_predictions, df_input_data):
+        if df_input_data is None:
+            df_input_data = prepare_input_frame(rows)
+        models = self.models()
+        for spec in self.registry.specs(self.base_dir):
+            if not spec.shadow or spec.name == served_name:
+                continue
+            model_entry = models[spec.name]
+            stats = self.model_stats(spec.name)
+            start = time.perf_counter()
+            try:
+                predictions = predict_frame(model_entry.model, model_entry.model_type, df_input_data)
+            except Exception:
+                stats.record_error()
+                logger.exception("Échec de la prédiction en ombre du modèle %s", spec.name)
+                continue
+            stats.record_shadow([float(value) for value in predictions], served_predictions,
+                                time.perf_counter() - start)
+
+    def metrics(self):
+        """Par modèle : rôle, part du trafic, version, métriques du manifest et compteurs"""
+        specs = self.registry.specs(self.base_dir)
+        models = self.models()
+        return {
+            'models': [{
+                'name': spec.name,
+                'version': models[spec.name].version,
+                'traffic': spec.traffic,
+                'shadow': spec.shadow,
+                'manifest_metrics': spec.metrics,
+                **self.model_stats(spec.name).summary(),
+            } for spec in specs],
+            'shadow_queue': self._queue.qsize(),
+            'shadow_dropped': self.shadow_dropped,
+        }
+
+
+_routers = {}
+_routers_lock = threading.Lock()
+
+
+def get_model_router(base_dir):
+    """Routeur partagé par le processus (file d'ombre vidée à l'arrêt)"""
+    if base_dir in _routers:
+        return _routers[base_dir]
+    with _routers_lock:
+        if base_dir not in _routers:
+            router = ModelRouter(base_dir)
+            atexit.register(router.stop)
+            _routers[base_dir] = router
+        return _routers[base_dir]
@@ -0,0 +1,109 @@
+"""
+Comparaison de modèles PyCaret en parallèle (remplace compare_models du notebook)
+Chaque processus du pool refait le setup du notebook une seule fois (mêmes paramètres,
+même découpage grâce à session_id), puis entraîne en validation croisée les modèles
+qu'on lui confie. Les modèles encore en cours à la fin du budget de temps sont abandonnés.
+"""
+
+import multiprocessing
+import time
+
+import pandas as pd
+
+TARGET = 'price'
+
+# Paramètres du setup de notebooks/setup_train_pipeline.ipynb
+SETUP_PARAMS = {
+    'target': TARGET,
+    'train_size': 0.8,
+    'imputation_type': 'simple',
+    'numeric_imputation': 'median',
+    'categorical_imputation': 'mode',
+    'normalize': True,
+    'normalize_method': 'minmax',
+    'transformation': True,
+    'remove_multicollinearity': False,
+    'session_id': 42,
+}
+
+# Modèles de compare_models disponibles avec requirements.txt (ni xgboost ni catboost),
+# les plus prometteurs d'abord pour qu'ils passent dans le budget de temps
+CANDIDATE_MODELS = ['lightgbm', 'gbr', 'rf', 'et', 'ridge', 'br', 'lasso', 'en', 'lr', 'huber',
+                    'knn', 'dt', 'ada', 'omp', 'llar', 'par', 'dummy']
+
+SORT_METRIC = 'R2'
+HIGHER_IS_BETTER = {'R2'}
+
+# Expérience PyCaret du processus (initialisée une fois par worker)
+_experiment = None
+
+
+def create_experiment(data, fold=10, n_jobs=-1):
+    """Setup PyCaret du notebook sur le dataset nettoyé"""
+    from pycaret.regression import RegressionExperiment
+
+    experiment = RegressionExperiment()
+    experiment.setup(data, fold=fold, n_jobs=n_jobs, verbose=False, html=False, **SETUP_PARAMS)
+    return experiment
+
+
+def _init_worker(train_path, fold):
+    global _experiment
+    # Un seul cœur par worker : le parallélisme vient du pool
+    _experiment = create_experiment(pd.read_parquet(train_path), fold=fold, n_jobs=1)
+
+
+def _evaluate(model_id):
+    """Validation croisée d'un modèle dans le worker ; retourne un dict sérialisable"""
+    start = time.perf_counter()
+    try:
+        _experiment.create_model(model_id, verbose=False)
+        scores = _experiment.pull()
+        metrics = {name: float(value) for name, value in scores.loc['Mean'].items()}
+        return {'model': model_id, 'status': 'ok', 'metrics': metrics,
+                'seconds': round(time.perf_counter() - start, 2)}
+    except Exception as e:
+        return {'model': model_id, 'status': 'error', 'error': str(e),
+                'seconds': round(time.perf_counter() - start, 2)}
+
+
+def rank_results(results, sort=SORT_METRIC):
+    """Résultats triés : modèles terminés du meilleur au moins bon, puis échecs et abandons"""
+    done = [r for r in results if r['status'] == 'ok' and sort in r['metrics']]
+    others = [r for r in results if r not in done]
+    done.sort(key=lambda r: r['metrics'][sort], reverse=sort in HIGHER_IS_BETTER)
+    return done + others
+
+
+def compare_models_parallel(train_path, models=CANDIDATE_MODELS, n_workers=None, time_budget=None,
+                            fold=10, sort=SORT_METRIC):
+    """
+    Compare `models` en validation croisée sur un pool de `n_workers` processus.
+    time_budget (secondes, None = illimité) inclut le setup des workers ; les modèles non
+    terminés à l'échéance sont marqués 'timeout' et leurs processus arrêtés.
+    Retourne la liste des résultats triée (cf. rank_results).
+    """
+    n_workers = n_workers or max(1, multiprocessing.cpu_count())
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+
+    # spawn : pas de fork d'un processus qui a déjà lancé des threads OpenMP (LightGBM)
+    context = multiprocessing.get_context('spawn')
+    pool = context.Pool(min(n_workers, len(models)), initializer=_init_worker, initargs=(train_path, fold))
+    pending = [(model_id, pool.apply_async(_evaluate, (model_id,))) for model_id in models]
+
+    results = []
+    timed_out = False
+    for model_id, async_result in pending:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            results.append(async_result.get(timeout=timeout))
+        except multiprocessing.TimeoutError:
+            timed_out = True
+            results.append({'model': model_id, 'status': 'timeout', 'seconds': None})
+
+    if timed_out:
+        pool.terminate()
+    else:
+        pool.close()
+    pool.join()
+    return rank_results(results, sort)
@@ -0,0 +1,130 @@
+"""
+Préparation des features et prédiction partagées entre l'application,
+le scoring batch et l'API
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.features import add_region_and_epc
+from src.schema import BOOLEAN_COLUMNS, FLOAT32_COLUMNS, INTEGER_COLUMNS, apply_schema, typed_frame
+
+EXPECTED_COLUMNS_ORDER = [
+    'type', 'bedroomCount', 'bathroomCount', 'province', 'locality',
+       'postCode', 'habitableSurface', 'buildingCondition',
+       'buildingConstructionYear', 'facedeCount', 'floodZoneType',
+       'heatingType', 'kitchenType', 'landSurface', 'hasGarden',
+       'gardenSurface', 'toiletCount', 'hasSwimmingPool', 'hasFireplace',
+       'hasTerrace', 'subtype_grouped', 'building_floors',
+       'apartment_floor', 'region', 'epcNumeric']
+
+# Colonnes recalculées par add_region_and_epc : facultatives dans les payloads JSON
+DERIVED_COLUMNS = ('region',)
+# Colonnes typées seulement après add_region_and_epc (epcNumeric arrive en classe PEB A++ ... G ou en score)
+_LATE_TYPED_COLUMNS = ('region', 'epcNumeric')
+# Colonnes numériques d'un payload (epcNumeric accepte aussi la classe PEB en texte)
+_NUMERIC_PAYLOAD_COLUMNS = (set(INTEGER_COLUMNS) | set(FLOAT32_COLUMNS)) - {'epcNumeric'}
+
+
+def build_input_frame(rows):
+    """
+    DataFrame aux colonnes attendues à partir d'une liste de lignes (listes ordonnées),
+    typé selon src/schema.py (sauf région et classe PEB, convertis par prepare_input_frame)
+    """
+    if not rows:
+        return pd.DataFrame(columns=EXPECTED_COLUMNS_ORDER)
+    columns = zip(*rows) if len(rows) > 1 else ([value] for value in rows[0])
+    return typed_frame(dict(zip(EXPECTED_COLUMNS_ORDER, columns)), skip=_LATE_TYPED_COLUMNS)
+
+
+def _is_number(value):
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _value_error(col, value):
+    """Motif du rejet d'une valeur de payload (None si la valeur est acceptable)"""
+    if value is None:
+        return None
+    if not isinstance(value, (str, int, float)):
+        return "valeur scalaire attendue"
+    if col in _NUMERIC_PAYLOAD_COLUMNS:
+        return None if _is_number(value) else "nombre attendu"
+    if col in BOOLEAN_COLUMNS:
+        return None if isinstance(value, bool) else "booléen attendu"
+    if col == 'epcNumeric':
+        return None if not isinstance(value, bool) else "classe PEB ou score attendu"
+    return None if isinstance(value, str) else "texte attendu"
+
+
+def payload_to_row(payload):
+    """
+    Valide un payload JSON (dict colonne -> valeur) et le convertit en ligne ordonnée.
+    Lève ValueError si des colonnes manquent ou sont inconnues, ou si une valeur n'a pas le
+    bon type (objet, liste, texte pour une colonne numérique...) : un payload invalide ne doit
+    pas faire échouer le micro-batch qu'il partage avec d'autres requêtes.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Chaque bien doit être un objet JSON (colonne -> valeur)")
+
+    missing = [col for col in EXPECTED_COLUMNS_ORDER if col not in payload and col not in DERIVED_COLUMNS]
+    unknown = [col for col in payload if col not in EXPECTED_COLUMNS_ORDER]
+    if missing or unknown:
+        raise ValueError(f"Colonnes manquantes : {missing} ; colonnes inconnues : {unknown}")
+    invalid = {col: reason for col, reason in ((col, _value_error(col, payload.get(col)))
+                                               for col in EXPECTED_COLUMNS_ORDER) if reason}
+    if invalid:
+        raise ValueError(f"Valeurs invalides : {invalid}")
+    return [payload.get(col) for col in EXPECTED_COLUMNS_ORDER]
+
+
+def prepare_input_frame(rows):
+    """DataFrame prêt pour le modèle : colonnes attendues + région et score PEB calculés"""
+    return apply_schema(add_region_and_epc(build_input_frame(rows)), columns=_LATE_TYPED_COLUMNS)
+
+
+def prepare_frame(df):
+    """Comme prepare_input_frame pour un DataFrame aux colonnes attendues (batch, grilles)"""
+    columns = {col: df[col] for col in EXPECTED_COLUMNS_ORDER if col in df.columns or col not in DERIVED_COLUMNS}
+    typed = typed_frame(columns, index=df.index, skip=_LATE_TYPED_COLUMNS)
+    return apply_schema(add_region_and_epc(typed), columns=_LATE_TYPED_COLUMNS)
+
+
+def predict_frame(loaded_model, model_type, df):
+    """
+    Prédit les prix pour un DataFrame déjà préparé (région + score PEB).
+    Un seul appel au modèle pour toutes les lignes ; retourne un tableau numpy.
+    """
+    if model_type != 'pycaret':
+        # Pour un modèle joblib (sklearn/custom pipeline) ou compilé (src/compiled_model.py)
+        return np.asarray(loaded_model.predict(df))
+
+    # Pour PyCaret (comportement original)
+    from pycaret.regression import predict_model
+    predictions_df = predict_model(estimator=loaded_model, data=df)
+    # Extraire la valeur prédite (souvent dans 'prediction_label' ou 'Label')
+    for column in ('prediction_label', 'Label'):
+        if column in predictions_df.columns:
+            return predictions_df[column].to_numpy()
+    raise KeyError(f"Colonne de prédiction ('prediction_label' ou 'Label') non trouvée dans le résultat : "
+                   f"{predictions_df.columns.tolist()}")
+
+
+def predict_with_interval(loaded_model, model_type, df, calibration=None, level=None):
+    """
+    Prix prédits et fourchettes (src/intervals.py) : retourne (prix, bornes basses, bornes hautes).
+    Les bornes sont None sans calibration ; sinon un simple calcul vectorisé sur les prix prédits.
+    """
+    predictions = predict_frame(loaded_model, model_type, df)
+    if calibration is None:
+        return predictions, None, None
+    from src.intervals import DEFAULT_LEVEL
+    lower, upper = calibration.interval(predictions, DEFAULT_LEVEL if level is None else level)
+    return predictions, lower, upper
@@ -0,0 +1,105 @@
+"""
+Cache des prédictions pour Immo Eliza
+LRU + TTL partagé entre toutes les sessions du processus, indexé par la version
+du modèle et un hash canonique des features (plusieurs modèles servis en parallèle
+partagent le cache ; les entrées d'une version remplacée sortent par LRU)
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.prediction import DERIVED_COLUMNS, EXPECTED_COLUMNS_ORDER
+
+
+def _normalize_value(value):
+    """Représentation stable d'une valeur (types numpy, 3 vs 3.0, NaN vs None)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def make_key(list_input_data):
+    """Hash canonique des features (dans l'ordre d'EXPECTED_COLUMNS_ORDER)"""
+    features = {
+        col: _normalize_value(value)
+        for col, value in zip(EXPECTED_COLUMNS_ORDER, list_input_data)
+        # La région est recalculée depuis le code postal : elle ne doit pas changer la clé
+        if col not in DERIVED_COLUMNS
+    }
+    canonical = json.dumps(features, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class PredictionCache:
+    """Cache LRU avec expiration (TTL) et compteurs hit/miss/éviction"""
+
+    def __init__(self, max_size=1024, ttl_seconds=3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, model_version):
+        """Retourne la prédiction en cache ou None"""
+        key = (model_version, key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, model_version, value):
+        key = (model_version, key)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'model_versions': sorted({model_version for model_version, _ in list(self._entries)}),
+        }
+
+
+# Instance partagée par toutes les sessions du processus
+prediction_cache = PredictionCache()
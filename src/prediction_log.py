@@ -0,0 +1,246 @@
+"""
+Journal des prédictions en Parquet (features d'entrée, prix prédit, version du modèle, latence)
+`record` ne fait que mettre la prédiction en file : un thread de fond écrit les lignes par
+lots (un row group par lot) dans le fichier courant, qui tourne au-delà de `max_rows`
+lignes ou de `rotate_seconds` secondes. Le fichier courant porte le suffixe .inprogress
+et n'est renommé en .parquet qu'une fois fermé : seuls les fichiers complets sont lus
+(cf. src/drift.py). Ajout seul, jamais de réécriture.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from src.prediction import EXPECTED_COLUMNS_ORDER
+from src.schema import BOOLEAN_COLUMNS, FLOAT32_COLUMNS, INTEGER_COLUMNS, to_float
+
+logger = logging.getLogger('immo_eliza.prediction_log')
+
+LOG_DIR_NAME = 'prediction_log'
+FILE_PREFIX = 'predictions-'
+IN_PROGRESS_SUFFIX = '.inprogress'
+
+# Colonnes décrivant la prédiction, avant les features d'entrée
+META_COLUMNS = ['timestamp', 'source', 'model_version', 'cached', 'latency_ms', 'predicted_price']
+# Features numériques en float32 (entiers exacts jusqu'à 2^24) ; la classe PEB est gardée telle que saisie
+NUMERIC_FEATURES = [col for col in EXPECTED_COLUMNS_ORDER
+                    if (col in INTEGER_COLUMNS or col in FLOAT32_COLUMNS) and col != 'epcNumeric']
+
+_STOP = object()
+
+
+def prediction_log_path(base_dir):
+    return os.path.join(base_dir, 'data', LOG_DIR_NAME)
+
+
+def log_schema():
+    import pyarrow as pa
+
+    meta = [('timestamp', pa.timestamp('ms')), ('source', pa.string()), ('model_version', pa.string()),
+            ('cached', pa.bool_()), ('latency_ms', pa.float32()), ('predicted_price', pa.float64())]
+    features = [(col, pa.float32() if col in NUMERIC_FEATURES else pa.bool_() if col in BOOLEAN_COLUMNS
+                 else pa.string()) for col in EXPECTED_COLUMNS_ORDER]
+    return pa.schema(meta + features)
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return str(value)
+
+
+def _flag(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return bool(value)
+
+
+def completed_log_files(log_dir):
+    """Fichiers du journal fermés (lisibles), du plus ancien au plus récent"""
+    if not os.path.isdir(log_dir):
+        return []
+    return sorted(os.path.join(log_dir, name) for name in os.listdir(log_dir)
+                  if name.startswith(FILE_PREFIX) and name.endswith('.parquet'))
+
+
+class PredictionLog:
+    """Écriture en arrière-plan du journal des prédictions, partagée par les sessions du processus"""
+
+    def __init__(self, log_dir, batch_size=500, flush_interval=5.0, max_rows=100_000, rotate_seconds=900):
+        self.log_dir = log_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.rotate_seconds = rotate_seconds
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._writer = None
+        self._path = None
+        self._file_rows = 0
+        self._opened_at = 0.0
+        self._sequence = 0
+        self._stats = {'recorded': 0, 'written': 0, 'flushes': 0, 'files': 0, 'errors': 0}
+
+    def start(self):
+        """Démarre le thread d'écriture (sinon démarré par le premier `record`)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                # Imports dans le thread appelant : le thread d'écriture peut tourner pendant l'arrêt
+                # de l'interpréteur, où pyarrow ne peut plus charger son interface pandas
+                import pyarrow.pandas_compat  # noqa: F401
+                import pyarrow.parquet  # noqa: F401
+
+                self._thread = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+                self._thread.start()
+
+    def record(self, rows, predictions, model_version, latency_ms, source='app', cached=False):
+        """Met en file des prédictions (lignes dans l'ordre d'EXPECTED_COLUMNS_ORDER) ; retour immédiat"""
+        self.start()
+        self._stats['recorded'] += len(rows)
+        self._queue.put((datetime.now(), rows, predictions, model_version, latency_ms, source, cached))
+
+    def flush(self, timeout=None):
+        """Attend l'écriture de tout ce qui a été mis en file avant l'appel"""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout=10.0):
+        """Écrit ce qui reste en file, ferme le fichier courant et arrête le thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def metrics(self):
+        return dict(self._stats, queued=self._queue.qsize(), current_file_rows=self._file_rows)
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._rotate_if_due()
+                continue
+            batch, waiters, stop = [], [], False
+            n_rows = 0
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                    n_rows += len(item[1])
+                if stop or waiters or n_rows >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    self._stats['errors'] += 1
+                    logger.exception("Échec de l'écriture du journal des prédictions")
+            self._rotate_if_due()
+            if stop:
+                self._close_file()
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def _table(self, batch):
+        """Table Arrow (colonnes) des prédictions d'un lot"""
+        import pyarrow as pa
+
+        meta = {col: [] for col in META_COLUMNS}
+        rows = []
+        for timestamp, item_rows, predictions, model_version, latency_ms, source, cached in batch:
+            n = len(item_rows)
+            meta['timestamp'].extend([timestamp] * n)
+            meta['source'].extend([source] * n)
+            meta['model_version'].extend([model_version] * n)
+            meta['cached'].extend([bool(cached)] * n)
+            meta['latency_ms'].extend([float(latency_ms)] * n)
+            meta['predicted_price'].extend(float(value) for value in predictions)
+            rows.extend(item_rows)
+
+        schema = log_schema()
+        arrays = [pa.array(meta[col], type=schema.field(col).type) for col in META_COLUMNS]
+        for col, values in zip(EXPECTED_COLUMNS_ORDER, zip(*rows)):
+            if col in NUMERIC_FEATURES:
+                arrays.append(pa.array(to_float(list(values)).astype(np.float32), from_pandas=True))
+            elif col in BOOLEAN_COLUMNS:
+                arrays.append(pa.array([_flag(value) for value in values], type=pa.bool_()))
+            else:
+                arrays.append(pa.array([_text(value) for value in values], type=pa.string()))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _write(self, batch):
+        import pyarrow.parquet as pq
+
+        table = self._table(batch)
+        if self._writer is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._sequence += 1
+            name = f"{FILE_PREFIX}{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}-{self._sequence:04d}.parquet"
+            self._path = os.path.join(self.log_dir, name)
+            self._writer = pq.ParquetWriter(self._path + IN_PROGRESS_SUFFIX, table.schema, compression='zstd')
+            self._opened_at = time.monotonic()
+            self._file_rows = 0
+        self._writer.write_table(table)
+        self._file_rows += table.num_rows
+        self._stats['written'] += table.num_rows
+        self._stats['flushes'] += 1
+
+    def _rotate_if_due(self):
+        if self._writer is None:
+            return
+        if self._file_rows >= self.max_rows or time.monotonic() - self._opened_at >= self.rotate_seconds:
+            self._close_file()
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+        try:
+            self._writer.close()
+            os.replace(self._path + IN_PROGRESS_SUFFIX, self._path)
+            self._stats['files'] += 1
+        except Exception:
+            self._stats['errors'] += 1
+            logger.exception("Échec de la fermeture du journal des prédictions")
+        self._writer, self._path, self._file_rows = None, None, 0
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_prediction_log(base_dir):
+    """Journal partagé par le processus (fichier courant fermé à l'arrêt)"""
+    log_dir = prediction_log_path(base_dir)
+    if log_dir in _logs:
+        return _logs[log_dir]
+    with _logs_lock:
+        if log_dir not in _logs:
+            prediction_log = PredictionLog(log_dir)
+            atexit.register(prediction_log.stop)
+            _logs[log_dir] = prediction_log
+        return _logs[log_dir]
@@ -0,0 +1,156 @@
+"""
+Schéma de types des données Immo Eliza (stockage du dataset et frames d'inférence)
+Catégories pandas pour les colonnes à vocabulaire fermé, entiers courts pour les comptages,
+float32 pour les surfaces et le score PEB. Le même schéma est appliqué au dataset nettoyé
+(src/cleaning.py) et aux DataFrames envoyés au modèle (src/prediction.py) : les prédictions
+sont identiques à celles obtenues avec des colonnes object/float64.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.features import REGIONS
+
+# Vocabulaires appris par les encodeurs du pipeline (+ valeurs proposées par l'application).
+# Une valeur hors vocabulaire n'est jamais perdue : la catégorie est ajoutée à la volée.
+CATEGORIES = {
+    'type': ['APARTMENT', 'HOUSE'],
+    'province': ['Antwerp', 'Brussels', 'East Flanders', 'Flemish Brabant', 'Hainaut', 'Limburg',
+                 'Liège', 'Luxembourg', 'Namur', 'Walloon Brabant', 'West Flanders'],
+    'buildingCondition': ['AS_NEW', 'GOOD', 'JUST_RENOVATED', 'TO_BE_DONE_UP', 'TO_RENOVATE',
+                          'TO_RESTORE', 'UNKNOWN'],
+    'floodZoneType': ['CIRCUMSCRIBED_FLOOD_ZONE', 'CIRCUMSCRIBED_WATERSIDE_ZONE', 'NON_FLOOD_ZONE',
+                      'POSSIBLE_FLOOD_ZONE', 'POSSIBLE_N_CIRCUMSCRIBED_FLOOD_ZONE',
+                      'POSSIBLE_N_CIRCUMSCRIBED_WATERSIDE_ZONE', 'RECOGNIZED_FLOOD_ZONE',
+                      'RECOGNIZED_N_CIRCUMSCRIBED_FLOOD_ZONE', 'RECOGNIZED_N_CIRCUMSCRIBED_WATERSIDE_FLOOD_ZONE'],
+    'heatingType': ['CARBON', 'ELECTRIC', 'FUELOIL', 'GAS', 'PELLET', 'SOLAR', 'WOOD'],
+    'kitchenType': ['HYPER_EQUIPPED', 'INSTALLED', 'NOT_INSTALLED', 'SEMI_EQUIPPED', 'USA_HYPER_EQUIPPED',
+                    'USA_INSTALLED', 'USA_SEMI_EQUIPPED', 'USA_UNINSTALLED'],
+    'subtype_grouped': ['LUXURY_PROPERTY', 'MIXED_USE', 'OTHER', 'RURAL_HOUSE', 'SPECIAL_APARTMENT',
+                        'STANDARD_APARTMENT', 'STANDARD_HOUSE'],
+    'region': REGIONS,
+}
+
+# Entiers courts numpy ; float32 (NaN) si la colonne a des manquants ou des valeurs qui n'y tiennent
+# pas (décimales, hors bornes) : les imputeurs sklearn du pipeline ne gèrent pas pd.NA
+INTEGER_COLUMNS = {
+    'bedroomCount': 'int8',
+    'bathroomCount': 'int8',
+    'facedeCount': 'int8',
+    'toiletCount': 'int8',
+    'building_floors': 'int8',
+    'apartment_floor': 'int8',
+    'postCode': 'int16',
+    'buildingConstructionYear': 'int16',
+}
+FLOAT32_COLUMNS = ['habitableSurface', 'landSurface', 'gardenSurface', 'epcNumeric']
+BOOLEAN_COLUMNS = ['hasGarden', 'hasSwimmingPool', 'hasFireplace', 'hasTerrace']
+# Reste en object : encodage cible à forte cardinalité, une catégorie pandas y change la sortie
+# de l'encodeur (category_encoders travaille alors sur les codes et non sur les libellés)
+OBJECT_COLUMNS = ['locality']
+# Cible en float64 (prix à l'euro près, inchangé pour l'entraînement)
+TARGET_COLUMNS = {'price': 'float64'}
+
+CATEGORY_DTYPES = {col: pd.CategoricalDtype(values) for col, values in CATEGORIES.items()}
+_CATEGORY_CODES = {col: {value: code for code, value in enumerate(values)} for col, values in CATEGORIES.items()}
+_INTEGER_INFO = {col: np.iinfo(dtype) for col, dtype in INTEGER_COLUMNS.items()}
+
+# En dessous de cette taille, une recherche dans un dict est plus rapide que Index.get_indexer
+_SMALL_COLUMN = 64
+
+SCHEMA = {
+    **{col: str(dtype) for col, dtype in CATEGORY_DTYPES.items()},
+    **INTEGER_COLUMNS,
+    **{col: 'float32' for col in FLOAT32_COLUMNS},
+    **{col: 'bool' for col in BOOLEAN_COLUMNS},
+    **{col: 'object' for col in OBJECT_COLUMNS},
+    **TARGET_COLUMNS,
+}
+
+
+def _values(column):
+    """Valeurs numpy d'une colonne (Series, array ou liste)"""
+    if isinstance(column, pd.Series):
+        return column.to_numpy(dtype=object) if isinstance(column.dtype, pd.CategoricalDtype) else column.to_numpy()
+    return np.asarray(column, dtype=object) if isinstance(column, (list, tuple)) else np.asarray(column)
+
+
+def categorical_array(column, dtype, codes_by_value=None):
+    """Categorical au vocabulaire déclaré ; les valeurs inconnues étendent les catégories"""
+    if isinstance(column, pd.Series) and column.dtype == dtype:
+        return column.array
+    values = _values(column).astype(object)
+    if codes_by_value is not None and len(values) <= _SMALL_COLUMN:
+        codes = np.fromiter((codes_by_value.get(value, -1) for value in values), dtype=np.int64, count=len(values))
+    else:
+        codes = dtype.categories.get_indexer(values)
+    unknown = (codes < 0) & ~pd.isna(values)
+    if unknown.any():
+        extra = pd.unique(values[unknown])
+        dtype = pd.CategoricalDtype(list(dtype.categories) + [str(value) for value in extra])
+        codes = dtype.categories.get_indexer(values.astype(str))
+        codes[pd.isna(values)] = -1
+    return pd.Categorical.from_codes(codes, dtype=dtype, validate=False)
+
+
+def to_float(column):
+    """Valeurs en float64 (NaN pour les manquants et les textes non numériques)"""
+    values = _values(column)
+    if values.dtype.kind in 'fiub':
+        return values.astype(float)
+    try:
+        # Chemin rapide : nombres Python et None
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+def integer_array(column, dtype, info=None):
+    """Entier de la taille demandée, ou float32 si la colonne a des manquants ou des valeurs hors entier"""
+    values = to_float(column)
+    info = info or np.iinfo(dtype)
+    if (np.all(values == np.trunc(values))  # faux dès qu'il y a un NaN
+            and np.all((values >= info.min) & (values <= info.max))):
+        return values.astype(info.dtype)
+    return values.astype(np.float32)
+
+
+def convert_column(name, column):
+    """Colonne convertie selon le schéma (inchangée si la colonne n'y figure pas)"""
+    if name in CATEGORY_DTYPES:
+        return categorical_array(column, CATEGORY_DTYPES[name], _CATEGORY_CODES[name])
+    if name in INTEGER_COLUMNS:
+        return integer_array(column, INTEGER_COLUMNS[name], _INTEGER_INFO[name])
+    if name in FLOAT32_COLUMNS:
+        return to_float(column).astype(np.float32)
+    if name in BOOLEAN_COLUMNS:
+        values = _values(column)
+        # Booléens manquants conservés (le pipeline les impute) : dtype object dans ce cas
+        return values.astype(bool) if not pd.isna(values).any() else values.astype(object)
+    if name in TARGET_COLUMNS:
+        return to_float(column).astype(TARGET_COLUMNS[name])
+    return _values(column)
+
+
+def typed_frame(columns, index=None, skip=()):
+    """DataFrame typé construit en une fois depuis {nom: valeurs} (colonnes de `skip` laissées telles quelles)"""
+    return pd.DataFrame({name: (values.array if isinstance(values, pd.Series) else values) if name in skip
+                         else convert_column(name, values)
+                         for name, values in columns.items()}, index=index, copy=False)
+
+
+def apply_schema(df, columns=None):
+    """
+    Copie de df avec les colonnes du schéma converties ; avec `columns`, seules ces colonnes
+    sont converties, directement dans df (quelques colonnes : pas de copie du DataFrame)
+    """
+    if columns is not None:
+        for name in columns:
+            df[name] = convert_column(name, df[name])
+        return df
+    return typed_frame({name: df[name] for name in df.columns}, index=df.index)
+
+
+def memory_bytes(df):
+    """Mémoire occupée par un DataFrame, chaînes comprises"""
+    return int(df.memory_usage(deep=True, index=False).sum())
@@ -0,0 +1,91 @@
+"""
+Analyse de sensibilité du prix (« et si ? »)
+Construit une grille de variantes du bien courant (ex. surface habitable × classe PEB)
+et les estime toutes en un seul appel au modèle. Les courbes sont mises en cache par
+hash du bien, hors colonnes balayées : bouger le curseur balayé réutilise la même grille.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.features import EPC_CLASSES
+from src.prediction import EXPECTED_COLUMNS_ORDER, build_input_frame, predict_frame, prepare_frame
+from src.prediction_cache import PredictionCache, make_key
+
+PREDICTION_COLUMN = 'predicted_price'
+
+# Axes proposés : colonne -> (libellé, valeurs balayées)
+SWEEP_AXES = {
+    'habitableSurface': ('Surface habitable (m²)', np.arange(50, 301, 5)),
+    'bedroomCount': ('Nombre de chambres', np.arange(0, 9)),
+    'buildingConstructionYear': ('Année de construction', np.arange(1900, 2026, 5)),
+    'landSurface': ('Surface du terrain (m²)', np.arange(0, 2001, 50)),
+}
+SERIES_COLUMN = 'epcNumeric'
+SERIES_VALUES = EPC_CLASSES
+
+# Latence visée pour une grille de quelques milliers de lignes
+TARGET_LATENCY_MS = 500
+
+# Partagé par toutes les sessions du processus, vidé quand la version du modèle change
+sensitivity_cache = PredictionCache(max_size=128)
+
+
+def build_variants(base_row, x_column, x_values, series_column=SERIES_COLUMN, series_values=SERIES_VALUES):
+    """
+    Grille de variantes du bien : une ligne par couple (x, série), toutes les autres
+    features identiques au bien de départ
+    """
+    x_values = np.asarray(x_values)
+    series_values = np.asarray(series_values, dtype=object)
+    n_rows = len(x_values) * len(series_values)
+
+    base = build_input_frame([base_row])
+    variants = pd.DataFrame({col: np.repeat(base[col].to_numpy(), n_rows) for col in EXPECTED_COLUMNS_ORDER})
+    variants[x_column] = np.tile(x_values, len(series_values))
+    variants[series_column] = np.repeat(series_values, len(x_values))
+    return variants
+
+
+def sweep_key(base_row, x_column, x_values, series_column=SERIES_COLUMN, series_values=SERIES_VALUES):
+    """Hash du bien sans les colonnes balayées + description de la grille"""
+    row = list(base_row)
+    for column in (x_column, series_column):
+        row[EXPECTED_COLUMNS_ORDER.index(column)] = None
+    grid = json.dumps([x_column, np.asarray(x_values).tolist(), series_column, list(series_values)], default=str)
+    return hashlib.sha1(f"{make_key(row)}|{grid}".encode('utf-8')).hexdigest()
+
+
+def sensitivity_grid(model_entry, base_row, x_column='habitableSurface', x_values=None,
+                     series_column=SERIES_COLUMN, series_values=SERIES_VALUES, cache=sensitivity_cache):
+    """
+    Prix estimés pour toute la grille (DataFrame x, série, predicted_price), en un seul predict.
+    Les colonnes balayées du bien de départ sont ignorées.
+    """
+    if x_values is None:
+        x_values = SWEEP_AXES[x_column][1]
+
+    key = sweep_key(base_row, x_column, x_values, series_column, series_values)
+    if cache is not None:
+        cached = cache.get(key, model_entry.version)
+        if cached is not None:
+            return cached
+
+    variants = build_variants(base_row, x_column, x_values, series_column, series_values)
+    grid = variants[[x_column, series_column]].copy()
+    features = prepare_frame(variants)
+    grid[PREDICTION_COLUMN] = predict_frame(model_entry.model, model_entry.model_type, features)
+
+    if cache is not None:
+        cache.put(key, model_entry.version, grid)
+    return grid
+
+
+def to_chart_frame(grid, x_column, series_column=SERIES_COLUMN):
+    """Format large pour st.line_chart : index x, une colonne par valeur de la série"""
+    chart = grid.pivot(index=x_column, columns=series_column, values=PREDICTION_COLUMN)
+    ordered = [value for value in SERIES_VALUES if value in chart.columns]
+    return chart[ordered] if series_column == SERIES_COLUMN else chart
@@ -0,0 +1,26 @@
+"""
+Configuration d'exécution d'Immo Eliza (variables d'environnement)
+
+IMMO_ELIZA_MODE        : 'production' (défaut) ou 'development'
+IMMO_ELIZA_LOG_LEVEL   : niveau de log (défaut WARNING en production, DEBUG en développement)
+IMMO_ELIZA_LOG_SAMPLE  : fraction des logs DEBUG réellement émis (0.0 - 1.0)
+IMMO_ELIZA_MODEL_FORMAT: 'joblib' (défaut) ou 'compiled' (cf. scripts/compile_model.py)
+IMMO_ELIZA_PREDICTION_LOG: '1' (défaut) ou '0' pour ne pas journaliser les prédictions
+"""
+
+import os
+
+MODE = os.environ.get('IMMO_ELIZA_MODE', 'production').strip().lower()
+PRODUCTION_MODE = MODE != 'development'
+
+LOG_LEVEL = os.environ.get('IMMO_ELIZA_LOG_LEVEL', 'WARNING' if PRODUCTION_MODE else 'DEBUG').upper()
+LOG_SAMPLE_RATE = float(os.environ.get('IMMO_ELIZA_LOG_SAMPLE', '0.01' if PRODUCTION_MODE else '1.0'))
+
+# Petite pause d'affichage du spinner après la prédiction (effet visuel), uniquement hors production
+SPINNER_DELAY_SECONDS = 0.0 if PRODUCTION_MODE else 1.0
+
+# Format de l'artefact à charger : le pipeline joblib ou sa version compilée pur NumPy
+MODEL_FORMAT = os.environ.get('IMMO_ELIZA_MODEL_FORMAT', 'joblib').strip().lower()
+
+# Journal des prédictions (features, prix, version, latence) pour la détection de dérive
+PREDICTION_LOG_ENABLED = os.environ.get('IMMO_ELIZA_PREDICTION_LOG', '1').strip() != '0'
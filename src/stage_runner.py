@@ -0,0 +1,139 @@
+"""
+Exécution d'étapes de preprocessing avec cache Parquet par empreinte d'entrée
+La clé d'une étape = hash(empreinte de son entrée, nom, paramètres, code source de l'étape
+et des modules ou fonctions dont elle dépend).
+L'empreinte de la sortie (hash du fichier Parquet) est enregistrée à côté : l'étape suivante peut
+calculer sa clé sans relire les données. Seules les étapes dont l'entrée, les paramètres
+ou le code ont changé sont recalculées ; si une étape recalculée produit la même sortie
+qu'avant, les suivantes restent en cache.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 1
+# Entrées conservées par étape (les plus récentes) ; les autres sont supprimées
+MAX_ENTRIES_PER_STAGE = 3
+
+
+def _source(obj):
+    """Code source d'une fonction ou d'un module (bytecode si la source est introuvable)"""
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        code = getattr(obj, '__code__', None)
+        return code.co_code.hex() if code is not None else repr(obj)
+
+
+class Stage:
+    """
+    Étape nommée : func(df, **params) -> DataFrame
+    depends_on : modules ou fonctions appelés par l'étape (ex. src.features) dont le code
+                 fait partie de la clé de cache, en plus de celui de func
+    """
+
+    def __init__(self, name, func, depends_on=(), **params):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.params = params
+
+    def fingerprint(self):
+        """Hash du nom, des paramètres, du code de l'étape et de celui de ses dépendances"""
+        sources = [_source(obj) for obj in (self.func,) + self.depends_on]
+        payload = json.dumps([CACHE_FORMAT_VERSION, self.name, self.params, sources], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def __call__(self, df):
+        return self.func(df, **self.params)
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StageRunner:
+    """Enchaîne des étapes en réutilisant les sorties en cache dans cache_dir"""
+
+    def __init__(self, cache_dir, use_cache=True):
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+
+    def _paths(self, position, stage, key):
+        base = os.path.join(self.cache_dir, f'{position:02d}_{stage.name}_{key[:16]}')
+        return f'{base}.parquet', f'{base}.json'
+
+    def _prune(self, position, stage, keep_path):
+        prefix = f'{position:02d}_{stage.name}_'
+        entries = sorted((os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                          if name.startswith(prefix) and name.endswith('.parquet')),
+                         key=os.path.getmtime, reverse=True)
+        for path in [p for p in entries if p != keep_path][MAX_ENTRIES_PER_STAGE - 1:]:
+            for stale in (path, path[:-len('.parquet')] + '.json'):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+    def run(self, load, input_digest, stages):
+        """
+        load() -> DataFrame d'entrée, appelé seulement si une étape doit être recalculée ;
+        input_digest : empreinte de cette entrée (ex. file_digest du dataset).
+        Retourne (DataFrame final, chemin du Parquet final, rapport par étape).
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        report = []
+        df = None
+        df_path = None  # Parquet de la dernière sortie en cache, relu seulement si nécessaire
+        digest = input_digest
+
+        for position, stage in enumerate(stages):
+            start = time.perf_counter()
+            key = hashlib.sha1(f'{digest}|{stage.fingerprint()}'.encode('utf-8')).hexdigest()
+            data_path, meta_path = self._paths(position, stage, key)
+
+            if self.use_cache and os.path.exists(data_path) and os.path.exists(meta_path):
+                with open(meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+                os.utime(data_path)
+                df, df_path = None, data_path
+                digest = meta['output_digest']
+                report.append({'stage': stage.name, 'key': key[:16], 'rows_out': meta['rows'], 'cached': True,
+                               'seconds': round(time.perf_counter() - start, 4)})
+                continue
+
+            if df is None:
+                df = self._load(load, df_path, report)
+                start = time.perf_counter()
+            rows_in = len(df)
+            df = stage(df)
+            df.to_parquet(data_path, index=False)
+            # Empreinte des octets écrits : même contenu -> même fichier Parquet (à version de pyarrow égale)
+            digest = file_digest(data_path)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'stage': stage.name, 'key': key, 'output_digest': digest, 'rows': len(df),
+                           'params': stage.params, 'created_at': time.time()}, f, default=str)
+            self._prune(position, stage, data_path)
+            df_path = data_path
+            report.append({'stage': stage.name, 'key': key[:16], 'rows_in': rows_in, 'rows_out': len(df),
+                           'cached': False, 'seconds': round(time.perf_counter() - start, 4)})
+
+        if df is None:
+            df = self._load(load, df_path, report)
+        return df, df_path, report
+
+    @staticmethod
+    def _load(load, df_path, report):
+        """Relit la dernière sortie en cache (ou l'entrée brute) et ajoute son temps au rapport"""
+        start = time.perf_counter()
+        df = pd.read_parquet(df_path) if df_path is not None else load()
+        report.append({'stage': 'read_cache' if df_path is not None else 'read_dataset', 'rows_out': len(df),
+                       'cached': df_path is not None, 'seconds': round(time.perf_counter() - start, 4)})
+        return df
@@ -0,0 +1,158 @@
+"""
+Préchauffage d'un processus (application Streamlit ou API) avant son premier utilisateur
+Charge les modèles du registre (désérialisation, imports PyCaret / sklearn / LightGBM),
+puis prédit avec chacun un bien synthétique construit à partir des valeurs par défaut du
+formulaire : les allocations paresseuses et le pool de threads de LightGBM sont créés
+pendant le préchauffage et non pendant la première vraie requête.
+L'état (en attente, en cours, prêt, échec) et la durée de chaque étape alimentent la
+sonde de disponibilité de l'API (/ready) et sont journalisés.
+"""
+
+import threading
+import time
+
+from src.local_storage import DEFAULT_SESSION_VALUES
+from src.logging_config import get_logger
+from src.prediction import EXPECTED_COLUMNS_ORDER, predict_frame, prepare_input_frame
+
+logger = get_logger('warmup')
+
+# Prédictions unitaires par modèle (la première paie les initialisations, les suivantes vérifient)
+WARMUP_ROUNDS = 3
+# Taille du lot prédit en plus (chemin des micro-batchs de l'API ; 0 pour l'application Streamlit)
+WARMUP_BATCH_SIZE = 64
+
+PENDING, RUNNING, READY, FAILED = 'pending', 'running', 'ready', 'failed'
+
+
+def warmup_row():
+    """Bien synthétique dans l'ordre d'EXPECTED_COLUMNS_ORDER, depuis les valeurs par défaut du formulaire"""
+    row = []
+    for col in EXPECTED_COLUMNS_ORDER:
+        value = DEFAULT_SESSION_VALUES.get(f'{col}_key')
+        # Libellés « --- Choisissez ... --- » des listes déroulantes : valeur non renseignée
+        if isinstance(value, str) and value.startswith('---'):
+            value = None
+        row.append(value)
+    return row
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+class Warmup:
+    """Préchauffage exécuté une fois par processus (dans le thread appelant ou en arrière-plan)"""
+
+    def __init__(self, router, prediction_log=None, rounds=WARMUP_ROUNDS, batch_size=WARMUP_BATCH_SIZE):
+        self.router = router
+        self.prediction_log = prediction_log
+        self.rounds = rounds
+        self.batch_size = batch_size
+        self.status = PENDING
+        self.error = None
+        self.timings_ms = {}
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.status == READY
+
+    def run(self):
+        """Préchauffe (une seule fois) ; retourne True si le processus est prêt"""
+        with self._lock:
+            if self.status != PENDING:
+                claimed = False
+            else:
+                self.status, claimed = RUNNING, True
+        if not claimed:
+            self._done.wait()
+            return self.ready
+
+        self.started_at = time.time()
+        total_start = time.perf_counter()
+        try:
+            self._run()
+            self.timings_ms['total'] = _ms(time.perf_counter() - total_start)
+            self.status = READY
+            logger.info("warmup_done", extra={'fields': {'timings_ms': self.timings_ms}})
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.status = FAILED
+            logger.exception("warmup_failed", extra={'fields': {'timings_ms': self.timings_ms}})
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+        return self.ready
+
+    def _run(self):
+        start = time.perf_counter()
+        models = self.router.models()
+        self.timings_ms['load_models'] = _ms(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        row = warmup_row()
+        df_input_data = prepare_input_frame([row])
+        self.timings_ms['prepare_input'] = _ms(time.perf_counter() - start)
+
+        batch = prepare_input_frame([row] * self.batch_size) if self.batch_size else None
+        for name, model_entry in models.items():
+            latencies = []
+            for _ in range(self.rounds):
+                start = time.perf_counter()
+                predict_frame(model_entry.model, model_entry.model_type, df_input_data)
+                latencies.append(time.perf_counter() - start)
+            self.timings_ms[f'first_predict:{name}'] = _ms(latencies[0])
+            self.timings_ms[f'next_predict:{name}'] = _ms(min(latencies[1:], default=latencies[0]))
+            if batch is None:
+                continue
+            start = time.perf_counter()
+            predict_frame(model_entry.model, model_entry.model_type, batch)
+            self.timings_ms[f'batch_predict:{name}'] = _ms(time.perf_counter() - start)
+
+        if self.prediction_log is not None:
+            # Import de pyarrow et thread d'écriture avant le premier enregistrement
+            start = time.perf_counter()
+            self.prediction_log.start()
+            self.timings_ms['prediction_log'] = _ms(time.perf_counter() - start)
+
+    def start(self):
+        """Lance le préchauffage dans un thread de fond (sans effet s'il est déjà lancé)"""
+        with self._lock:
+            if self._thread is None and self.status == PENDING:
+                self._thread = threading.Thread(target=self.run, name='warmup', daemon=True)
+                self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Attend la fin du préchauffage ; retourne True si le processus est prêt"""
+        self._done.wait(timeout)
+        return self.ready
+
+    def state(self):
+        """État exposé par la sonde de disponibilité"""
+        return {
+            'status': self.status,
+            'error': self.error,
+            'timings_ms': dict(self.timings_ms),
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+_warmups = {}
+_warmups_lock = threading.Lock()
+
+
+def get_warmup(router, prediction_log=None, batch_size=WARMUP_BATCH_SIZE):
+    """Préchauffage partagé par le processus pour ce routeur (paramètres du premier appel)"""
+    if router.base_dir in _warmups:
+        return _warmups[router.base_dir]
+    with _warmups_lock:
+        if router.base_dir not in _warmups:
+            _warmups[router.base_dir] = Warmup(router, prediction_log, batch_size=batch_size)
+        return _warmups[router.base_dir]